@@ -1,12 +1,51 @@
+from django.conf import settings
 from django.contrib import admin
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils.translation import gettext_lazy as _
 
-from .models import LoginEvent
+from road_maintenance.admin_mixins import PerformanceAdminMixin
+
+from .bruteforce import failure_offenders
+from .models import LoginEvent, LoginFailureBucket
 
 
 @admin.register(LoginEvent)
-class LoginEventAdmin(admin.ModelAdmin):
+class LoginEventAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ("timestamp", "user", "username", "action", "ip_address")
+    list_select_related = ("user",)
+    list_defer = ("user_agent", "path")
     list_filter = ("action", "timestamp")
     search_fields = ("user__username", "username", "ip_address", "user_agent")
     readonly_fields = ("timestamp", "user", "username", "action", "ip_address", "user_agent", "path")
     ordering = ("-timestamp",)
+    change_list_template = "admin/activity/loginevent/change_list.html"
+
+    def get_urls(self):
+        urls = [
+            path(
+                "failures/",
+                self.admin_site.admin_view(self.failure_report_view),
+                name="activity_loginevent_failures",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def failure_report_view(self, request):
+        max_minutes = settings.ACTIVITY_FAILURE_BUCKET_RETENTION_HOURS * 60
+        try:
+            threshold = max(0, int(request.GET.get("threshold", 10)))
+            minutes = min(max(1, int(request.GET.get("minutes", 15))), max_minutes)
+        except ValueError:
+            threshold, minutes = 10, 15
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": _("Neuspjele prijave – mogući brute-force"),
+            "threshold": threshold,
+            "minutes": minutes,
+            "by_ip": failure_offenders(LoginFailureBucket.Kind.IP, threshold, minutes),
+            "by_username": failure_offenders(LoginFailureBucket.Kind.USERNAME, threshold, minutes),
+        }
+        return TemplateResponse(request, "admin/activity/loginevent/failure_report.html", context)
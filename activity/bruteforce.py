@@ -0,0 +1,89 @@
+"""Rolling failed-login counters used for brute-force detection.
+
+Failures are counted per IP address and per username in one-minute buckets
+(``LoginFailureBucket``). Asking "who failed more than N times in the last M
+minutes" then reads at most M rows per offender from a small, indexed table
+instead of scanning ``LoginEvent``. Because whole buckets are summed, the
+window can include up to one extra minute.
+"""
+from __future__ import annotations
+
+import datetime
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import LoginEvent, LoginFailureBucket
+
+BUCKET_SECONDS = 60
+
+UPSERT_SQL = """
+INSERT INTO activity_loginfailurebucket (kind, key, bucket_start, count)
+VALUES (%s, %s, %s, %s)
+ON CONFLICT (kind, key, bucket_start)
+DO UPDATE SET count = activity_loginfailurebucket.count + EXCLUDED.count
+"""
+
+OFFENDERS_SQL = """
+SELECT key, SUM(count) AS failures, MIN(bucket_start), MAX(bucket_start)
+FROM activity_loginfailurebucket
+WHERE kind = %s AND bucket_start >= %s
+GROUP BY key
+HAVING SUM(count) > %s
+ORDER BY failures DESC, key
+LIMIT %s
+"""
+
+
+def _bucket_start(ts: datetime.datetime) -> datetime.datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def record_failures(events: Iterable[LoginEvent]) -> int:
+    """Add FAILURE events to the per-minute counters; returns rows upserted."""
+    counts: Counter = Counter()
+    for event in events:
+        if event.action != LoginEvent.Action.FAILURE:
+            continue
+        bucket = _bucket_start(event.timestamp)
+        if event.ip_address:
+            counts[(LoginFailureBucket.Kind.IP.value, event.ip_address, bucket)] += 1
+        if event.username:
+            counts[(LoginFailureBucket.Kind.USERNAME.value, event.username, bucket)] += 1
+    if not counts:
+        return 0
+
+    # A stable order keeps concurrent flushes from deadlocking on the same rows.
+    rows = sorted((kind, key, bucket, n) for (kind, key, bucket), n in counts.items())
+    with connection.cursor() as cur:
+        cur.executemany(UPSERT_SQL, rows)
+    return len(rows)
+
+
+def failure_offenders(kind: str, threshold: int, minutes: int, limit: int = 100) -> List[Dict]:
+    """Keys of ``kind`` with more than ``threshold`` failures in the last ``minutes``."""
+    since = _bucket_start(timezone.now() - datetime.timedelta(minutes=minutes))
+    with connection.cursor() as cur:
+        cur.execute(OFFENDERS_SQL, [kind, since, threshold, limit])
+        rows = cur.fetchall()
+    return [
+        {
+            "key": key,
+            "failures": int(failures),
+            "first_seen": first_seen,
+            "last_seen": last_seen + datetime.timedelta(seconds=BUCKET_SECONDS),
+        }
+        for key, failures, first_seen, last_seen in rows
+    ]
+
+
+def prune_failure_buckets(hours: Optional[int] = None) -> int:
+    """Delete buckets older than the retention window; returns rows deleted."""
+    if hours is None:
+        hours = settings.ACTIVITY_FAILURE_BUCKET_RETENTION_HOURS
+    cutoff = timezone.now() - datetime.timedelta(hours=hours)
+    deleted, _ = LoginFailureBucket.objects.filter(bucket_start__lt=cutoff).delete()
+    return deleted
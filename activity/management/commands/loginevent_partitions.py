@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from activity.partitions import archive_partition, ensure_partitions, expired_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Kreira buduće mjesečne particije za LoginEvent te arhivira (JSONL.gz) "
+        "i briše particije starije od razdoblja čuvanja."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.ACTIVITY_LOGIN_EVENT_PARTITIONS_AHEAD,
+            help="Broj budućih mjeseci za koje se unaprijed kreiraju particije.",
+        )
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=settings.ACTIVITY_LOGIN_EVENT_RETENTION_MONTHS,
+            help="Koliko punih mjeseci se čuva u bazi (0 = bez arhiviranja).",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=str(settings.ACTIVITY_LOGIN_EVENT_ARCHIVE_DIR),
+            help="Direktorij za izvezene particije.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Samo ispiši particije koje bi bile arhivirane.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["dry_run"]:
+            for name in ensure_partitions(options["ahead"]):
+                self.stdout.write(f"Particija spremna: {name}")
+
+        if options["retention_months"] <= 0:
+            return
+
+        archive_dir = Path(options["archive_dir"])
+        for partition in expired_partitions(options["retention_months"]):
+            if options["dry_run"]:
+                self.stdout.write(f"Za arhiviranje: {partition.name}")
+                continue
+            target = archive_partition(partition, archive_dir)
+            self.stdout.write(self.style.SUCCESS(f"Arhivirano {partition.name} → {target}"))
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from activity.bruteforce import prune_failure_buckets
+
+
+class Command(BaseCommand):
+    help = "Briše brojače neuspjelih prijava starije od razdoblja čuvanja."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=settings.ACTIVITY_FAILURE_BUCKET_RETENTION_HOURS,
+            help="Koliko sati brojača se zadržava.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_failure_buckets(options["hours"])
+        self.stdout.write(self.style.SUCCESS(f"Obrisano brojača: {deleted}"))
@@ -0,0 +1,163 @@
+from django.conf import settings
+from django.db import migrations
+
+# LoginEvent se prebacuje na mjesečne particije (PARTITION BY RANGE "timestamp").
+# Primarni ključ mora sadržavati ključ particioniranja, pa je (id, timestamp);
+# id i dalje dolazi iz vlastite sekvence pa ostaje jedinstven.
+
+ENSURE_PARTITION_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION activity_loginevent_ensure_partition(month_start date)
+RETURNS text AS
+$$
+DECLARE
+  start_ts timestamptz := date_trunc('month', month_start::timestamp) AT TIME ZONE 'UTC';
+  end_ts timestamptz := (date_trunc('month', month_start::timestamp) + interval '1 month') AT TIME ZONE 'UTC';
+  part_name text := format('activity_loginevent_p%s', to_char(month_start, 'YYYY_MM'));
+BEGIN
+  IF to_regclass(part_name) IS NOT NULL THEN
+    RETURN part_name;
+  END IF;
+
+  -- Rows that already landed in the default partition are moved before attaching.
+  EXECUTE format(
+    'CREATE TABLE %I (LIKE activity_loginevent INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+    part_name
+  );
+  EXECUTE format(
+    'INSERT INTO %I SELECT * FROM activity_loginevent_default WHERE "timestamp" >= %L AND "timestamp" < %L',
+    part_name, start_ts, end_ts
+  );
+  EXECUTE format(
+    'DELETE FROM activity_loginevent_default WHERE "timestamp" >= %L AND "timestamp" < %L',
+    start_ts, end_ts
+  );
+  EXECUTE format(
+    'ALTER TABLE activity_loginevent ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+    part_name, start_ts, end_ts
+  );
+  RETURN part_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- The month of current_month and the ahead months after it, starting earlier
+-- from since (the oldest row) when given. activity.partitions.ensure_partitions()
+-- and this migration both go through it, with ahead from
+-- ACTIVITY_LOGIN_EVENT_PARTITIONS_AHEAD.
+CREATE OR REPLACE FUNCTION activity_loginevent_ensure_partitions(
+  ahead integer, current_month date, since date DEFAULT NULL
+)
+RETURNS SETOF text AS
+$$
+  SELECT activity_loginevent_ensure_partition(m::date)
+  FROM generate_series(
+    date_trunc('month', LEAST(COALESCE(since, current_month), current_month)::timestamp),
+    date_trunc('month', current_month::timestamp) + make_interval(months => ahead),
+    interval '1 month'
+  ) AS m;
+$$ LANGUAGE sql;
+"""
+
+PARTITION_TABLE = r"""
+ALTER TABLE activity_loginevent RENAME TO activity_loginevent_legacy;
+-- Constraint and index names are not renamed with the table; free the pkey name.
+ALTER TABLE activity_loginevent_legacy
+  RENAME CONSTRAINT activity_loginevent_pkey TO activity_loginevent_legacy_pkey;
+ALTER TABLE activity_loginevent_legacy ALTER COLUMN id DROP IDENTITY IF EXISTS;
+ALTER TABLE activity_loginevent_legacy ALTER COLUMN id DROP DEFAULT;
+DROP SEQUENCE IF EXISTS activity_loginevent_id_seq;
+
+CREATE TABLE activity_loginevent (LIKE activity_loginevent_legacy)
+  PARTITION BY RANGE ("timestamp");
+
+CREATE SEQUENCE activity_loginevent_id_seq OWNED BY activity_loginevent.id;
+ALTER TABLE activity_loginevent
+  ALTER COLUMN id SET DEFAULT nextval('activity_loginevent_id_seq');
+ALTER TABLE activity_loginevent
+  ADD CONSTRAINT activity_loginevent_pkey PRIMARY KEY (id, "timestamp");
+
+DO $$
+DECLARE
+  fk record;
+BEGIN
+  FOR fk IN
+    SELECT pg_get_constraintdef(oid) AS def
+    FROM pg_constraint
+    WHERE conrelid = 'activity_loginevent_legacy'::regclass AND contype = 'f'
+  LOOP
+    EXECUTE format('ALTER TABLE activity_loginevent ADD %s', fk.def);
+  END LOOP;
+END
+$$;
+
+CREATE INDEX activity_loginevent_timestamp_idx ON activity_loginevent ("timestamp");
+CREATE INDEX activity_loginevent_user_id_idx ON activity_loginevent (user_id);
+
+CREATE TABLE activity_loginevent_default PARTITION OF activity_loginevent DEFAULT;
+"""
+
+CREATE_PARTITIONS = r"""
+SELECT activity_loginevent_ensure_partitions(
+  %s,
+  (now() AT TIME ZONE 'UTC')::date,
+  (SELECT min("timestamp") AT TIME ZONE 'UTC' FROM activity_loginevent_legacy)::date
+);
+"""
+
+COPY_LEGACY_ROWS = r"""
+INSERT INTO activity_loginevent SELECT * FROM activity_loginevent_legacy;
+
+SELECT setval(
+  'activity_loginevent_id_seq',
+  COALESCE((SELECT max(id) FROM activity_loginevent), 0) + 1,
+  false
+);
+
+DROP TABLE activity_loginevent_legacy;
+"""
+
+REVERSE_SQL = r"""
+CREATE TABLE activity_loginevent_plain (LIKE activity_loginevent INCLUDING DEFAULTS);
+INSERT INTO activity_loginevent_plain SELECT * FROM activity_loginevent;
+
+DO $$
+DECLARE
+  fk record;
+BEGIN
+  FOR fk IN
+    SELECT pg_get_constraintdef(oid) AS def
+    FROM pg_constraint
+    WHERE conrelid = 'activity_loginevent'::regclass AND contype = 'f'
+  LOOP
+    EXECUTE format('ALTER TABLE activity_loginevent_plain ADD %s', fk.def);
+  END LOOP;
+END
+$$;
+
+ALTER SEQUENCE activity_loginevent_id_seq OWNED BY activity_loginevent_plain.id;
+DROP TABLE activity_loginevent CASCADE;
+DROP FUNCTION IF EXISTS activity_loginevent_ensure_partitions(integer, date, date);
+DROP FUNCTION IF EXISTS activity_loginevent_ensure_partition(date);
+
+ALTER TABLE activity_loginevent_plain RENAME TO activity_loginevent;
+ALTER TABLE activity_loginevent ADD CONSTRAINT activity_loginevent_pkey PRIMARY KEY (id);
+CREATE INDEX activity_loginevent_timestamp_idx ON activity_loginevent ("timestamp");
+CREATE INDEX activity_loginevent_user_id_idx ON activity_loginevent (user_id);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                PARTITION_TABLE + ENSURE_PARTITION_FUNCTION,
+                (CREATE_PARTITIONS, [settings.ACTIVITY_LOGIN_EVENT_PARTITIONS_AHEAD]),
+                COPY_LEGACY_ROWS,
+            ],
+            reverse_sql=REVERSE_SQL,
+        ),
+    ]
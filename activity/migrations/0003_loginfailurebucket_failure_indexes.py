@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0002_partition_loginevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginFailureBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ip', 'IP adresa'), ('username', 'Korisničko ime')], max_length=16, verbose_name='Vrsta ključa')),
+                ('key', models.CharField(max_length=150, verbose_name='Ključ')),
+                ('bucket_start', models.DateTimeField(verbose_name='Početak intervala')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Broj neuspjelih prijava')),
+            ],
+            options={
+                'verbose_name': 'Brojač neuspjelih prijava',
+                'verbose_name_plural': 'Brojači neuspjelih prijava',
+                'ordering': ['-bucket_start'],
+                'indexes': [models.Index(fields=['kind', 'bucket_start'], include=['key', 'count'], name='activity_failure_window_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key', 'bucket_start'), name='activity_failure_bucket_uniq')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='loginevent',
+            index=models.Index(condition=models.Q(('action', 'failure')), fields=['ip_address', 'timestamp'], name='activity_fail_ip_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginevent',
+            index=models.Index(condition=models.Q(('action', 'failure')), fields=['username', 'timestamp'], name='activity_fail_user_ts_idx'),
+        ),
+    ]
@@ -5,6 +5,12 @@ from django.utils.translation import gettext_lazy as _
 
 
 class LoginEvent(models.Model):
+    """Login/logout/failure audit row.
+
+    The table is range-partitioned by month on ``timestamp`` (migration 0002),
+    so filters on a recent time window only touch the matching partitions.
+    """
+
     class Action(models.TextChoices):
         LOGIN = "login", _("Prijava")
         LOGOUT = "logout", _("Odjava")
@@ -38,7 +44,57 @@ class LoginEvent(models.Model):
         verbose_name = _("Evidencija prijave")
         verbose_name_plural = _("Evidencije prijava")
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(
+                fields=["ip_address", "timestamp"],
+                condition=models.Q(action="failure"),
+                name="activity_fail_ip_ts_idx",
+            ),
+            models.Index(
+                fields=["username", "timestamp"],
+                condition=models.Q(action="failure"),
+                name="activity_fail_user_ts_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         actor = self.user or self.username or _("Nepoznato")
         return f"{actor} – {self.get_action_display()}"
+
+
+class LoginFailureBucket(models.Model):
+    """Broj neuspjelih prijava po IP adresi ili korisničkom imenu u jednoj minuti.
+
+    Održavaju ga signal handleri (kroz ``activity.writer``), pa upiti za
+    detekciju brute-force napada ne moraju skenirati ``LoginEvent``.
+    """
+
+    class Kind(models.TextChoices):
+        IP = "ip", _("IP adresa")
+        USERNAME = "username", _("Korisničko ime")
+
+    kind = models.CharField(_("Vrsta ključa"), max_length=16, choices=Kind.choices)
+    key = models.CharField(_("Ključ"), max_length=150)
+    bucket_start = models.DateTimeField(_("Početak intervala"))
+    count = models.PositiveIntegerField(_("Broj neuspjelih prijava"), default=0)
+
+    class Meta:
+        verbose_name = _("Brojač neuspjelih prijava")
+        verbose_name_plural = _("Brojači neuspjelih prijava")
+        ordering = ["-bucket_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "key", "bucket_start"],
+                name="activity_failure_bucket_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["kind", "bucket_start"],
+                include=["key", "count"],
+                name="activity_failure_window_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} {self.key} @ {self.bucket_start:%Y-%m-%d %H:%M} ({self.count})"
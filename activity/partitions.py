@@ -0,0 +1,115 @@
+"""Maintenance of the monthly LoginEvent partitions.
+
+``activity_loginevent`` is range-partitioned by ``timestamp`` (see migration
+0002). New months are created ahead of time through the SQL function
+``activity_loginevent_ensure_partitions``, which the migration calls with the
+same ``ACTIVITY_LOGIN_EVENT_PARTITIONS_AHEAD``; months older than the retention
+window are detached, exported to gzipped JSON Lines and dropped, so removing a
+month never needs a large ``DELETE``.
+"""
+from __future__ import annotations
+
+import datetime
+import gzip
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from django.db import connection
+
+PARENT_TABLE = "activity_loginevent"
+PARTITION_RE = re.compile(r"^activity_loginevent_p(\d{4})_(\d{2})$")
+EXPORT_CHUNK_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    month: datetime.date
+    attached: bool
+
+
+def _add_months(month: datetime.date, count: int) -> datetime.date:
+    index = month.year * 12 + (month.month - 1) + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _month_start(day: Optional[datetime.date] = None) -> datetime.date:
+    day = day or datetime.datetime.now(datetime.timezone.utc).date()
+    return day.replace(day=1)
+
+
+def ensure_partitions(ahead: int, today: Optional[datetime.date] = None) -> List[str]:
+    """Create partitions for the current month and ``ahead`` months after it."""
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT activity_loginevent_ensure_partitions(%s, %s)",
+            [ahead, _month_start(today)],
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+def list_partitions() -> List[Partition]:
+    """Monthly partitions, attached or left detached by an interrupted archive run."""
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT c.relname, c.relispartition
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind = 'r'
+              AND n.nspname = current_schema()
+              AND c.relname LIKE %s
+            ORDER BY c.relname
+            """,
+            [r"activity\_loginevent\_p%"],
+        )
+        rows = cur.fetchall()
+
+    partitions = []
+    for name, attached in rows:
+        match = PARTITION_RE.match(name)
+        if match:
+            month = datetime.date(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append(Partition(name=name, month=month, attached=attached))
+    return partitions
+
+
+def expired_partitions(retention_months: int, today: Optional[datetime.date] = None) -> List[Partition]:
+    """Partitions whose whole month lies before the retention window."""
+    cutoff = _add_months(_month_start(today), -retention_months)
+    return [p for p in list_partitions() if p.month < cutoff]
+
+
+def archive_partition(partition: Partition, archive_dir: Path) -> Path:
+    """Detach, export and drop one partition; returns the archive path.
+
+    If the export fails the detached table is kept, and the next run picks it
+    up again.
+    """
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    target = archive_dir / f"{partition.name}.jsonl.gz"
+    partial = target.with_suffix(".gz.part")
+
+    if partition.attached:
+        with connection.cursor() as cur:
+            cur.execute(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{partition.name}"')
+
+    with gzip.open(partial, "wt", encoding="utf-8") as fh:
+        with connection.chunked_cursor() as cur:
+            cur.execute(
+                f'SELECT row_to_json(t)::text FROM "{partition.name}" t ORDER BY t."timestamp", t.id'
+            )
+            while True:
+                rows = cur.fetchmany(EXPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+                fh.writelines(f"{row[0]}\n" for row in rows)
+    os.replace(partial, target)
+
+    with connection.cursor() as cur:
+        cur.execute(f'DROP TABLE "{partition.name}"')
+    return target
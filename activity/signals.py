@@ -11,6 +11,7 @@ from django.contrib.auth.signals import (
 from django.dispatch import receiver
 
 from .models import LoginEvent
+from .writer import record_login_event
 
 UserModel = get_user_model()
 
@@ -39,7 +40,7 @@ def _get_path(request) -> str:
 
 @receiver(user_logged_in)
 def log_user_login(sender, request, user, **kwargs):
-    LoginEvent.objects.create(
+    record_login_event(
         user=user,
         username=user.get_username(),
         action=LoginEvent.Action.LOGIN,
@@ -51,7 +52,7 @@ def log_user_login(sender, request, user, **kwargs):
 
 @receiver(user_logged_out)
 def log_user_logout(sender, request, user, **kwargs):
-    LoginEvent.objects.create(
+    record_login_event(
         user=user if isinstance(user, UserModel) else None,
         username=getattr(user, "get_username", lambda: "")(),
         action=LoginEvent.Action.LOGOUT,
@@ -64,7 +65,7 @@ def log_user_logout(sender, request, user, **kwargs):
 @receiver(user_login_failed)
 def log_user_login_failed(sender, credentials, request, **kwargs):
     username = credentials.get("username", "") if isinstance(credentials, dict) else ""
-    LoginEvent.objects.create(
+    record_login_event(
         user=None,
         username=username,
         action=LoginEvent.Action.FAILURE,
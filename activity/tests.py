@@ -0,0 +1,175 @@
+import datetime
+import gzip
+import json
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from road_maintenance.testing import QueryBudgetTestMixin
+
+from . import writer
+from .models import LoginEvent, LoginFailureBucket
+from .partitions import archive_partition, ensure_partitions, expired_partitions, list_partitions
+from .writer import LoginEventBuffer
+
+
+def _failure(i):
+    return LoginEvent(username=f"korisnik-{i}", action=LoginEvent.Action.FAILURE, ip_address="192.0.2.1")
+
+
+class LoginEventBufferTests(TransactionTestCase):
+    """The buffer writes from its own thread and connection, so rows must be committed."""
+
+    def _wait_for_rows(self, count, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if LoginEvent.objects.count() >= count:
+                break
+            time.sleep(0.05)
+        self.assertEqual(LoginEvent.objects.count(), count)
+
+    def test_flushes_when_batch_is_full(self):
+        buffer = LoginEventBuffer(batch_size=3, flush_interval=60)
+        for i in range(3):
+            buffer.add(_failure(i))
+        self._wait_for_rows(3)
+        self.assertEqual(LoginFailureBucket.objects.get(kind="ip").count, 3)
+
+    def test_flushes_after_interval(self):
+        buffer = LoginEventBuffer(batch_size=100, flush_interval=0.2)
+        buffer.add(_failure(1))
+        self._wait_for_rows(1)
+
+    def test_flushes_pending_events_on_shutdown(self):
+        buffer = LoginEventBuffer(batch_size=100, flush_interval=60)
+        with mock.patch.object(buffer, "_ensure_worker"):
+            for i in range(5):
+                buffer.add(_failure(i))
+        with mock.patch.object(writer, "_buffer", buffer):
+            self.assertEqual(writer.flush_login_events(), 5)
+        self.assertEqual(LoginEvent.objects.count(), 5)
+
+    def test_failed_batch_is_retried(self):
+        buffer = LoginEventBuffer(batch_size=100, flush_interval=60, max_retries=2)
+        with mock.patch.object(buffer, "_ensure_worker"):
+            for i in range(4):
+                buffer.add(_failure(i))
+        with mock.patch.object(LoginEvent.objects, "bulk_create", side_effect=OperationalError("restart")):
+            self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(len(buffer._events), 4)
+        # Nothing of the failed batch was committed, counters included.
+        self.assertFalse(LoginFailureBucket.objects.exists())
+        self.assertEqual(buffer.flush(), 4)
+        self.assertEqual(LoginEvent.objects.count(), 4)
+        self.assertEqual(LoginFailureBucket.objects.get(kind="ip").count, 4)
+
+    def test_batch_is_dropped_after_max_retries(self):
+        buffer = LoginEventBuffer(batch_size=100, flush_interval=60, max_retries=1)
+        with mock.patch.object(buffer, "_ensure_worker"):
+            buffer.add(_failure(1))
+        with mock.patch.object(LoginEvent.objects, "bulk_create", side_effect=OperationalError("restart")):
+            buffer.flush()
+            self.assertEqual(len(buffer._events), 1)
+            buffer.flush()
+        self.assertEqual(buffer._events, [])
+        self.assertEqual(buffer.flush(), 0)
+        self.assertFalse(LoginEvent.objects.exists())
+
+
+class LoginEventChangelistTests(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser("admin", password="admin")
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+        self.added = 0
+
+    def _events(self, n):
+        """Logins of ``n`` different users, so each row has its own related user."""
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(username=f"korisnik-{i}") for i in range(self.added, self.added + n)
+        )
+        self.added += n
+        LoginEvent.objects.bulk_create(
+            LoginEvent(user=user, username=user.username, action=LoginEvent.Action.LOGIN, ip_address="192.0.2.1")
+            for user in users
+        )
+
+    def test_changelist(self):
+        self.assertQueriesIndependentOfRows(reverse("admin:activity_loginevent_changelist"), self._events)
+
+
+def _at(year, month, day):
+    return datetime.datetime(year, month, day, 12, tzinfo=datetime.timezone.utc)
+
+
+class PartitionTests(TestCase):
+    """Months far from today, so they never clash with the migration's partitions."""
+
+    def _rows_in(self, table):
+        with connection.cursor() as cur:
+            cur.execute(f'SELECT username FROM "{table}" ORDER BY username')
+            return [row[0] for row in cur.fetchall()]
+
+    def _partition(self, name):
+        return next((p for p in list_partitions() if p.name == name), None)
+
+    def test_ensure_partitions_creates_months_ahead_and_moves_default_rows(self):
+        LoginEvent.objects.create(username="rani", action=LoginEvent.Action.LOGIN, timestamp=_at(2099, 2, 10))
+        self.assertEqual(self._rows_in("activity_loginevent_default"), ["rani"])
+
+        names = ensure_partitions(2, today=datetime.date(2099, 1, 15))
+        self.assertEqual(
+            names,
+            ["activity_loginevent_p2099_01", "activity_loginevent_p2099_02", "activity_loginevent_p2099_03"],
+        )
+        self.assertEqual(self._rows_in("activity_loginevent_p2099_02"), ["rani"])
+        self.assertEqual(self._rows_in("activity_loginevent_default"), [])
+        self.assertEqual(ensure_partitions(2, today=datetime.date(2099, 1, 1)), names)
+        LoginEvent.objects.create(username="novi", action=LoginEvent.Action.LOGIN, timestamp=_at(2099, 3, 31))
+        self.assertEqual(self._rows_in("activity_loginevent_p2099_03"), ["novi"])
+
+    def test_expired_partitions(self):
+        ensure_partitions(1, today=datetime.date(2001, 1, 1))
+        expired = expired_partitions(12, today=datetime.date(2002, 2, 20))
+        self.assertEqual([p.name for p in expired], ["activity_loginevent_p2001_01"])
+        self.assertEqual(expired[0].month, datetime.date(2001, 1, 1))
+        self.assertEqual(expired_partitions(13, today=datetime.date(2002, 2, 20)), [])
+
+    def test_archive_partition(self):
+        ensure_partitions(0, today=datetime.date(2001, 1, 1))
+        for username, day in (("drugi", 20), ("prvi", 5)):
+            LoginEvent.objects.create(username=username, action=LoginEvent.Action.FAILURE, timestamp=_at(2001, 1, day))
+        partition = self._partition("activity_loginevent_p2001_01")
+        self.assertTrue(partition.attached)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            target = archive_partition(partition, Path(archive_dir))
+            with gzip.open(target, "rt", encoding="utf-8") as fh:
+                rows = [json.loads(line) for line in fh]
+            self.assertEqual(sorted(Path(archive_dir).iterdir()), [target])
+        self.assertEqual([row["username"] for row in rows], ["prvi", "drugi"])
+        self.assertIsNone(self._partition(partition.name))
+        self.assertFalse(LoginEvent.objects.filter(timestamp__year=2001).exists())
+
+    def test_archive_picks_up_a_detached_partition(self):
+        ensure_partitions(0, today=datetime.date(2001, 1, 1))
+        LoginEvent.objects.create(username="prvi", action=LoginEvent.Action.LOGIN, timestamp=_at(2001, 1, 5))
+        with connection.cursor() as cur:
+            cur.execute("ALTER TABLE activity_loginevent DETACH PARTITION activity_loginevent_p2001_01")
+        partition = self._partition("activity_loginevent_p2001_01")
+        self.assertFalse(partition.attached)
+        self.assertIn(partition, expired_partitions(12, today=datetime.date(2002, 6, 1)))
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            target = archive_partition(partition, Path(archive_dir))
+            with gzip.open(target, "rt", encoding="utf-8") as fh:
+                self.assertEqual([json.loads(line)["username"] for line in fh], ["prvi"])
+        self.assertIsNone(self._partition(partition.name))
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import LoginFailureReportView
+
+app_name = 'activity'
+
+urlpatterns = [
+    path('login-failures/', LoginFailureReportView.as_view(), name='login-failures'),
+]
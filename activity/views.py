@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.views import View
+
+from .bruteforce import failure_offenders
+from .models import LoginFailureBucket
+
+
+def _int_param(request, name: str, default: int, minimum: int, maximum: int) -> int:
+    raw = request.GET.get(name)
+    if raw in (None, ""):
+        return default
+    value = int(raw)
+    if not minimum <= value <= maximum:
+        raise ValueError(name)
+    return value
+
+
+class LoginFailureReportView(View):
+    """IP adrese ili korisnička imena s više od N neuspjelih prijava u zadnjih M minuta."""
+
+    def get(self, request):
+        user = request.user
+        if not (user.is_active and user.is_staff):
+            return JsonResponse(
+                {"code": "FORBIDDEN", "detail": "Potrebna su administratorska prava."},
+                status=403,
+            )
+
+        kind = request.GET.get("by", LoginFailureBucket.Kind.IP)
+        if kind not in LoginFailureBucket.Kind.values:
+            return JsonResponse(
+                {"code": "BAD_PARAM", "detail": "Parametar 'by' mora biti 'ip' ili 'username'."},
+                status=400,
+            )
+
+        max_minutes = settings.ACTIVITY_FAILURE_BUCKET_RETENTION_HOURS * 60
+        try:
+            threshold = _int_param(request, "threshold", 10, 0, 1_000_000)
+            minutes = _int_param(request, "minutes", 15, 1, max_minutes)
+            limit = _int_param(request, "limit", 100, 1, 1000)
+        except ValueError:
+            return JsonResponse(
+                {"code": "BAD_PARAM", "detail": "Neispravan parametar upita."},
+                status=400,
+            )
+
+        offenders = failure_offenders(kind, threshold, minutes, limit)
+        return JsonResponse(
+            {
+                "by": kind,
+                "threshold": threshold,
+                "minutes": minutes,
+                "results": [
+                    {
+                        "key": row["key"],
+                        "failures": row["failures"],
+                        "first_seen": row["first_seen"].isoformat(),
+                        "last_seen": row["last_seen"].isoformat(),
+                    }
+                    for row in offenders
+                ],
+            },
+            status=200,
+        )
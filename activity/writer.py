@@ -0,0 +1,182 @@
+"""Buffered writer for LoginEvent rows.
+
+The auth signal handlers hand every event to :func:`record_login_event`. When
+``ACTIVITY_LOGIN_EVENTS_BUFFERED`` is enabled the events are kept in memory and
+written with one ``bulk_create`` once the batch is full or the flush interval
+elapses, so a burst of failed logins does not turn into one INSERT per request.
+With the setting disabled each event is saved synchronously, as before.
+Either way FAILURE events also bump the brute-force counters (see
+``activity.bruteforce``), in the same transaction as the events.
+
+A batch that fails to write (database restart, lost connection) is put back
+at the head of the buffer and retried on the next flush, up to
+``ACTIVITY_LOGIN_EVENTS_MAX_RETRIES`` times in a row. The buffer holds at
+most ``max_pending`` events; beyond that the oldest are dropped and logged.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from road_maintenance.metrics import counter, histogram
+
+from .bruteforce import record_failures
+from .models import LoginEvent
+
+logger = logging.getLogger(__name__)
+
+LOGIN_EVENT_WRITE_SECONDS = histogram(
+    "roadmaint_login_event_write_seconds",
+    "LoginEvent write, per batch (buffered) or per event (sync).",
+    ["mode"],
+)
+LOGIN_EVENTS_WRITTEN = counter("roadmaint_login_events_written_total", "LoginEvent rows written.", ["mode"])
+
+
+class LoginEventBuffer:
+    """Thread-safe in-memory batch of unsaved LoginEvent instances."""
+
+    def __init__(
+        self,
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+        max_retries: int = 5,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.1, flush_interval)
+        self.max_retries = max(0, max_retries)
+        self.max_pending = max_pending or self.batch_size * 50
+        self._events: List[LoginEvent] = []
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def add(self, event: LoginEvent) -> None:
+        self._ensure_worker()
+        with self._lock:
+            self._events.append(event)
+            full = len(self._events) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write all pending events; returns the number of rows written."""
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return 0
+        try:
+            with LOGIN_EVENT_WRITE_SECONDS.labels(mode="buffered").time(), transaction.atomic():
+                LoginEvent.objects.bulk_create(events, batch_size=self.batch_size)
+                record_failures(events)
+        except Exception:
+            self._requeue(events)
+            return 0
+        self._failures = 0
+        LOGIN_EVENTS_WRITTEN.labels(mode="buffered").inc(len(events))
+        return len(events)
+
+    def _requeue(self, events: List[LoginEvent]) -> None:
+        self._failures += 1
+        if self._failures > self.max_retries:
+            logger.exception("Dropping %d login events after %d failed writes", len(events), self._failures)
+            self._failures = 0
+            return
+        logger.exception("Failed to write %d login events (attempt %d), will retry", len(events), self._failures)
+        # The rolled-back bulk_create may already have set primary keys.
+        for event in events:
+            event.pk = None
+            event._state.adding = True
+        with self._lock:
+            self._events[:0] = events
+            overflow = len(self._events) - self.max_pending
+            if overflow > 0:
+                del self._events[:overflow]
+        if overflow > 0:
+            logger.error("Login event buffer full, dropped %d oldest events", overflow)
+
+    def reset(self) -> None:
+        """Forget pending events and the worker (used in a freshly forked child)."""
+        self._events = []
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run,
+                name="login-event-writer",
+                daemon=True,
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            pending = bool(self._events)
+            if self.flush() or pending:
+                # The worker thread owns its own connection; do not keep it open
+                # between batches, nor reuse it after a failed write.
+                connections.close_all()
+
+
+_buffer: Optional[LoginEventBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer() -> LoginEventBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = LoginEventBuffer(
+                    batch_size=getattr(settings, "ACTIVITY_LOGIN_EVENTS_BATCH_SIZE", 200),
+                    flush_interval=getattr(settings, "ACTIVITY_LOGIN_EVENTS_FLUSH_INTERVAL", 2.0),
+                    max_retries=getattr(settings, "ACTIVITY_LOGIN_EVENTS_MAX_RETRIES", 5),
+                )
+    return _buffer
+
+
+def record_login_event(**fields) -> LoginEvent:
+    """Create a LoginEvent, either immediately or through the buffer."""
+    event = LoginEvent(**fields)
+    if getattr(settings, "ACTIVITY_LOGIN_EVENTS_BUFFERED", False):
+        get_buffer().add(event)
+    else:
+        with LOGIN_EVENT_WRITE_SECONDS.labels(mode="sync").time(), transaction.atomic():
+            event.save()
+            record_failures([event])
+        LOGIN_EVENTS_WRITTEN.labels(mode="sync").inc()
+    return event
+
+
+def flush_login_events() -> int:
+    if _buffer is None:
+        return 0
+    return _buffer.flush()
+
+
+def _reset_after_fork() -> None:
+    # Events queued in the parent are flushed by the parent.
+    if _buffer is not None:
+        _buffer.reset()
+
+
+atexit.register(flush_login_events)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,123 @@
+"""Benchmark cases for the hot paths.
+
+* ``WorkItem.save()`` per unit type (``m2``; ``kom`` with 10, 1,000 and
+  10,000 markers), including the PostGIS geometry build;
+* ``WorkOrder`` number allocation;
+* public review GET and POST through the full middleware stack.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import LineString
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from customer_review.models import CustomerReview, ReviewToken
+from customers.models import Customer
+from operations.models import OperationType
+from projects.models import Project, WorkItem, WorkOrder
+from roads.models import RoadSection
+
+from .runner import Case
+
+# D8 kod Splita, HTRS96/TM (EPSG:3765); ~2 km.
+SECTION_COORDS = [(492800, 4818200), (493400, 4818650), (494100, 4818900), (494750, 4819400)]
+
+
+def _fixtures() -> Dict[str, object]:
+    user = get_user_model().objects.create_user(username="bench-user", password="bench")
+    customer = Customer.objects.create(
+        name="Benchmark d.o.o.",
+        oib="99999999999",
+        street_address="Ulica 1",
+        postal_code="21000",
+        city="Split",
+    )
+    project = Project.objects.create(name="Benchmark", customer=customer, start_date=datetime.date.today())
+    work_order = WorkOrder.objects.create(project=project, title="Benchmark", created_by=user)
+    section = RoadSection.objects.create(
+        name="Benchmark dionica",
+        road_number="D8",
+        geom=LineString(SECTION_COORDS, srid=3765),
+        road_width=Decimal("6.50"),
+    )
+    return {"user": user, "project": project, "work_order": work_order, "section": section}
+
+
+def _operation(unit: str) -> OperationType:
+    return OperationType.objects.create(name=f"Benchmark {unit}", unit=unit, base_price=Decimal("1.5"))
+
+
+def _workitem_save(unit: str, quantity: int) -> Callable[[], Callable[[], object]]:
+    def setup():
+        data = _fixtures()
+        operation = _operation(unit)
+        item = WorkItem(
+            work_order=data["work_order"],
+            road_section=data["section"],
+            operation_type=operation,
+            road_side="right",
+            quantity=Decimal(quantity),
+        )
+        return item.save
+
+    return setup
+
+
+def _workorder_number() -> Callable[[], object]:
+    data = _fixtures()
+    order = WorkOrder(project=data["project"], title="Novi nalog", created_by=data["user"])
+    return order.save
+
+
+def _review_token(data) -> ReviewToken:
+    item = WorkItem(
+        work_order=data["work_order"],
+        road_section=data["section"],
+        operation_type=_operation("m2"),
+        road_side="left",
+        quantity=Decimal("100"),
+    )
+    item.save()
+    review = CustomerReview.objects.create(
+        work_item=item,
+        status=CustomerReview.Status.PENDING,
+        data_snapshot_hash="benchmark-hash",
+    )
+    return ReviewToken.objects.create(
+        customer_review=review,
+        user=data["user"],
+        expires_at=timezone.now() + datetime.timedelta(days=1),
+    )
+
+
+def _public_review_get() -> Callable[[], object]:
+    token = _review_token(_fixtures())
+    client = Client()
+    url = reverse("customer_review:review-public", args=[token.jti])
+    return lambda: client.get(url)
+
+
+def _public_review_post() -> Callable[[], object]:
+    token = _review_token(_fixtures())
+    client = Client()
+    url = reverse("customer_review:review-public", args=[token.jti])
+    body = json.dumps({"action": "accepted", "data_snapshot_hash": "benchmark-hash"})
+    return lambda: client.post(url, body, content_type="application/json")
+
+
+CASES: List[Case] = [
+    Case("workitem_save_m2", _workitem_save("m2", 250)),
+    Case("workitem_save_kom_10", _workitem_save("kom", 10)),
+    Case("workitem_save_kom_1000", _workitem_save("kom", 1000)),
+    Case("workitem_save_kom_10000", _workitem_save("kom", 10000)),
+    Case("workorder_number", _workorder_number),
+    Case("public_review_get", _public_review_get),
+    Case("public_review_post", _public_review_post),
+]
@@ -0,0 +1,95 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from create_test_data import ANCHORS, copy_rows, random_road_number
+from roads.models import RoadSection
+from search.autocomplete import autocomplete, cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Mjeri latenciju autocomplete pretrage dionica (p50/p95/p99) nad "
+        "bazom. Uz --fill tablica se privremeno dopuni sintetičkim dionicama "
+        "do --sections (zadano 1 000 000) i na kraju vrati u prvotno stanje."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sections", type=int, default=1_000_000, help="Ciljani broj dionica.")
+        parser.add_argument("--fill", action="store_true", help="Dopuni tablicu sintetičkim dionicama.")
+        parser.add_argument("--keep", action="store_true", help="Zadrži dopunjene dionice.")
+        parser.add_argument("--queries", type=int, default=2000, help="Broj upita po prolazu.")
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options["sections"] < 1 or options["queries"] < 1:
+            raise CommandError("Broj dionica i upita mora biti pozitivan.")
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            existing = RoadSection.objects.count()
+            missing = options["sections"] - existing
+            if missing > 0 and options["fill"]:
+                started = time.perf_counter()
+                self._fill(missing, rng)
+                with connection.cursor() as cur:
+                    cur.execute("ANALYZE roads_roadsection")
+                self.stdout.write(f"Dodano {missing} dionica ({time.perf_counter() - started:.1f} s)")
+            elif missing > 0:
+                self.stdout.write(self.style.WARNING(f"U bazi je {existing} dionica; za {options['sections']} koristi --fill."))
+
+            terms = self._terms(options["queries"], rng)
+            if not terms:
+                raise CommandError("Nema dionica za upite.")
+            cache.clear()
+            self._run("bez predmemorije", terms, options["limit"], use_cache=False)
+            self._run("s predmemorijom", terms, options["limit"], use_cache=True)
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def _fill(self, count, rng):
+        towns = [name for name, _x, _y in ANCHORS]
+        now = timezone.now()
+        copy_rows(
+            "roads_roadsection",
+            ("name", "road_number", "description", "is_active", "created_at"),
+            (
+                (f"{rng.choice(towns)} – {rng.choice(towns)} {n}", random_road_number(rng), "", True, now)
+                for n in range(1, count + 1)
+            ),
+        )
+
+    @staticmethod
+    def _terms(count, rng):
+        """Inputs as typed: growing prefixes of real names and road numbers, some with a typo."""
+        sample = list(
+            RoadSection.objects.order_by("?").values_list("name", "road_number")[: max(1, count // 4)]
+        )
+        terms = []
+        while sample and len(terms) < count:
+            name, road_number = rng.choice(sample)
+            text = road_number if road_number and rng.random() < 0.2 else name
+            typed = [text[:n] for n in range(1, min(len(text), 12) + 1)]
+            if len(text) > 4 and rng.random() < 0.2:
+                k = rng.randrange(1, len(text) - 1)
+                typed.append(text[:k] + text[k + 1:])
+            terms.extend(typed)
+        return terms[:count]
+
+    def _run(self, label, terms, limit, use_cache):
+        timings = np.empty(len(terms))
+        hits = 0
+        for i, term in enumerate(terms):
+            started = time.perf_counter()
+            _results, cached = autocomplete("road_section", term, limit=limit, use_cache=use_cache)
+            timings[i] = (time.perf_counter() - started) * 1000
+            hits += cached
+        p50, p95, p99 = np.percentile(timings, (50, 95, 99))
+        self.stdout.write(
+            f"{label:17} {len(terms)} upita: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, "
+            f"max {timings.max():.1f} ms, pogodaka predmemorije {hits}"
+        )
@@ -0,0 +1,154 @@
+import datetime
+import os
+import random
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from customers.models import Customer
+from invoicing.generation import create_invoices, generate_invoices, render_documents
+from invoicing.ubl import UNIT_CODES, InvoiceDocument, Line, Party
+from operations.models import OperationType
+from projects.models import Project, WorkItem, WorkOrder
+
+PERIOD = datetime.date(2026, 9, 1)
+SUPPLIER = {
+    "name": "Ceste d.o.o.", "oib": "12345678903", "vat_id": "HR12345678903", "street": "Ilica 1",
+    "city": "Zagreb", "postal_code": "10000", "country": "HR", "iban": "HR1723600001101234565", "email": "",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mjeri pisanje UBL e-računa: sintetički računi pišu se serijski i u "
+        "skupu procesa, ispisuje se vrijeme i računa u sekundi. Uz --database "
+        "mjeri i cijeli put kroz bazu (zbrajanje stavki rada, numeriranje, "
+        "XML) nad privremeno dodanim projektima, koji se na kraju poništavaju."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--invoices", type=int, default=1000, help="Broj računa.")
+        parser.add_argument("--lines", type=int, default=12, help="Prosječan broj stavki po računu.")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Broj procesa.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--database", action="store_true", help="Mjeri i generiranje iz baze.")
+
+    def handle(self, *args, **options):
+        if options["invoices"] < 1 or options["lines"] < 1:
+            raise CommandError("Broj računa i stavki mora biti pozitivan.")
+        documents = self._documents(options["invoices"], options["lines"], random.Random(options["seed"]))
+        runs = [1] if options["workers"] <= 1 else [1, options["workers"]]
+        for workers in runs:
+            with tempfile.TemporaryDirectory() as tmp:
+                started = time.perf_counter()
+                written = sum(size for *_rest, size in render_documents(documents, Path(tmp), workers))
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{workers:3d} proces(a): {elapsed:7.2f} s, {len(documents) / elapsed:8.1f} računa/s, "
+                f"{written / 1024 / 1024:.1f} MiB"
+            )
+        if options["database"]:
+            for workers in runs:
+                self._database_run(options["invoices"], options["lines"], workers, random.Random(options["seed"]))
+
+    def _database_run(self, count, lines, workers, rng):
+        """One invoice per synthetic project, generated from WorkItems and rolled back."""
+        with transaction.atomic(), override_settings(INVOICING_SUPPLIER=SUPPLIER):
+            items = self._seed(count, lines, rng)
+            with tempfile.TemporaryDirectory() as tmp:
+                started = time.perf_counter()
+                created, _supplementary = create_invoices(PERIOD, issue_date=PERIOD)
+                created_at = time.perf_counter()
+                result = generate_invoices(PERIOD, workers=workers, output_dir=Path(tmp), issue_date=PERIOD)
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        self.stdout.write(
+            f"{workers:3d} proces(a), baza: {items} stavki rada, {created} računa; zbrajanje i numeriranje "
+            f"{created_at - started:.2f} s, XML {elapsed - (created_at - started):.2f} s, "
+            f"ukupno {elapsed:.2f} s ({result.rendered / elapsed:.1f} računa/s)"
+        )
+
+    @staticmethod
+    def _seed(count, lines, rng):
+        user, _created = get_user_model().objects.get_or_create(username="benchmark-invoicing")
+        operations = OperationType.objects.bulk_create(
+            OperationType(name=f"Operacija {i}", unit=unit, base_price=Decimal(rng.randrange(10, 5000)) / 100)
+            for i, unit in enumerate(rng.choice(list(UNIT_CODES)) for _ in range(2 * lines))
+        )
+        used = set(Customer.objects.values_list("oib", flat=True))
+        oibs = []
+        while len(oibs) < count:
+            oib = f"{rng.randrange(10**10, 10**11)}"
+            if oib not in used:
+                used.add(oib)
+                oibs.append(oib)
+        customers = Customer.objects.bulk_create(
+            Customer(name=f"Kupac {oib}", oib=oib, street_address="Savska 2", postal_code="21000", city="Split")
+            for oib in oibs
+        )
+        projects = Project.objects.bulk_create(
+            Project(name=f"Održavanje {c.oib}", customer=c, start_date=PERIOD) for c in customers
+        )
+        orders = WorkOrder.objects.bulk_create(
+            WorkOrder(
+                number=f"BENCH-{p.pk}", project=p, title="Nalog", created_by=user,
+                status="completed", completed_date=PERIOD + datetime.timedelta(days=rng.randrange(28)),
+            )
+            for p in projects
+        )
+        items = []
+        for order in orders:
+            for operation in rng.sample(operations, rng.randint(1, min(2 * lines, len(operations)))):
+                quantity = Decimal(rng.randrange(1, 10_000)) / 10
+                items.append(
+                    WorkItem(
+                        work_order=order, operation_type=operation, road_side="notap", quantity=quantity,
+                        unit_price=operation.base_price, total_price=quantity * operation.base_price,
+                    )
+                )
+        WorkItem.objects.bulk_create(items, batch_size=5000)
+        return len(items)
+
+    @staticmethod
+    def _documents(count, lines, rng):
+        supplier = Party(
+            name="Ceste d.o.o.", oib="12345678903", vat_id="HR12345678903",
+            street="Ilica 1", city="Zagreb", postal_code="10000", iban="HR1723600001101234565",
+        )
+        units = list(UNIT_CODES)
+        documents = []
+        for n in range(1, count + 1):
+            oib = f"{rng.randrange(10**10, 10**11)}"
+            documents.append(
+                InvoiceDocument(
+                    invoice_id=n,
+                    number=f"{n}/1/1",
+                    issue_date="2026-10-01",
+                    due_date="2026-10-31",
+                    period_start="2026-09-01",
+                    period_end="2026-09-30",
+                    supplier=supplier,
+                    customer=Party(
+                        name=f"Kupac {n} d.o.o.", oib=oib, vat_id=f"HR{oib}",
+                        street="Savska 2", city="Split", postal_code="21000", iban="HR6623400091110651272",
+                    ),
+                    project_name=f"Održavanje {n}",
+                    contract_number=f"UG-{n:05d}",
+                    lines=[
+                        Line(
+                            description=f"Operacija {i}",
+                            unit=rng.choice(units),
+                            quantity=Decimal(rng.randrange(1, 100_000)) / 10,
+                            net_amount=Decimal(rng.randrange(100, 10_000_000)) / 100,
+                        )
+                        for i in range(rng.randint(1, 2 * lines))
+                    ],
+                )
+            )
+        return documents
@@ -0,0 +1,78 @@
+import random
+import time
+
+import numpy as np
+import shapely
+from django.core.management.base import BaseCommand, CommandError
+
+from create_test_data import random_linestring
+from roads.map_matching import covered_lengths, match_points
+from roads.network import build_network
+
+
+class Command(BaseCommand):
+    help = (
+        "Mjeri propusnost uparivanja GPS točaka s dionicama na sintetičkoj "
+        "mreži u memoriji (bez baze): točaka u sekundi na jednoj jezgri."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sections", type=int, default=20_000, help="Broj sintetičkih dionica.")
+        parser.add_argument("--points", type=int, default=1_000_000, help="Broj GPS točaka.")
+        parser.add_argument("--spacing", type=float, default=2.0, help="Razmak točaka duž traga (m).")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options["sections"] < 1 or options["points"] < 1:
+            raise CommandError("Broj dionica i točaka mora biti pozitivan.")
+        rng = random.Random(options["seed"])
+        started = time.perf_counter()
+        lines = shapely.from_wkt(
+            [
+                "LINESTRING (" + ", ".join(f"{x} {y}" for x, y in random_linestring(rng)) + ")"
+                for _ in range(options["sections"])
+            ]
+        )
+        network = build_network(np.arange(1, len(lines) + 1), lines)
+        self.stdout.write(f"Mreža: {len(network)} dionica ({time.perf_counter() - started:.1f} s)")
+
+        x, y = self._track(network, options["points"], options["spacing"], np.random.default_rng(options["seed"]))
+
+        started = time.perf_counter()
+        match = match_points(network, x, y)
+        matched_at = time.perf_counter()
+        coverage = covered_lengths(network, match)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Uparivanje: {matched_at - started:.2f} s, pokrivenost: {elapsed - (matched_at - started):.2f} s"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(x)} točaka, {match.matched} upareno, {len(coverage)} dionica/strana, "
+                f"{len(x) / elapsed:,.0f} točaka/s"
+            )
+        )
+
+    @staticmethod
+    def _track(network, points, spacing, rng):
+        """Points driven along random sections, 1–4 m to one side, with 1 m jitter."""
+        x, y = np.empty(points), np.empty(points)
+        filled = 0
+        while filled < points:
+            k = int(rng.integers(len(network)))
+            line, length = network.lines[k], network.lengths[k]
+            count = min(int(length // spacing), points - filled)
+            if count < 2:
+                continue
+            along = np.linspace(0, length, count)
+            at = shapely.get_coordinates(shapely.line_interpolate_point(line, along))
+            ahead = shapely.get_coordinates(shapely.line_interpolate_point(line, np.minimum(along + 1.0, length)))
+            dx, dy = ahead[:, 0] - at[:, 0], ahead[:, 1] - at[:, 1]
+            norm = np.hypot(dx, dy)
+            norm[norm == 0] = 1.0
+            offset = rng.choice((-1.0, 1.0)) * rng.uniform(1.0, 4.0)
+            x[filled:filled + count] = at[:, 0] - dy / norm * offset + rng.normal(0, 1.0, count)
+            y[filled:filled + count] = at[:, 1] + dx / norm * offset + rng.normal(0, 1.0, count)
+            filled += count
+        return x, y
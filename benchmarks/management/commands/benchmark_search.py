@@ -0,0 +1,111 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from create_test_data import ANCHORS, OPERATIONS
+from search.models import SearchDocument
+from search.query import search
+
+TARGET_MS = 50
+
+# Synthetic documents get negative object_ids so they never clash with real ones.
+FILL_SQL = """
+INSERT INTO search_searchdocument (kind, object_id, title, subtitle, vector, updated_at)
+SELECT kind, -n, left(number || ' – ' || op || ', ' || town, 500), number,
+       setweight(to_tsvector('hr_unaccent', search_identifier_words(number)), 'A')
+       || setweight(to_tsvector('hr_unaccent', op || ' ' || town), 'B'),
+       now()
+FROM (
+    SELECT n,
+           CASE WHEN n %% 10 = 0 THEN 'work_order' ELSE 'work_item' END AS kind,
+           'RN-' || (2020 + n %% 7) || '-' || lpad((n / 7 %% 10000)::text, 4, '0') AS number,
+           (%(towns)s::text[])[1 + n %% cardinality(%(towns)s::text[])] AS town,
+           (%(operations)s::text[])[1 + (n / 3) %% cardinality(%(operations)s::text[])] AS op
+    FROM generate_series(%(start)s, %(stop)s) AS n
+) t
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mjeri latenciju pretrage (/api/search/) nad search_searchdocument "
+        "(p50/p95/p99). Uz --fill tablica se privremeno dopuni sintetičkim "
+        "dokumentima radnih naloga i stavki do --documents (zadano 2 000 000) "
+        "i na kraju vrati u prvotno stanje."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--documents", type=int, default=2_000_000, help="Ciljani broj dokumenata.")
+        parser.add_argument("--fill", action="store_true", help="Dopuni tablicu sintetičkim dokumentima.")
+        parser.add_argument("--keep", action="store_true", help="Zadrži dopunjene dokumente.")
+        parser.add_argument("--queries", type=int, default=1000, help="Broj upita.")
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options["documents"] < 1 or options["queries"] < 1:
+            raise CommandError("Broj dokumenata i upita mora biti pozitivan.")
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            existing = SearchDocument.objects.count()
+            missing = options["documents"] - existing
+            if missing > 0 and options["fill"]:
+                started = time.perf_counter()
+                with connection.cursor() as cur:
+                    cur.execute(
+                        FILL_SQL,
+                        {
+                            "towns": [name for name, _x, _y in ANCHORS],
+                            "operations": [name for name, _unit, _price in OPERATIONS],
+                            "start": 1,
+                            "stop": missing,
+                        },
+                    )
+                    cur.execute("ANALYZE search_searchdocument")
+                self.stdout.write(f"Dodano {missing} dokumenata ({time.perf_counter() - started:.1f} s)")
+            elif missing > 0:
+                self.stdout.write(
+                    self.style.WARNING(f"U bazi je {existing} dokumenata; za {options['documents']} koristi --fill.")
+                )
+
+            terms = self._terms(options["queries"], rng)
+            timings = np.empty(len(terms))
+            empty = 0
+            for i, term in enumerate(terms):
+                started = time.perf_counter()
+                hits = search(term, limit=options["limit"])
+                timings[i] = (time.perf_counter() - started) * 1000
+                empty += not hits
+            p50, p95, p99 = np.percentile(timings, (50, 95, 99))
+            style = self.style.SUCCESS if p95 < TARGET_MS else self.style.WARNING
+            self.stdout.write(
+                style(
+                    f"{len(terms)} upita: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, "
+                    f"max {timings.max():.1f} ms, bez rezultata {empty} (cilj p95 < {TARGET_MS} ms)"
+                )
+            )
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    @staticmethod
+    def _terms(count, rng):
+        """Inputs as typed: short and full work-order numbers, town and operation prefixes."""
+        towns = [name for name, _x, _y in ANCHORS]
+        operations = [name for name, _unit, _price in OPERATIONS]
+        terms = []
+        while len(terms) < count:
+            number = f"RN-{rng.randint(2020, 2026)}-{rng.randint(0, 9999):04d}"
+            word = rng.choice(towns) if rng.random() < 0.5 else rng.choice(operations).split()[0]
+            terms.extend(
+                (
+                    "rn",
+                    number[:7],
+                    number,
+                    word[: rng.randint(2, len(word))],
+                    f"{word} {number[3:7]}",
+                )
+            )
+        return terms[:count]
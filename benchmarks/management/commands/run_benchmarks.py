@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.cases import CASES
+from benchmarks.runner import build_report, compare, run_case
+from create_test_data import PRESETS, generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Pokreće mjerenja vrućih putanja (WorkItem.save, numeriranje naloga, "
+        "javni review GET/POST), sprema rezultate u JSON i uspoređuje ih s baznim."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Broj ponavljanja po slučaju.")
+        parser.add_argument("--case", action="append", dest="cases", help="Pokreni samo navedene slučajeve.")
+        parser.add_argument("--output", help="Datoteka za JSON rezultate.")
+        parser.add_argument("--compare", help="JSON rezultati s kojima se uspoređuje.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.15,
+            help="Dopušteni rast vremena/memorije (udio, npr. 0.15 = 15%%).",
+        )
+        parser.add_argument(
+            "--dataset",
+            choices=sorted(PRESETS),
+            help="Prije mjerenja generiraj sintetički skup podataka (create_test_data.py).",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Sjeme generatora skupa podataka.")
+
+    def handle(self, *args, **options):
+        cases = CASES
+        if options["cases"]:
+            unknown = set(options["cases"]) - {c.name for c in CASES}
+            if unknown:
+                raise CommandError(f"Nepoznati slučajevi: {', '.join(sorted(unknown))}")
+            cases = [c for c in CASES if c.name in options["cases"]]
+
+        if options["dataset"]:
+            counts = generate(**PRESETS[options["dataset"]], seed=options["seed"], verbose=False)
+            self.stdout.write(", ".join(f"{k}={v}" for k, v in counts.items()))
+
+        results = []
+        for case in cases:
+            result = run_case(case, options["repeat"])
+            results.append(result)
+            self.stdout.write(
+                f"{result.name:26} {result.wall_ms_median:10.2f} ms  "
+                f"{result.queries:4d} upita  {result.peak_kib:10.1f} KiB"
+            )
+
+        report = build_report(results)
+        if options["dataset"]:
+            report["meta"]["dataset"] = {"preset": options["dataset"], "seed": options["seed"]}
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+        if not options["compare"]:
+            return
+        baseline = json.loads(Path(options["compare"]).read_text(encoding="utf-8"))
+        rows = compare(baseline, report, options["threshold"])
+        self.stdout.write("")
+        for row in rows:
+            if row["status"] == "NEW":
+                self.stdout.write(f"{row['name']:26} NEW")
+                continue
+            line = (
+                f"{row['name']:26} {row['status']:10} vrijeme {row['wall_delta']:+7.1%}  "
+                f"memorija {row['peak_delta']:+7.1%}  upiti {row['queries'][0]}→{row['queries'][1]}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row["status"] == "REGRESSION" else line)
+
+        regressions = [row["name"] for row in rows if row["status"] == "REGRESSION"]
+        if regressions:
+            raise CommandError(f"Regresije: {', '.join(regressions)}")
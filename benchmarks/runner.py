@@ -0,0 +1,151 @@
+"""Measurement and comparison helpers for the benchmark suite.
+
+Every case runs inside a transaction that is rolled back, so the suite can be
+pointed at any scratch database (see ``docker-compose.bench.yml``). Wall time
+is measured over ``repeat`` runs without tracing; memory is measured in one
+extra run under ``tracemalloc`` so tracing overhead does not skew the timings.
+"""
+from __future__ import annotations
+
+import datetime
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List
+
+import django
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+class _Rollback(Exception):
+    pass
+
+
+@dataclass
+class CaseResult:
+    name: str
+    repeat: int
+    wall_ms_median: float
+    wall_ms_min: float
+    queries: int
+    peak_kib: float
+
+
+@dataclass
+class Case:
+    """``setup`` builds fresh state and returns the callable to measure."""
+
+    name: str
+    setup: Callable[[], Callable[[], object]]
+
+
+def _in_rollback(fn: Callable[[], object]) -> object:
+    result = None
+    try:
+        with transaction.atomic():
+            result = fn()
+            raise _Rollback
+    except _Rollback:
+        pass
+    return result
+
+
+def run_case(case: Case, repeat: int) -> CaseResult:
+    timings: List[float] = []
+    queries = 0
+
+    def timed():
+        nonlocal queries
+        target = case.setup()
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            target()
+            elapsed = time.perf_counter() - started
+        queries = len(ctx.captured_queries)
+        return elapsed
+
+    for _ in range(repeat):
+        timings.append(_in_rollback(timed))
+
+    def traced():
+        target = case.setup()
+        tracemalloc.start()
+        try:
+            target()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    peak = _in_rollback(traced)
+    return CaseResult(
+        name=case.name,
+        repeat=repeat,
+        wall_ms_median=statistics.median(timings) * 1000,
+        wall_ms_min=min(timings) * 1000,
+        queries=queries,
+        peak_kib=peak / 1024,
+    )
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def build_report(results: List[CaseResult]) -> Dict:
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+        },
+        "cases": {r.name: asdict(r) for r in results},
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[Dict]:
+    """Per-case deltas; a case regresses if wall time or memory grew by more
+    than ``threshold`` (a fraction) or it issues more queries than before."""
+    rows = []
+    for name, cur in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            rows.append({"name": name, "status": "NEW", "current": cur})
+            continue
+
+        def delta(key):
+            return (cur[key] - base[key]) / base[key] if base[key] else 0.0
+
+        reasons = []
+        if delta("wall_ms_median") > threshold:
+            reasons.append("vrijeme")
+        if delta("peak_kib") > threshold:
+            reasons.append("memorija")
+        if cur["queries"] > base["queries"]:
+            reasons.append("upiti")
+        rows.append(
+            {
+                "name": name,
+                "status": "REGRESSION" if reasons else "OK",
+                "reasons": reasons,
+                "wall_delta": delta("wall_ms_median"),
+                "peak_delta": delta("peak_kib"),
+                "queries": (base["queries"], cur["queries"]),
+                "baseline": base,
+                "current": cur,
+            }
+        )
+    return rows
@@ -0,0 +1,491 @@
+"""Seeded generator of a production-scale synthetic dataset.
+
+Creates customers, projects, work orders, road sections (EPSG:3765 polylines
+around Croatian towns), work items, customer reviews with tokens and
+decisions, and LoginEvent history. Small tables go through ``bulk_create``;
+work items and login events, the big ones, are loaded with PostgreSQL
+``COPY``. Meant for an empty scratch database (see docker-compose.bench.yml).
+
+    python create_test_data.py --preset large --seed 42
+    python create_test_data.py --work-items 200000 --login-events 5000000
+
+The benchmarks call :func:`generate` through ``run_benchmarks --dataset``.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import math
+import os
+import random
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PRESETS: Dict[str, Dict[str, int]] = {
+    "small": {
+        "customers": 20,
+        "projects": 50,
+        "work_orders": 500,
+        "sections": 2_000,
+        "work_items": 10_000,
+        "login_events": 100_000,
+    },
+    "medium": {
+        "customers": 200,
+        "projects": 1_000,
+        "work_orders": 10_000,
+        "sections": 20_000,
+        "work_items": 100_000,
+        "login_events": 1_000_000,
+    },
+    "large": {
+        "customers": 2_000,
+        "projects": 10_000,
+        "work_orders": 100_000,
+        "sections": 100_000,
+        "work_items": 1_000_000,
+        "login_events": 10_000_000,
+    },
+}
+
+# Gradovi kao ishodišta dionica, HTRS96/TM (EPSG:3765).
+ANCHORS: Sequence[Tuple[str, float, float]] = (
+    ("Zagreb", 459700, 5075100),
+    ("Split", 495100, 4818700),
+    ("Rijeka", 338700, 5022800),
+    ("Osijek", 671400, 5048500),
+    ("Zadar", 398400, 4887300),
+    ("Pula", 290600, 4973000),
+    ("Dubrovnik", 630700, 4724600),
+    ("Varaždin", 487400, 5129500),
+    ("Šibenik", 451300, 4844100),
+    ("Karlovac", 425600, 5039000),
+    ("Slavonski Brod", 619200, 5003300),
+    ("Gospić", 410600, 4934600),
+    ("Bjelovar", 526600, 5084400),
+    ("Vukovar", 696000, 5026500),
+    ("Sisak", 490500, 5036200),
+)
+
+OPERATIONS: Sequence[Tuple[str, str, str]] = (
+    ("Horizontalna signalizacija – rubna linija", "m2", "4.20"),
+    ("Horizontalna signalizacija – razdjelna linija", "m2", "4.50"),
+    ("Košnja bankine", "m2", "0.18"),
+    ("Krpanje udarnih rupa", "m2", "38.00"),
+    ("Postavljanje smjerokaza", "kom", "21.50"),
+    ("Postavljanje reflektirajućih markera", "kom", "9.80"),
+    ("Čišćenje odvodnih kanala", "m", "2.60"),
+    ("Zimska služba – dežurstvo", "sat", "45.00"),
+)
+
+CITIES = ("Zagreb", "Split", "Rijeka", "Osijek", "Zadar", "Pula", "Varaždin", "Karlovac")
+COUNTIES = ("Grad Zagreb", "Splitsko-dalmatinska", "Primorsko-goranska", "Osječko-baranjska", "Zadarska", "Istarska")
+LEGAL_FORMS = ("d.o.o.", "j.d.o.o.", "d.d.", "obrt")
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/129.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_6) AppleWebKit/605.1.15 Version/17.6 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:131.0) Gecko/20100101 Firefox/131.0",
+    "python-requests/2.32.3",
+)
+
+BATCH_SIZE = 5_000
+
+
+def _oib(rng: random.Random, used: set) -> str:
+    """Random OIB with a valid ISO 7064 (MOD 11,10) check digit."""
+    while True:
+        digits = [rng.randint(0, 9) for _ in range(10)]
+        remainder = 10
+        for d in digits:
+            remainder = (remainder + d) % 10 or 10
+            remainder = (remainder * 2) % 11
+        check = (11 - remainder) % 10
+        oib = "".join(map(str, digits)) + str(check)
+        if oib not in used:
+            used.add(oib)
+            return oib
+
+
+def random_linestring(rng: random.Random) -> List[Tuple[float, float]]:
+    """A road-like polyline of 0.5–10 km near a random town."""
+    _, ax, ay = rng.choice(ANCHORS)
+    x = ax + rng.uniform(-25_000, 25_000)
+    y = ay + rng.uniform(-25_000, 25_000)
+    heading = rng.uniform(0, 2 * math.pi)
+    length = rng.uniform(500, 10_000)
+    vertices = rng.randint(5, 40)
+    step = length / (vertices - 1)
+    coords = [(x, y)]
+    for _ in range(vertices - 1):
+        heading += rng.gauss(0, 0.25)
+        x += step * math.cos(heading)
+        y += step * math.sin(heading)
+        coords.append((round(x, 2), round(y, 2)))
+    return coords
+
+
+def random_road_number(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.2:
+        return f"D{rng.randint(1, 550)}"
+    if kind < 0.6:
+        return f"Ž{rng.randint(1000, 6300)}"
+    return f"L{rng.randint(10000, 69999)}"
+
+
+def copy_rows(table: str, columns: Sequence[str], rows) -> int:
+    """Stream ``rows`` into ``table`` with ``COPY``; returns the row count."""
+    from django.db import connection
+
+    count = 0
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    with connection.cursor() as cur:
+        with cur.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
+                count += 1
+    return count
+
+
+def _log(verbose: bool, message: str, started: float) -> None:
+    if verbose:
+        print(f"{message} ({time.perf_counter() - started:.1f} s)")
+
+
+def generate(
+    customers: int = 20,
+    projects: int = 50,
+    work_orders: int = 500,
+    sections: int = 2_000,
+    work_items: int = 10_000,
+    login_events: int = 100_000,
+    review_ratio: float = 0.05,
+    seed: int = 42,
+    geometry: bool = False,
+    verbose: bool = True,
+) -> Dict[str, int]:
+    """Create the dataset; returns row counts per table."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.gis.geos import LineString
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from activity.bruteforce import record_failures
+    from activity.models import LoginEvent
+    from customers.models import Customer
+    from operations.models import OperationType
+    from projects.models import Project, WorkOrder
+    from roads.models import RoadSection
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    today = now.date()
+    started = time.perf_counter()
+    counts: Dict[str, int] = {}
+    User = get_user_model()
+
+    with transaction.atomic():
+        staff, _ = User.objects.get_or_create(username="synthetic", defaults={"is_staff": True})
+        clients = []
+        for i in range(max(1, customers // 10)):
+            user, _ = User.objects.get_or_create(username=f"synthetic-kupac-{i:04d}")
+            clients.append(user)
+
+        used_oibs = set(Customer.objects.values_list("oib", flat=True))
+        customer_objs = Customer.objects.bulk_create(
+            [
+                Customer(
+                    name=f"Cestogradnja {i:05d}",
+                    legal_form=rng.choice(LEGAL_FORMS),
+                    oib=_oib(rng, used_oibs),
+                    street_address=f"Ulica {rng.randint(1, 200)}",
+                    postal_code=f"{rng.randint(10000, 53999)}",
+                    city=rng.choice(CITIES),
+                    county=rng.choice(COUNTIES),
+                    iban=f"HR{rng.randint(10**18, 10**19 - 1)}",
+                    payment_terms_days=rng.choice((15, 30, 45, 60)),
+                )
+                for i in range(customers)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        counts["customers"] = len(customer_objs)
+        _log(verbose, f"Kupci: {len(customer_objs)}", started)
+
+        project_objs = Project.objects.bulk_create(
+            [
+                Project(
+                    name=f"Održavanje cesta {i:05d}",
+                    customer=rng.choice(customer_objs),
+                    contract_number=f"UG-{today.year}-{i:05d}",
+                    start_date=today - datetime.timedelta(days=rng.randint(0, 900)),
+                )
+                for i in range(projects)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        counts["projects"] = len(project_objs)
+
+        statuses = [s for s, _ in WorkOrder.STATUS_CHOICES]
+        order_objs = WorkOrder.objects.bulk_create(
+            [
+                WorkOrder(
+                    number=f"SYN-{seed}-{i:07d}",
+                    project=rng.choice(project_objs),
+                    title=f"Radni nalog {i:07d}",
+                    status=rng.choice(statuses),
+                    created_by=staff,
+                    scheduled_date=today - datetime.timedelta(days=rng.randint(0, 365)),
+                )
+                for i in range(work_orders)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        counts["work_orders"] = len(order_objs)
+        _log(verbose, f"Projekti: {projects}, nalozi: {work_orders}", started)
+
+        section_coords: List[List[Tuple[float, float]]] = []
+        section_ids: List[int] = []
+        for offset in range(0, sections, BATCH_SIZE):
+            batch = []
+            for i in range(offset, min(offset + BATCH_SIZE, sections)):
+                coords = random_linestring(rng)
+                section_coords.append(coords)
+                batch.append(
+                    RoadSection(
+                        name=f"Dionica {i:06d}",
+                        road_number=random_road_number(rng),
+                        geom=LineString(coords, srid=3765),
+                        road_width=Decimal(rng.choice(("5.50", "6.00", "6.50", "7.00", "7.50"))),
+                    )
+                )
+            section_ids.extend(s.pk for s in RoadSection.objects.bulk_create(batch))
+        counts["sections"] = len(section_ids)
+        _log(verbose, f"Dionice: {len(section_ids)}", started)
+
+        operations = []
+        for name, unit, price in OPERATIONS:
+            op, _ = OperationType.objects.get_or_create(
+                name=name, unit=unit, defaults={"base_price": Decimal(price)}
+            )
+            operations.append(op)
+
+        order_ids = [o.pk for o in order_objs]
+        sides = ("left", "right", "notap")
+
+        def work_item_rows():
+            for _ in range(work_items):
+                op = rng.choice(operations)
+                section_index = rng.randrange(len(section_ids)) if section_ids else None
+                if op.unit == "kom":
+                    quantity = Decimal(rng.randint(1, 400))
+                else:
+                    quantity = Decimal(rng.randint(10, 50_000)) / 10
+                total = (quantity * op.base_price).quantize(Decimal("0.01"))
+                yield (
+                    rng.choice(order_ids),
+                    section_ids[section_index] if section_index is not None else None,
+                    op.pk,
+                    rng.choice(sides),
+                    "",
+                    quantity,
+                    op.base_price,
+                    total,
+                    "",
+                )
+
+        counts["work_items"] = copy_rows(
+            "projects_workitem",
+            (
+                "work_order_id",
+                "road_section_id",
+                "operation_type_id",
+                "road_side",
+                "description",
+                "quantity",
+                "unit_price",
+                "total_price",
+                "notes",
+            ),
+            work_item_rows(),
+        )
+        _log(verbose, f"Stavke rada (COPY): {counts['work_items']}", started)
+
+        if geometry:
+            # Set-based version of the m2 branch of WorkItem._compute_geom_via_postgis.
+            with connection.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE projects_workitem wi
+                    SET geom = ST_Multi(ST_Difference(
+                        ST_Buffer(rs.geom, COALESCE(rs.road_width, 0) / 2.0 + 1.0,
+                                  'endcap=flat join=mitre side=' || wi.road_side),
+                        ST_Buffer(rs.geom, COALESCE(rs.road_width, 0) / 2.0,
+                                  'endcap=flat join=mitre side=' || wi.road_side)
+                    ))
+                    FROM roads_roadsection rs, operations_operationtype op
+                    WHERE wi.road_section_id = rs.id
+                      AND wi.operation_type_id = op.id
+                      AND op.unit = 'm2'
+                      AND wi.road_side IN ('left', 'right')
+                      AND wi.geom IS NULL
+                    """
+                )
+            _log(verbose, "Geometrije m2 stavki", started)
+
+        counts.update(_generate_reviews(rng, review_ratio, clients, section_coords, section_ids, now))
+        _log(verbose, f"Pregledi: {counts['reviews']}", started)
+
+    counts["login_events"] = _generate_login_events(rng, login_events, clients, now)
+    _log(verbose, f"Događaji prijave (COPY): {counts['login_events']}", started)
+
+    recent = now - datetime.timedelta(hours=24)
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT username, host(ip_address), \"timestamp\" FROM activity_loginevent "
+            "WHERE action = 'failure' AND \"timestamp\" >= %s",
+            [recent],
+        )
+        record_failures(
+            LoginEvent(action=LoginEvent.Action.FAILURE, username=u, ip_address=ip, timestamp=ts)
+            for u, ip, ts in cur.fetchall()
+        )
+    return counts
+
+
+def _generate_reviews(rng, review_ratio, clients, section_coords, section_ids, now) -> Dict[str, int]:
+    from django.contrib.gis.geos import Point
+    from django.db import connection
+
+    from customer_review.models import CustomerReview, CustomerReviewDecision, ReviewToken
+
+    # Sampled with the seeded rng (not SQL random()) so the data set is reproducible.
+    sampled = []
+    with connection.chunked_cursor() as cur:
+        cur.execute("SELECT id, road_section_id FROM projects_workitem ORDER BY id")
+        while True:
+            rows = cur.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            sampled.extend(row for row in rows if rng.random() < review_ratio)
+
+    section_index = {pk: i for i, pk in enumerate(section_ids)}
+    statuses = (
+        CustomerReview.Status.PENDING,
+        CustomerReview.Status.ACCEPTED,
+        CustomerReview.Status.CHANGE_REQUESTED,
+    )
+    reviews = []
+    for item_id, _ in sampled:
+        reviews.append(
+            CustomerReview(
+                work_item_id=item_id,
+                status=rng.choice(statuses),
+                deadline=now + datetime.timedelta(days=rng.randint(-30, 30)),
+                data_snapshot_hash=f"{rng.getrandbits(256):064x}",
+            )
+        )
+    reviews = CustomerReview.objects.bulk_create(reviews, batch_size=BATCH_SIZE)
+
+    tokens, decisions = [], []
+    for review, (_, section_id) in zip(reviews, sampled):
+        user = rng.choice(clients)
+        issued = now - datetime.timedelta(days=rng.randint(0, 60))
+        tokens.append(
+            ReviewToken(
+                customer_review=review,
+                user=user,
+                jti=f"{rng.getrandbits(192):048x}",
+                expires_at=issued + datetime.timedelta(days=14),
+                used_at=None if review.status == CustomerReview.Status.PENDING else issued,
+                delivered_to_email=f"{user.username}@example.com",
+            )
+        )
+        if review.status == CustomerReview.Status.PENDING:
+            continue
+        geom = None
+        if review.status == CustomerReview.Status.CHANGE_REQUESTED and section_id in section_index:
+            x, y = section_coords[section_index[section_id]][0]
+            geom = Point(x, y, srid=3765)
+        decisions.append(
+            CustomerReviewDecision(
+                customer_review=review,
+                decided_by_user=user,
+                action=review.status,
+                comment="Rubna linija nije ujednačene širine." if geom else "",
+                geom=geom,
+                data_snapshot_hash=review.data_snapshot_hash,
+                ip_address=f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            )
+        )
+    ReviewToken.objects.bulk_create(tokens, batch_size=BATCH_SIZE)
+    CustomerReviewDecision.objects.bulk_create(decisions, batch_size=BATCH_SIZE)
+    return {"reviews": len(reviews), "tokens": len(tokens), "decisions": len(decisions)}
+
+
+def _generate_login_events(rng, total, clients, now, days: int = 365) -> int:
+    from activity.partitions import ensure_partitions
+
+    if total <= 0:
+        return 0
+    first_month = (now - datetime.timedelta(days=days)).date().replace(day=1)
+    months = (now.year - first_month.year) * 12 + now.month - first_month.month
+    ensure_partitions(months + 1, today=first_month)
+
+    usernames = [u.username for u in clients] + ["admin", "voditelj", "nadzor"]
+    user_ids = {u.username: u.pk for u in clients}
+    attackers = [f"185.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}" for _ in range(20)]
+    span = days * 86400
+
+    def rows():
+        for _ in range(total):
+            ts = now - datetime.timedelta(seconds=rng.random() * span)
+            roll = rng.random()
+            if roll < 0.05:
+                # Credential stuffing: a few IPs, many usernames.
+                yield (None, f"korisnik{rng.randint(1, 5000)}", "failure", ts, rng.choice(attackers),
+                       USER_AGENTS[-1], "/admin/login/")
+                continue
+            username = rng.choice(usernames)
+            action = "login" if roll < 0.85 else ("logout" if roll < 0.97 else "failure")
+            ip = f"93.{rng.randint(136, 143)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            user_id = user_ids.get(username) if action != "failure" else None
+            path = "/admin/logout/" if action == "logout" else "/admin/login/"
+            yield (user_id, username, action, ts, ip, rng.choice(USER_AGENTS[:-1]), path)
+
+    return copy_rows(
+        "activity_loginevent",
+        ("user_id", "username", "action", "timestamp", "ip_address", "user_agent", "path"),
+        rows(),
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for key in PRESETS["small"]:
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, dest=key)
+    parser.add_argument("--review-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--geometry", action="store_true", help="Izračunaj geometrije m2 stavki.")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "road_maintenance.settings")
+    import django
+
+    django.setup()
+
+    params = dict(PRESETS[args.preset])
+    params.update({k: getattr(args, k) for k in PRESETS["small"] if getattr(args, k) is not None})
+    counts = generate(
+        **params,
+        review_ratio=args.review_ratio,
+        seed=args.seed,
+        geometry=args.geometry,
+    )
+    print(", ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 from django.contrib import admin
 
+from road_maintenance.admin_mixins import PerformanceAdminMixin
+
 from .models import CustomerReview, CustomerReviewDecision, ReviewToken
 
 
 @admin.register(CustomerReview)
-class CustomerReviewAdmin(admin.ModelAdmin):
+class CustomerReviewAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = (
         'work_item',
         'version',
@@ -13,6 +15,15 @@ class CustomerReviewAdmin(admin.ModelAdmin):
         'closed_at',
         'created_at',
     )
+    list_select_related = ('work_item__work_order', 'work_item__operation_type')
+    list_defer = (
+        'note_public',
+        'work_item__geom',
+        'work_item__description',
+        'work_item__notes',
+        'work_item__work_order__description',
+        'work_item__operation_type__description',
+    )
     list_filter = ('status', 'created_at', 'deadline')
     search_fields = (
         'work_item__work_order__number',
@@ -24,7 +35,7 @@ class CustomerReviewAdmin(admin.ModelAdmin):
 
 
 @admin.register(CustomerReviewDecision)
-class CustomerReviewDecisionAdmin(admin.ModelAdmin):
+class CustomerReviewDecisionAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = (
         'customer_review',
         'decided_by_user',
@@ -32,17 +43,20 @@ class CustomerReviewDecisionAdmin(admin.ModelAdmin):
         'decided_at',
         'ip_address',
     )
+    list_select_related = ('customer_review', 'decided_by_user')
+    list_defer = ('geom', 'comment', 'attachments', 'customer_review__note_public')
     list_filter = ('action', 'decided_at')
     search_fields = (
         'customer_review__work_item__work_order__number',
         'decided_by_user__username',
     )
+    autocomplete_fields = ('customer_review', 'decided_by_user')
     readonly_fields = ('decided_at',)
     ordering = ('-decided_at',)
 
 
 @admin.register(ReviewToken)
-class ReviewTokenAdmin(admin.ModelAdmin):
+class ReviewTokenAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = (
         'customer_review',
         'user',
@@ -52,11 +66,14 @@ class ReviewTokenAdmin(admin.ModelAdmin):
         'used_at',
         'revoked_at',
     )
+    list_select_related = ('customer_review', 'user')
+    list_defer = ('meta', 'customer_review__note_public')
     list_filter = ('scope', 'issued_at', 'expires_at')
     search_fields = (
         'customer_review__work_item__work_order__number',
         'user__username',
         'jti',
     )
+    autocomplete_fields = ('customer_review', 'user')
     readonly_fields = ('issued_at', 'jti')
     ordering = ('-issued_at',)
@@ -0,0 +1,64 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+STOCK_MIDDLEWARE = {
+    'road_maintenance.middleware.SessionMiddleware': 'django.contrib.sessions.middleware.SessionMiddleware',
+    'road_maintenance.middleware.LocaleMiddleware': 'django.middleware.locale.LocaleMiddleware',
+    'road_maintenance.middleware.AuthenticationMiddleware': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'road_maintenance.middleware.MessageMiddleware': 'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mjeri trošak po zahtjevu za javni review API sa standardnim i "
+        "sessionless middleware stogom."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Broj zahtjeva po konfiguraciji.")
+        parser.add_argument("--jti", default="benchmark-nepostojeci-token", help="Token u URL-u.")
+
+    def _run(self, middleware, url, session_key, n):
+        with override_settings(MIDDLEWARE=middleware):
+            client = Client()
+            client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+            client.get(url)  # warm-up, builds the middleware chain
+            timings = []
+            with CaptureQueriesContext(connection) as ctx:
+                for _ in range(n):
+                    started = time.perf_counter()
+                    client.get(url)
+                    timings.append(time.perf_counter() - started)
+        return timings, len(ctx.captured_queries) / n
+
+    def handle(self, *args, **options):
+        n = options["requests"]
+        url = reverse("customer_review:review-public", args=[options["jti"]])
+        session = SessionStore()
+        session.create()
+
+        stock = [STOCK_MIDDLEWARE.get(m, m) for m in settings.MIDDLEWARE]
+        results = {
+            "standard": self._run(stock, url, session.session_key, n),
+            "sessionless": self._run(list(settings.MIDDLEWARE), url, session.session_key, n),
+        }
+        session.delete()
+
+        base = statistics.mean(results["standard"][0])
+        for label, (timings, queries) in results.items():
+            mean = statistics.mean(timings)
+            self.stdout.write(
+                f"{label:12} prosjek {mean * 1e6:8.1f} µs | medijan "
+                f"{statistics.median(timings) * 1e6:8.1f} µs | upita/zahtjev {queries:.2f}"
+            )
+        saved = base - statistics.mean(results["sessionless"][0])
+        self.stdout.write(f"Ušteda po zahtjevu: {saved * 1e6:.1f} µs ({saved / base:.1%})")
@@ -0,0 +1,104 @@
+import datetime
+import json
+from decimal import Decimal
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from projects.models import WorkItem, WorkOrder
+from road_maintenance.testing import QueryBudgetTestMixin, create_work_fixtures
+
+from .models import CustomerReview, ReviewToken
+
+
+class PublicReviewQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """The public review view stays within its ``QUERY_BUDGETS`` entries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        data = create_work_fixtures()
+        item = WorkItem(
+            work_order=data["work_order"],
+            road_section=data["section"],
+            operation_type=data["operation"],
+            road_side="left",
+            quantity=Decimal("100"),
+        )
+        item.save()
+        review = CustomerReview.objects.create(
+            work_item=item, status=CustomerReview.Status.PENDING, data_snapshot_hash="test-hash"
+        )
+        cls.token = ReviewToken.objects.create(
+            customer_review=review, user=data["user"], expires_at=timezone.now() + datetime.timedelta(days=1)
+        )
+        cls.url = reverse("customer_review:review-public", args=[cls.token.jti])
+
+    def test_get(self):
+        response = self.assertQueryBudget(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_post(self):
+        body = json.dumps({"action": "accepted", "data_snapshot_hash": "test-hash"})
+        response = self.assertQueryBudget(self.url, "post", data=body, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        review = CustomerReview.objects.get(pk=self.token.customer_review_id)
+        self.assertEqual(review.status, CustomerReview.Status.ACCEPTED)
+
+
+class ChangelistQueryCountTests(QueryBudgetTestMixin, TestCase):
+    """Review admin changelists run the same number of queries for N and 2N rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        data = create_work_fixtures()
+        cls.project, cls.section, cls.operation = data["project"], data["section"], data["operation"]
+        cls.admin_user = get_user_model().objects.create_superuser("admin", password="admin")
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+        self.serial = count(1)
+
+    def _changelist(self, model):
+        return reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist")
+
+    def _reviews(self, n):
+        """Each review on its own work order, so related rows differ per row."""
+        orders = WorkOrder.objects.bulk_create(
+            WorkOrder(number=f"TEST-CR-{i}", project=self.project, title="Nalog", created_by=self.admin_user)
+            for i in (next(self.serial) for _ in range(n))
+        )
+        items = WorkItem.objects.bulk_create(
+            WorkItem(
+                work_order=order,
+                road_section=self.section,
+                operation_type=self.operation,
+                road_side="right",
+                quantity=Decimal("10"),
+                unit_price=self.operation.base_price,
+                total_price=Decimal("15.00"),
+            )
+            for order in orders
+        )
+        return CustomerReview.objects.bulk_create(
+            CustomerReview(work_item=item, data_snapshot_hash="test-hash") for item in items
+        )
+
+    def _tokens(self, n):
+        reviews = self._reviews(n)
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(username=f"kupac-{review.pk}") for review in reviews
+        )
+        expires_at = timezone.now() + datetime.timedelta(days=1)
+        ReviewToken.objects.bulk_create(
+            ReviewToken(customer_review=review, user=user, jti=f"test-{review.pk}", expires_at=expires_at)
+            for review, user in zip(reviews, users)
+        )
+
+    def test_customer_review_changelist(self):
+        self.assertQueriesIndependentOfRows(self._changelist(CustomerReview), self._reviews)
+
+    def test_review_token_changelist(self):
+        self.assertQueriesIndependentOfRows(self._changelist(ReviewToken), self._tokens)
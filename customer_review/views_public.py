@@ -9,8 +9,15 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.views import View
 
+from projects.models import WorkItem
+from road_maintenance.metrics import histogram
+
 from .models import CustomerReview, CustomerReviewDecision, ReviewToken
 
+PUBLIC_REVIEW_SECONDS = histogram(
+    "roadmaint_public_review_seconds", "CustomerReviewPublicView request handling.", ["method"]
+)
+
 
 def _ip(req) -> Optional[str]:
     return req.META.get("REMOTE_ADDR")
@@ -44,15 +51,17 @@ def _validate_active_token_or_error(token: ReviewToken):
 
 
 class CustomerReviewPublicView(View):
+    @PUBLIC_REVIEW_SECONDS.labels(method="GET").time()
     def get(self, request, jti: str):
-        token = get_object_or_404(ReviewToken, jti=jti)
+        token = get_object_or_404(ReviewToken.objects.select_related("customer_review"), jti=jti)
         err = _validate_active_token_or_error(token)
         if err:
             code, payload = err
             return JsonResponse(payload, status=code)
 
         review: CustomerReview = token.customer_review
-        wi = review.work_item
+        # The customer sees the derived polygon, so geometry is loaded explicitly.
+        wi = WorkItem.objects.with_geometry().get(pk=review.work_item_id)
 
         route_line = getattr(wi, "route_line", None) or getattr(wi, "geom", None)
         processed_polygon = getattr(wi, "processed_polygon", None)
@@ -95,10 +104,12 @@ class CustomerReviewPublicView(View):
         }
         return JsonResponse(payload, status=200)
 
+    @PUBLIC_REVIEW_SECONDS.labels(method="POST").time()
     @transaction.atomic
     def post(self, request, jti: str):
         token = (
-            ReviewToken.objects.select_for_update()
+            ReviewToken.objects.select_related("customer_review")
+            .select_for_update(of=("self",))
             .filter(jti=jti)
             .first()
         )
@@ -114,7 +125,7 @@ class CustomerReviewPublicView(View):
             return JsonResponse(payload, status=code)
 
         review: CustomerReview = token.customer_review
-        wi = review.work_item
+        wi = WorkItem.objects.get(pk=review.work_item_id)
 
         try:
             if request.content_type == "application/json" and request.body:
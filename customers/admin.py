@@ -1,13 +1,17 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
+from search.admin_mixins import FullTextSearchAdminMixin, TrigramAutocompleteAdminMixin
+
 from .models import Customer
 
 
 @admin.register(Customer)
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(TrigramAutocompleteAdminMixin, FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("name", "oib", "city", "contact_person", "vat_registered")
     search_fields = ("name", "oib", "mbs", "vat_id", "contact_person")
+    search_kind = "customer"
+    autocomplete_kind = "customer"
     list_filter = ("vat_registered", "county")
     readonly_fields = ("created_at", "updated_at")
     fieldsets = (
@@ -1,5 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import MinLengthValidator, RegexValidator
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 
 
@@ -105,6 +107,11 @@ class Customer(models.Model):
         ordering = ["name"]
         verbose_name = _('Kupac')
         verbose_name_plural = _('Kupci')
+        # Trigram indexes for autocomplete (search.autocomplete) and admin icontains.
+        indexes = [
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='customers_name_trgm'),
+            GinIndex(OpClass('oib', name='gin_trgm_ops'), name='customers_oib_trgm'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.oib})"
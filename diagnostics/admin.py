@@ -0,0 +1,149 @@
+import json
+
+from django.contrib import admin
+from django.db.models import Count, Max
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from django.utils.translation import gettext_lazy as _
+
+from .models import RequestProfile, SlowQuery, SlowQuerySample
+from .profiling import profile_dir
+from .slow_queries import Percentile
+
+
+class ReadOnlyAdminMixin:
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(ReadOnlyAdminMixin, admin.ModelAdmin):
+    """Report grouped by fingerprint: count, p95, worst time and its plan."""
+
+    list_display = ("short_sql", "sample_count", "p95_ms", "max_ms", "last_seen")
+    search_fields = ("sql", "fingerprint")
+    list_filter = ("last_seen",)
+    fields = ("fingerprint", "sql", "first_seen", "last_seen", "views", "worst_plan", "slowest_samples")
+    readonly_fields = fields
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                sample_count=Count("samples"),
+                p95_ms=Percentile("samples__duration_ms", 0.95),
+                max_ms=Max("samples__duration_ms"),
+            )
+        )
+
+    def get_ordering(self, request):
+        return ("-p95_ms",)
+
+    @admin.display(description=_("SQL"))
+    def short_sql(self, obj):
+        return obj.sql if len(obj.sql) <= 140 else obj.sql[:140] + "…"
+
+    @admin.display(description=_("Broj"), ordering="sample_count")
+    def sample_count(self, obj):
+        return obj.sample_count
+
+    @admin.display(description=_("p95 (ms)"), ordering="p95_ms")
+    def p95_ms(self, obj):
+        return f"{obj.p95_ms:.1f}" if obj.p95_ms is not None else "–"
+
+    @admin.display(description=_("Najsporije (ms)"), ordering="max_ms")
+    def max_ms(self, obj):
+        return f"{obj.max_ms:.1f}" if obj.max_ms is not None else "–"
+
+    @admin.display(description=_("Pogledi"))
+    def views(self, obj):
+        rows = (
+            obj.samples.values("view_name")
+            .annotate(n=Count("id"))
+            .order_by("-n")[:10]
+        )
+        return format_html_join(", ", "{} ({})", ((r["view_name"] or "–", r["n"]) for r in rows))
+
+    @admin.display(description=_("Plan najsporijeg izvođenja"))
+    def worst_plan(self, obj):
+        sample = (
+            obj.samples.filter(plan__isnull=False)
+            .only("plan", "duration_ms")
+            .order_by("-duration_ms")
+            .first()
+        )
+        if sample is None:
+            return "–"
+        return format_html(
+            "<p>{} ms</p><pre>{}</pre>",
+            f"{sample.duration_ms:.1f}",
+            json.dumps(sample.plan, indent=2),
+        )
+
+    @admin.display(description=_("Najsporija izvođenja"))
+    def slowest_samples(self, obj):
+        samples = obj.samples.defer("plan").order_by("-duration_ms")[:10]
+        return format_html(
+            "<table>{}</table>",
+            format_html_join(
+                "",
+                "<tr><td>{} ms</td><td>{}</td><td>{}</td><td><pre>{}</pre></td></tr>",
+                ((f"{s.duration_ms:.1f}", s.captured_at, s.view_name, s.sql) for s in samples),
+            ),
+        )
+
+
+@admin.register(SlowQuerySample)
+class SlowQuerySampleAdmin(ReadOnlyAdminMixin, admin.ModelAdmin):
+    list_display = ("captured_at", "duration_ms", "view_name", "query")
+    list_select_related = ("query",)
+    list_filter = ("captured_at",)
+    search_fields = ("view_name", "query__fingerprint")
+    date_hierarchy = "captured_at"
+    ordering = ("-captured_at",)
+    readonly_fields = ("query", "duration_ms", "view_name", "captured_at", "sql", "plan")
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(ReadOnlyAdminMixin, admin.ModelAdmin):
+    list_display = ("created_at", "method", "path", "view_name", "user", "status_code", "duration_ms", "download")
+    list_select_related = ("user",)
+    list_filter = ("method", "created_at")
+    search_fields = ("path", "view_name")
+    ordering = ("-created_at",)
+    fields = ("created_at", "method", "path", "view_name", "user", "status_code", "duration_ms", "download", "summary_text")
+    readonly_fields = fields
+
+    def get_urls(self):
+        urls = [
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="diagnostics_requestprofile_download",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def download_view(self, request, pk):
+        if not self.has_view_permission(request):
+            raise Http404
+        record = get_object_or_404(RequestProfile, pk=pk)
+        file_path = profile_dir() / record.file_name
+        if not file_path.is_file():
+            raise Http404
+        return FileResponse(file_path.open("rb"), as_attachment=True, filename=record.file_name)
+
+    @admin.display(description=_("Datoteka"))
+    def download(self, obj):
+        url = reverse("admin:diagnostics_requestprofile_download", args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.file_name)
+
+    @admin.display(description=_("Sažetak (kumulativno)"))
+    def summary_text(self, obj):
+        return format_html("<pre>{}</pre>", obj.summary)
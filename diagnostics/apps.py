@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class DiagnosticsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'diagnostics'
+    verbose_name = _('Dijagnostika')
+
+    def ready(self) -> None:
+        from django.db.backends.signals import connection_created
+
+        from .slow_queries import install_wrapper
+
+        connection_created.connect(install_wrapper, dispatch_uid="diagnostics.slow_queries")
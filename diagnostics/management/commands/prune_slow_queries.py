@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from diagnostics.slow_queries import prune_slow_queries
+
+
+class Command(BaseCommand):
+    help = "Briše zapise sporih upita starije od razdoblja čuvanja."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.DIAGNOSTICS_SLOW_QUERY_RETENTION_DAYS,
+            help="Koliko dana zapisa se zadržava.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_slow_queries(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Obrisano izvođenja: {deleted}"))
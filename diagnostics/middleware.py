@@ -0,0 +1,24 @@
+from .slow_queries import current_view
+
+
+class SlowQueryViewMiddleware:
+    """Tag captured slow queries with the view that ran them.
+
+    Until the URL is resolved (session and user lookups) the request path is
+    used instead.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_view.set(request.path)
+        try:
+            return self.get_response(request)
+        finally:
+            current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        current_view.set(match.view_name if match is not None else request.path)
+        return None
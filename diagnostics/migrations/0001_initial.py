@@ -0,0 +1,46 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40, unique=True, verbose_name='Otisak')),
+                ('sql', models.TextField(verbose_name='Normalizirani SQL')),
+                ('first_seen', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Prvi put')),
+                ('last_seen', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Zadnji put')),
+            ],
+            options={
+                'verbose_name': 'Spori upit',
+                'verbose_name_plural': 'Spori upiti',
+                'ordering': ['-last_seen'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SlowQuerySample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('duration_ms', models.FloatField(verbose_name='Trajanje (ms)')),
+                ('view_name', models.CharField(blank=True, max_length=255, verbose_name='Pogled')),
+                ('sql', models.TextField(blank=True, verbose_name='SQL')),
+                ('plan', models.JSONField(blank=True, null=True, verbose_name='Plan izvršavanja')),
+                ('captured_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Vrijeme')),
+                ('query', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='samples', to='diagnostics.slowquery', verbose_name='Upit')),
+            ],
+            options={
+                'verbose_name': 'Izvođenje sporog upita',
+                'verbose_name_plural': 'Izvođenja sporih upita',
+                'ordering': ['-captured_at'],
+                'indexes': [models.Index(fields=['query', 'duration_ms'], name='diag_sample_query_dur_idx'), models.Index(fields=['captured_at'], name='diag_sample_captured_idx')],
+            },
+        ),
+    ]
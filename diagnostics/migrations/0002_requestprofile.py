@@ -0,0 +1,35 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diagnostics', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Vrijeme')),
+                ('method', models.CharField(max_length=10, verbose_name='Metoda')),
+                ('path', models.CharField(max_length=512, verbose_name='Putanja')),
+                ('view_name', models.CharField(blank=True, max_length=255, verbose_name='Pogled')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Status')),
+                ('duration_ms', models.FloatField(verbose_name='Trajanje (ms)')),
+                ('file_name', models.CharField(max_length=255, verbose_name='Datoteka')),
+                ('summary', models.TextField(blank=True, verbose_name='Sažetak')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Korisnik')),
+            ],
+            options={
+                'verbose_name': 'Profil zahtjeva',
+                'verbose_name_plural': 'Profili zahtjeva',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class SlowQuery(models.Model):
+    """Normalizirani SQL upit koji je barem jednom bio sporiji od praga.
+
+    Pojedina izvođenja su u ``SlowQuerySample``; izvještaj u adminu ih
+    grupira po ``fingerprint``.
+    """
+
+    fingerprint = models.CharField(_("Otisak"), max_length=40, unique=True)
+    sql = models.TextField(_("Normalizirani SQL"))
+    first_seen = models.DateTimeField(_("Prvi put"), default=timezone.now)
+    last_seen = models.DateTimeField(_("Zadnji put"), default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = _("Spori upit")
+        verbose_name_plural = _("Spori upiti")
+        ordering = ["-last_seen"]
+
+    def __str__(self) -> str:
+        return f"{self.fingerprint[:12]} {self.sql[:80]}"
+
+
+class SlowQuerySample(models.Model):
+    """Jedno izvođenje sporog upita, s planom izvršavanja ako je uzorkovan."""
+
+    query = models.ForeignKey(
+        SlowQuery,
+        on_delete=models.CASCADE,
+        related_name="samples",
+        verbose_name=_("Upit"),
+    )
+    duration_ms = models.FloatField(_("Trajanje (ms)"))
+    view_name = models.CharField(_("Pogled"), max_length=255, blank=True)
+    sql = models.TextField(_("SQL"), blank=True)
+    plan = models.JSONField(_("Plan izvršavanja"), null=True, blank=True)
+    captured_at = models.DateTimeField(_("Vrijeme"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("Izvođenje sporog upita")
+        verbose_name_plural = _("Izvođenja sporih upita")
+        ordering = ["-captured_at"]
+        indexes = [
+            models.Index(fields=["query", "duration_ms"], name="diag_sample_query_dur_idx"),
+            models.Index(fields=["captured_at"], name="diag_sample_captured_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.query_id} {self.duration_ms:.1f} ms @ {self.captured_at:%Y-%m-%d %H:%M:%S}"
+
+
+class RequestProfile(models.Model):
+    """cProfile snimka jednog zahtjeva (vidi ``diagnostics.profiling``)."""
+
+    created_at = models.DateTimeField(_("Vrijeme"), default=timezone.now, db_index=True)
+    method = models.CharField(_("Metoda"), max_length=10)
+    path = models.CharField(_("Putanja"), max_length=512)
+    view_name = models.CharField(_("Pogled"), max_length=255, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name=_("Korisnik"),
+    )
+    status_code = models.PositiveSmallIntegerField(_("Status"))
+    duration_ms = models.FloatField(_("Trajanje (ms)"))
+    file_name = models.CharField(_("Datoteka"), max_length=255)
+    summary = models.TextField(_("Sažetak"), blank=True)
+
+    class Meta:
+        verbose_name = _("Profil zahtjeva")
+        verbose_name_plural = _("Profili zahtjeva")
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,115 @@
+"""On-demand cProfile of a single request.
+
+With ``DIAGNOSTICS_PROFILING_ENABLED`` off the middleware raises
+``MiddlewareNotUsed`` and Django drops it from the chain, so it costs nothing.
+When enabled, a request is profiled only if it carries the
+``X-Profile: 1`` header or the ``__profile=1`` query parameter and comes from
+an active staff user who is a superuser or listed in
+``DIAGNOSTICS_PROFILING_USERS``. The profile is written as ``.pstats`` to
+``DIAGNOSTICS_PROFILE_DIR`` (open it with ``snakeviz``/``pstats``, or convert
+it for speedscope), recorded as a ``RequestProfile`` row and its id returned
+in ``X-Profile-Id``. Only the newest ``DIAGNOSTICS_PROFILE_KEEP`` profiles are
+kept.
+
+Async views run on the event loop thread and are not covered by cProfile.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+HEADER = "X-Profile"
+QUERY_PARAM = "__profile"
+SUMMARY_LINES = 40
+
+
+def profile_dir() -> Path:
+    return Path(settings.DIAGNOSTICS_PROFILE_DIR)
+
+
+def can_profile(request) -> bool:
+    if request.headers.get(HEADER) != "1" and request.GET.get(QUERY_PARAM) != "1":
+        return False
+    user = getattr(request, "user", None)
+    if user is None or not user.is_active or not user.is_staff:
+        return False
+    return user.is_superuser or user.get_username() in settings.DIAGNOSTICS_PROFILING_USERS
+
+
+class ProfilingMiddleware:
+    """Place after ``AuthenticationMiddleware``; it needs ``request.user``."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "DIAGNOSTICS_PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not can_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            record = save_profile(profiler, request, response, elapsed_ms)
+        except Exception:
+            logger.exception("Failed to save request profile for %s", request.path)
+        else:
+            response["X-Profile-Id"] = str(record.pk)
+        return response
+
+
+def save_profile(profiler: cProfile.Profile, request, response, elapsed_ms: float):
+    from .models import RequestProfile
+
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-")[:80] or "root"
+    name = f"{timezone.now():%Y%m%d-%H%M%S-%f}_{request.method}_{slug}.pstats"
+    profiler.dump_stats(directory / name)
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LINES)
+
+    match = getattr(request, "resolver_match", None)
+    record = RequestProfile.objects.create(
+        method=request.method,
+        path=request.get_full_path()[:512],
+        view_name=match.view_name if match is not None else "",
+        user=request.user,
+        status_code=response.status_code,
+        duration_ms=elapsed_ms,
+        file_name=name,
+        summary=out.getvalue(),
+    )
+    prune_profiles(settings.DIAGNOSTICS_PROFILE_KEEP)
+    return record
+
+
+def prune_profiles(keep: int) -> int:
+    """Delete all but the newest ``keep`` profiles, rows and files."""
+    from .models import RequestProfile
+
+    stale = list(RequestProfile.objects.order_by("-created_at").values_list("pk", "file_name")[keep:])
+    for _pk, file_name in stale:
+        (profile_dir() / file_name).unlink(missing_ok=True)
+    RequestProfile.objects.filter(pk__in=[pk for pk, _name in stale]).delete()
+    return len(stale)
@@ -0,0 +1,283 @@
+"""Slow-query capture.
+
+Every PostgreSQL connection gets an execute wrapper (installed from
+``connection_created``) that times each statement. Statements slower than
+``DIAGNOSTICS_SLOW_QUERY_MS`` are fingerprinted, tagged with the view that
+ran them (see ``diagnostics.middleware``) and queued. A daemon thread writes
+the queue to ``SlowQuery``/``SlowQuerySample`` on its own connection, so
+nothing is written inside the request's transaction.
+
+``EXPLAIN (FORMAT JSON)`` is run right after the statement, on the same
+connection and inside a savepoint, when the statement is the slowest seen for
+its fingerprint in this process or with probability
+``DIAGNOSTICS_EXPLAIN_SAMPLE_RATE``. Plain ``EXPLAIN`` does not execute the
+statement, so this is safe for INSERT/UPDATE/DELETE too. The EXPLAIN and its
+savepoint are not counted in the request's query budget or ``Server-Timing``.
+"""
+from __future__ import annotations
+
+import atexit
+import contextvars
+import datetime
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Aggregate, FloatField
+from django.utils import timezone
+
+from road_maintenance.middleware import uncounted_queries
+
+logger = logging.getLogger(__name__)
+
+current_view: contextvars.ContextVar[str] = contextvars.ContextVar("diagnostics_current_view", default="")
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+_NORMALISE = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(?+)"),
+    (re.compile(r"(?:\(\?\+\)\s*,\s*)+\(\?\+\)"), "(?+), ..."),
+    (re.compile(r"\bIN \(\?\)"), "IN (?+)"),
+    (re.compile(r"\s+"), " "),
+)
+MAX_SQL_LENGTH = 20_000
+
+_local = threading.local()
+
+
+def normalise_sql(sql: str) -> str:
+    """Literals and placeholders become ``?``; IN lists and multi-row VALUES
+    of any length collapse to one form."""
+    for pattern, replacement in _NORMALISE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(normalised: str) -> str:
+    return hashlib.sha1(normalised.encode()).hexdigest()
+
+
+class Percentile(Aggregate):
+    function = "PERCENTILE_CONT"
+    template = "%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile: float, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
+class _Suppressed:
+    """Statements run inside this block are neither timed nor counted (our own
+    EXPLAIN and writes)."""
+
+    def __enter__(self):
+        self.previous = getattr(_local, "busy", False)
+        _local.busy = True
+        self.uncounted = uncounted_queries()
+        self.uncounted.__enter__()
+
+    def __exit__(self, *exc):
+        self.uncounted.__exit__(*exc)
+        _local.busy = self.previous
+        return False
+
+
+class SlowQueryWrapper:
+    def __init__(self, alias: str) -> None:
+        self.alias = alias
+        self._worst: Dict[str, float] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_local, "busy", False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= settings.DIAGNOSTICS_SLOW_QUERY_MS:
+            try:
+                self._record(sql, params, many, elapsed_ms)
+            except Exception:
+                logger.exception("Failed to record slow query")
+        return result
+
+    def _record(self, sql, params, many, elapsed_ms: float) -> None:
+        sql = str(sql)
+        normalised = normalise_sql(sql)
+        fp = fingerprint(normalised)
+        plan = None
+        if not many and _EXPLAINABLE.match(sql):
+            if elapsed_ms > self._worst.get(fp, 0.0) or random.random() < settings.DIAGNOSTICS_EXPLAIN_SAMPLE_RATE:
+                plan = self._explain(sql, params)
+        if elapsed_ms > self._worst.get(fp, 0.0):
+            if len(self._worst) > 10_000:
+                self._worst.clear()
+            self._worst[fp] = elapsed_ms
+        get_buffer().add(
+            {
+                "fingerprint": fp,
+                "normalised": normalised[:MAX_SQL_LENGTH],
+                "sql": sql[:MAX_SQL_LENGTH],
+                "duration_ms": elapsed_ms,
+                "view_name": current_view.get()[:255],
+                "plan": plan,
+                "captured_at": timezone.now(),
+            }
+        )
+
+    def _explain(self, sql, params):
+        connection = connections[self.alias]
+        if connection.needs_rollback:
+            return None
+        try:
+            with _Suppressed(), transaction.atomic(using=self.alias), connection.cursor() as cur:
+                cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+                row = cur.fetchone()
+        except Exception:
+            logger.debug("EXPLAIN failed", exc_info=True)
+            return None
+        return row[0] if row else None
+
+
+def install_wrapper(sender, connection, **kwargs) -> None:
+    """``connection_created`` receiver."""
+    if connection.vendor != "postgresql" or getattr(settings, "DIAGNOSTICS_SLOW_QUERY_MS", 0) <= 0:
+        return
+    if any(isinstance(w, SlowQueryWrapper) for w in connection.execute_wrappers):
+        return
+    # Index 0, not append: execute_wrapper() context managers pop the last
+    # wrapper, and the connection may be opened inside one of them.
+    connection.execute_wrappers.insert(0, SlowQueryWrapper(connection.alias))
+
+
+class SlowQueryBuffer:
+    """Thread-safe queue of captured statements, written by a daemon thread."""
+
+    def __init__(self, flush_interval: float = 5.0, max_pending: int = 10_000) -> None:
+        self.flush_interval = max(0.1, flush_interval)
+        self.max_pending = max_pending
+        self._records: List[dict] = []
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def add(self, record: dict) -> None:
+        self._ensure_worker()
+        with self._lock:
+            if len(self._records) < self.max_pending:
+                self._records.append(record)
+
+    def flush(self) -> int:
+        from .models import SlowQuery, SlowQuerySample
+
+        with self._lock:
+            records, self._records = self._records, []
+        if not records:
+            return 0
+        queries: Dict[str, SlowQuery] = {}
+        for record in records:
+            query = queries.get(record["fingerprint"])
+            if query is None:
+                queries[record["fingerprint"]] = SlowQuery(
+                    fingerprint=record["fingerprint"],
+                    sql=record["normalised"],
+                    first_seen=record["captured_at"],
+                    last_seen=record["captured_at"],
+                )
+            else:
+                query.last_seen = max(query.last_seen, record["captured_at"])
+        try:
+            with _Suppressed(), transaction.atomic():
+                SlowQuery.objects.bulk_create(
+                    sorted(queries.values(), key=lambda q: q.fingerprint),
+                    update_conflicts=True,
+                    unique_fields=["fingerprint"],
+                    update_fields=["last_seen"],
+                )
+                SlowQuerySample.objects.bulk_create(
+                    [
+                        SlowQuerySample(
+                            query=queries[r["fingerprint"]],
+                            duration_ms=r["duration_ms"],
+                            view_name=r["view_name"],
+                            sql=r["sql"],
+                            plan=r["plan"],
+                            captured_at=r["captured_at"],
+                        )
+                        for r in records
+                    ]
+                )
+        except Exception:
+            logger.exception("Failed to write %d slow queries", len(records))
+            return 0
+        return len(records)
+
+    def reset(self) -> None:
+        self._records = []
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="slow-query-writer", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        _local.busy = True
+        while True:
+            time.sleep(self.flush_interval)
+            if self.flush():
+                connections.close_all()
+
+
+_buffer: Optional[SlowQueryBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer() -> SlowQueryBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = SlowQueryBuffer(flush_interval=getattr(settings, "DIAGNOSTICS_SLOW_QUERY_FLUSH_INTERVAL", 5.0))
+    return _buffer
+
+
+def flush_slow_queries() -> int:
+    if _buffer is None:
+        return 0
+    return _buffer.flush()
+
+
+def prune_slow_queries(days: Optional[int] = None) -> int:
+    """Delete samples older than ``days`` and fingerprints left without samples."""
+    from .models import SlowQuery, SlowQuerySample
+
+    if days is None:
+        days = settings.DIAGNOSTICS_SLOW_QUERY_RETENTION_DAYS
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    with _Suppressed():
+        deleted, _ = SlowQuerySample.objects.filter(captured_at__lt=cutoff).delete()
+        SlowQuery.objects.filter(last_seen__lt=cutoff, samples__isnull=True).delete()
+    return deleted
+
+
+def _reset_after_fork() -> None:
+    if _buffer is not None:
+        _buffer.reset()
+
+
+atexit.register(flush_slow_queries)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
+
+from road_maintenance.admin_mixins import PerformanceAdminMixin
+
+from .models import Invoice, InvoiceLine
+
+
+class InvoiceLineInline(admin.TabularInline):
+    model = InvoiceLine
+    fields = ('description', 'unit', 'quantity', 'net_amount', 'work_items')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Invoice)
+class InvoiceAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    list_display = ('number', 'customer', 'project', 'period_start', 'gross_amount', 'due_date', 'xml_link')
+    list_select_related = ('customer', 'project')
+    list_defer = ('customer__notes', 'project__description')
+    list_filter = ('period_start', 'year')
+    search_fields = ('number', 'customer__name', 'customer__oib', 'project__name')
+    date_hierarchy = 'issue_date'
+    inlines = (InvoiceLineInline,)
+    readonly_fields = (
+        'number', 'year', 'sequence', 'customer', 'project', 'period_start', 'period_end', 'supplement',
+        'issue_date', 'due_date', 'currency', 'net_amount', 'vat_rate', 'vat_amount', 'gross_amount',
+        'xml_path', 'xml_sha256', 'created_at', 'generated_at',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/xml/',
+                self.admin_site.admin_view(self.download_view),
+                name='invoicing_invoice_xml',
+            ),
+        ] + super().get_urls()
+
+    @admin.display(description=_('XML'))
+    def xml_link(self, obj):
+        if not obj.xml_sha256:
+            return '–'
+        return format_html('<a href="{}">{}</a>', reverse('admin:invoicing_invoice_xml', args=[obj.pk]), _('Preuzmi'))
+
+    def download_view(self, request, pk):
+        invoice = get_object_or_404(Invoice, pk=pk)
+        xml = Path(invoice.xml_path) if invoice.xml_path else None
+        if xml is None or not xml.is_file():
+            raise Http404(_('XML datoteka ne postoji.'))
+        return FileResponse(xml.open('rb'), as_attachment=True, filename=xml.name, content_type='application/xml')
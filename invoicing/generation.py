@@ -0,0 +1,340 @@
+"""Month-end e-invoice generation.
+
+``generate_invoices(period)`` runs in two phases:
+
+1. In one transaction (serialised by an advisory lock) the completed
+   ``WorkItem``s of the month that no invoice covers yet are summed per
+   project and operation type by the database, an ``Invoice`` with its
+   ``InvoiceLine``s is created per project, and the items are recorded as
+   billed (``InvoicedWorkItem``). A project that already has an invoice for
+   the period gets a supplementary one for work orders completed in it
+   later. Numbers are allocated here, sequentially per year.
+2. Invoices of the period without an XML file are turned into plain
+   ``InvoiceDocument``s and written by a process pool (``invoicing.ubl``
+   needs no Django or database in the workers), then their path and SHA-256
+   are stored.
+
+Both phases skip what already exists, so re-running a period is safe and
+completes an interrupted run. The supplier settings are validated first, so
+no invoice is created that could not be rendered as a valid e-invoice.
+"""
+from __future__ import annotations
+
+import calendar
+import datetime
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from customers.models import Customer
+from projects.models import WorkItem
+
+from .models import Invoice, InvoiceLine
+from .ubl import InvoiceDocument, Line, Party, country_code, money, render_document
+
+# Key of pg_advisory_xact_lock held while invoices are created and numbered.
+INVOICE_LOCK_KEY = 0x1A40_1CE5
+# Supplier fields without which an e-invoice is rejected (seller ID, address
+# and the account to pay to).
+REQUIRED_SUPPLIER_FIELDS = ("name", "oib", "street", "city", "postal_code", "iban")
+OIB_RE = re.compile(r"^\d{11}$")
+IBAN_RE = re.compile(r"^[A-Z0-9]{15,34}$")
+# Temporary table with the items being invoiced in the current transaction.
+BATCH_TABLE = "invoicing_batch"
+
+AGGREGATE_SQL = f"""
+SELECT b.project_id, b.customer_id, b.operation_type_id, ot.name, ot.unit,
+       count(*), sum(b.quantity), sum(b.total_price)
+FROM {BATCH_TABLE} b
+JOIN operations_operationtype ot ON ot.id = b.operation_type_id
+GROUP BY b.project_id, b.customer_id, b.operation_type_id, ot.name, ot.unit
+ORDER BY b.project_id, ot.name
+"""
+
+# Records the batch's items as billed by the line of their project and
+# operation type.
+COVER_SQL = f"""
+INSERT INTO invoicing_invoicedworkitem (line_id, work_item_id)
+SELECT l.id, b.work_item_id
+FROM {BATCH_TABLE} b
+JOIN invoicing_invoice i ON i.project_id = b.project_id
+JOIN invoicing_invoiceline l ON l.invoice_id = i.id AND l.operation_type_id = b.operation_type_id
+WHERE i.id = ANY(%s)
+"""
+
+
+@dataclass
+class GenerationResult:
+    period_start: datetime.date
+    created: int = 0
+    supplementary: int = 0
+    rendered: int = 0
+    existing: int = 0
+
+
+def month_period(day: datetime.date) -> Tuple[datetime.date, datetime.date]:
+    """First and last day of the month containing ``day``."""
+    start = day.replace(day=1)
+    return start, start.replace(day=calendar.monthrange(start.year, start.month)[1])
+
+
+def supplier_party() -> Party:
+    """The supplier from ``INVOICING_SUPPLIER``; raises ImproperlyConfigured if incomplete."""
+    supplier = settings.INVOICING_SUPPLIER
+    missing = [name for name in REQUIRED_SUPPLIER_FIELDS if not (supplier.get(name) or "").strip()]
+    if missing:
+        raise ImproperlyConfigured(
+            "INVOICING_SUPPLIER is missing " + ", ".join(missing)
+            + " (set the INVOICING_SUPPLIER_* environment variables)."
+        )
+    if not OIB_RE.match(supplier["oib"]):
+        raise ImproperlyConfigured("INVOICING_SUPPLIER oib must be 11 digits.")
+    if not IBAN_RE.match(supplier["iban"]):
+        raise ImproperlyConfigured("INVOICING_SUPPLIER iban must be 15-34 capital letters and digits.")
+    return Party(
+        name=supplier["name"],
+        oib=supplier["oib"],
+        vat_id=supplier.get("vat_id", ""),
+        street=supplier.get("street", ""),
+        city=supplier.get("city", ""),
+        postal_code=supplier.get("postal_code", ""),
+        country=country_code(supplier.get("country", "HR")),
+        iban=supplier.get("iban", ""),
+        email=supplier.get("email", ""),
+    )
+
+
+def _format_number(year: int, sequence: int) -> str:
+    return settings.INVOICING_NUMBER_FORMAT.format(year=year, sequence=sequence)
+
+
+def create_invoices(
+    period_start: datetime.date,
+    customers: Optional[Sequence[int]] = None,
+    issue_date: Optional[datetime.date] = None,
+) -> Tuple[int, int]:
+    """Invoice the period's completed, not yet billed work items.
+
+    Returns the number of invoices created and how many of them are
+    supplementary, i.e. for projects that already had an invoice for the
+    period (work orders completed in it after that invoice was issued).
+    """
+    start, end = month_period(period_start)
+    issue_date = issue_date or timezone.localdate()
+    vat_rate = Decimal(settings.INVOICING_VAT_RATE)
+
+    items = WorkItem.objects.filter(
+        work_order__status="completed",
+        work_order__completed_date__range=(start, end),
+        invoiced__isnull=True,
+    )
+    if customers:
+        items = items.filter(work_order__project__customer__in=customers)
+    selection, selection_params = (
+        items.order_by()
+        .values_list(
+            "id",
+            "work_order__project_id",
+            "work_order__project__customer_id",
+            "operation_type_id",
+            "quantity",
+            "total_price",
+        )
+        .query.sql_with_params()
+    )
+
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", [INVOICE_LOCK_KEY])
+            # One snapshot of the items: the lines are summed from it and the
+            # same rows are recorded as billed, whatever commits meanwhile.
+            cur.execute(
+                f"CREATE TEMPORARY TABLE {BATCH_TABLE} "
+                f"(work_item_id, project_id, customer_id, operation_type_id, quantity, total_price) "
+                f"ON COMMIT DROP AS {selection}",
+                selection_params,
+            )
+            cur.execute(AGGREGATE_SQL)
+            rows = cur.fetchall()
+
+        by_project: Dict[int, List[tuple]] = {}
+        customer_of: Dict[int, int] = {}
+        for row in rows:
+            by_project.setdefault(row[0], []).append(row)
+            customer_of[row[0]] = row[1]
+        if not by_project:
+            with connection.cursor() as cur:
+                cur.execute(f"DROP TABLE {BATCH_TABLE}")
+            return 0, 0
+
+        terms = dict(
+            Customer.objects.filter(pk__in=set(customer_of.values())).values_list("pk", "payment_terms_days")
+        )
+        supplements = dict(
+            Invoice.objects.filter(period_start=start, project__in=list(by_project))
+            .values("project")
+            .annotate(last=Max("supplement"))
+            .values_list("project", "last")
+        )
+        year = issue_date.year
+        sequence = Invoice.objects.filter(year=year).aggregate(last=Max("sequence"))["last"] or 0
+
+        invoices = []
+        for project_id, lines in by_project.items():
+            sequence += 1
+            net = money(sum((row[7] or Decimal("0") for row in lines), Decimal("0")))
+            vat = money(net * vat_rate / 100)
+            customer_id = customer_of[project_id]
+            last = supplements.get(project_id)
+            invoices.append(
+                Invoice(
+                    number=_format_number(year, sequence),
+                    year=year,
+                    sequence=sequence,
+                    customer_id=customer_id,
+                    project_id=project_id,
+                    period_start=start,
+                    period_end=end,
+                    supplement=0 if last is None else last + 1,
+                    issue_date=issue_date,
+                    due_date=issue_date + datetime.timedelta(days=terms[customer_id]),
+                    net_amount=net,
+                    vat_rate=vat_rate,
+                    vat_amount=vat,
+                    gross_amount=net + vat,
+                )
+            )
+        Invoice.objects.bulk_create(invoices, batch_size=500)
+
+        InvoiceLine.objects.bulk_create(
+            (
+                InvoiceLine(
+                    invoice=invoice,
+                    operation_type_id=operation_type_id,
+                    description=name,
+                    unit=unit,
+                    quantity=quantity or Decimal("0"),
+                    net_amount=money(net or Decimal("0")),
+                    work_items=count,
+                )
+                for invoice in invoices
+                for _project, _customer, operation_type_id, name, unit, count, quantity, net in by_project[
+                    invoice.project_id
+                ]
+            ),
+            batch_size=2000,
+        )
+        with connection.cursor() as cur:
+            cur.execute(COVER_SQL, [[invoice.pk for invoice in invoices]])
+            cur.execute(f"DROP TABLE {BATCH_TABLE}")
+    return len(invoices), sum(1 for invoice in invoices if invoice.supplement)
+
+
+def _document(invoice: Invoice, supplier: Party) -> InvoiceDocument:
+    customer, project = invoice.customer, invoice.project
+    return InvoiceDocument(
+        invoice_id=invoice.pk,
+        number=invoice.number,
+        issue_date=invoice.issue_date.isoformat(),
+        due_date=invoice.due_date.isoformat(),
+        period_start=invoice.period_start.isoformat(),
+        period_end=invoice.period_end.isoformat(),
+        supplier=supplier,
+        customer=Party(
+            name=customer.name,
+            oib=customer.oib,
+            vat_id=customer.vat_id,
+            street=customer.street_address,
+            city=customer.city,
+            postal_code=customer.postal_code,
+            country=country_code(customer.country),
+            iban=customer.iban,
+            email=customer.contact_email,
+        ),
+        project_name=project.name,
+        contract_number=project.contract_number,
+        vat_rate=invoice.vat_rate,
+        currency=invoice.currency,
+        payment_terms_days=(invoice.due_date - invoice.issue_date).days,
+        lines=[
+            Line(description=line.description, unit=line.unit, quantity=line.quantity, net_amount=line.net_amount)
+            for line in invoice.lines.all()
+        ],
+    )
+
+
+def pending_invoices(period_start: datetime.date, customers: Optional[Sequence[int]] = None) -> List[Invoice]:
+    """Invoices of the period whose XML was never written or has gone missing."""
+    qs = Invoice.objects.filter(period_start=month_period(period_start)[0])
+    if customers:
+        qs = qs.filter(customer__in=customers)
+    qs = qs.select_related("customer", "project").prefetch_related("lines").order_by("pk")
+    return [inv for inv in qs if not inv.xml_sha256 or not os.path.exists(inv.xml_path)]
+
+
+def render_documents(
+    documents: Sequence[InvoiceDocument],
+    output_dir: Path,
+    workers: int = 1,
+) -> Iterator[Tuple[int, str, str, int]]:
+    """Write documents, in a pool of ``workers`` processes when more than one."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if workers <= 1 or len(documents) < 2:
+        yield from map(render_document, documents, repeat(str(output_dir)))
+        return
+    # Spawned, not forked: the parent has open DB sockets and background
+    # threads (metrics, login-event writer) that must not be duplicated. The
+    # connections are closed for the pool's lifetime unless a caller's
+    # transaction is still using them.
+    if not any(conn.in_atomic_block for conn in connections.all(initialized_only=True)):
+        connections.close_all()
+    chunksize = max(1, len(documents) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        yield from pool.map(render_document, documents, repeat(str(output_dir)), chunksize=chunksize)
+
+
+def generate_invoices(
+    period_start: datetime.date,
+    customers: Optional[Iterable[int]] = None,
+    workers: Optional[int] = None,
+    output_dir: Optional[Path] = None,
+    issue_date: Optional[datetime.date] = None,
+) -> GenerationResult:
+    customers = list(customers) if customers else None
+    start = month_period(period_start)[0]
+    supplier = supplier_party()
+    result = GenerationResult(period_start=start)
+    result.created, result.supplementary = create_invoices(start, customers=customers, issue_date=issue_date)
+
+    pending = pending_invoices(start, customers=customers)
+    total = Invoice.objects.filter(period_start=start)
+    if customers:
+        total = total.filter(customer__in=customers)
+    result.existing = total.count() - len(pending)
+    if not pending:
+        return result
+
+    documents = [_document(invoice, supplier) for invoice in pending]
+    by_id = {invoice.pk: invoice for invoice in pending}
+    output_dir = Path(output_dir or settings.INVOICING_OUTPUT_DIR) / f"{start:%Y-%m}"
+    now = timezone.now()
+    for invoice_id, path, sha256, _size in render_documents(
+        documents, output_dir, workers or settings.INVOICING_WORKERS
+    ):
+        invoice = by_id[invoice_id]
+        invoice.xml_path, invoice.xml_sha256, invoice.generated_at = path, sha256, now
+    Invoice.objects.bulk_update(pending, ["xml_path", "xml_sha256", "generated_at"], batch_size=500)
+    result.rendered = len(pending)
+    return result
@@ -0,0 +1,59 @@
+import datetime
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from invoicing.generation import generate_invoices, month_period
+
+
+def _month(value: str) -> datetime.date:
+    return datetime.datetime.strptime(value, "%Y-%m").date()
+
+
+class Command(BaseCommand):
+    help = (
+        "Izrađuje mjesečne e-račune (UBL 2.1) po projektu za završene stavke "
+        "rada. Ponovno pokretanje za isto razdoblje ne stvara duplikate: "
+        "dovršava račune kojima nedostaje XML, a naknadno završene stavke "
+        "naplaćuje dopunskim računom."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period", type=_month, help="Mjesec (YYYY-MM); zadano prethodni mjesec.")
+        parser.add_argument("--customer", type=int, action="append", dest="customers", help="ID kupca (ponovljivo).")
+        parser.add_argument("--issue-date", type=datetime.date.fromisoformat, help="Datum izdavanja (YYYY-MM-DD).")
+        parser.add_argument("--workers", type=int, help="Broj procesa za pisanje XML-a.")
+        parser.add_argument("--output-dir", help="Direktorij za XML datoteke.")
+
+    def handle(self, *args, **options):
+        period = options["period"] or month_period(timezone.localdate())[0] - datetime.timedelta(days=1)
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers mora biti barem 1.")
+
+        started = time.perf_counter()
+        try:
+            result = generate_invoices(
+                period,
+                customers=options["customers"],
+                workers=options["workers"],
+                output_dir=options["output_dir"],
+                issue_date=options["issue_date"],
+            )
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc))
+        if result.supplementary:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Dopunskih računa {result.supplementary}: nalozi završeni u razdoblju nakon "
+                    f"izdavanja redovnog računa."
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.period_start:%Y-%m}: novih računa {result.created}, "
+                f"generirano XML-a {result.rendered}, već gotovih {result.existing} "
+                f"({time.perf_counter() - started:.1f} s)"
+            )
+        )
@@ -0,0 +1,69 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('customers', '0002_alter_customer_options_alter_customer_bank_name_and_more'),
+        ('operations', '0002_operationprice'),
+        ('projects', '0007_workitem_updated_at_double_billing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.CharField(max_length=50, unique=True, verbose_name='Broj računa')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Godina')),
+                ('sequence', models.PositiveIntegerField(verbose_name='Redni broj')),
+                ('period_start', models.DateField(verbose_name='Razdoblje od')),
+                ('period_end', models.DateField(verbose_name='Razdoblje do')),
+                ('issue_date', models.DateField(verbose_name='Datum izdavanja')),
+                ('due_date', models.DateField(verbose_name='Datum dospijeća')),
+                ('currency', models.CharField(default='EUR', max_length=3, verbose_name='Valuta')),
+                ('net_amount', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Osnovica')),
+                ('vat_rate', models.DecimalField(decimal_places=2, max_digits=5, verbose_name='Stopa PDV-a (%)')),
+                ('vat_amount', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='PDV')),
+                ('gross_amount', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Ukupno')),
+                ('xml_path', models.CharField(blank=True, max_length=500, verbose_name='XML datoteka')),
+                ('xml_sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Kreirano')),
+                ('generated_at', models.DateTimeField(blank=True, null=True, verbose_name='XML generiran')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='invoices', to='customers.customer', verbose_name='Kupac')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='invoices', to='projects.project', verbose_name='Projekt')),
+            ],
+            options={
+                'verbose_name': 'Račun',
+                'verbose_name_plural': 'Računi',
+                'ordering': ['-year', '-sequence'],
+                'indexes': [models.Index(fields=['period_start', 'customer'], name='invoicing_period_customer_idx')],
+                'constraints': [
+                    models.UniqueConstraint(fields=('project', 'period_start'), name='invoicing_invoice_project_period_uniq'),
+                    models.UniqueConstraint(fields=('year', 'sequence'), name='invoicing_invoice_year_seq_uniq'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='InvoiceLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(max_length=255, verbose_name='Opis')),
+                ('unit', models.CharField(max_length=10, verbose_name='Jedinica mjere')),
+                ('quantity', models.DecimalField(decimal_places=3, max_digits=14, verbose_name='Količina')),
+                ('net_amount', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Iznos')),
+                ('work_items', models.PositiveIntegerField(verbose_name='Broj stavki rada')),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='invoicing.invoice', verbose_name='Račun')),
+                ('operation_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='operations.operationtype', verbose_name='Vrsta operacije')),
+            ],
+            options={
+                'verbose_name': 'Stavka računa',
+                'verbose_name_plural': 'Stavke računa',
+                'ordering': ['invoice', 'id'],
+            },
+        ),
+    ]
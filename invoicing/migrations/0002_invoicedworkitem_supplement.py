@@ -0,0 +1,56 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Invoices issued before coverage was recorded billed every completed item of
+# their project, period and operation type. They are all marked as billed, so a
+# re-run cannot bill them again; items of orders completed in the period after
+# the invoice was issued cannot be told apart and are marked too.
+BACKFILL = r"""
+INSERT INTO invoicing_invoicedworkitem (line_id, work_item_id)
+SELECT DISTINCT ON (wi.id) l.id, wi.id
+FROM invoicing_invoice i
+JOIN invoicing_invoiceline l ON l.invoice_id = i.id
+JOIN projects_workorder wo
+  ON wo.project_id = i.project_id
+ AND wo.status = 'completed'
+ AND wo.completed_date BETWEEN i.period_start AND i.period_end
+JOIN projects_workitem wi ON wi.work_order_id = wo.id AND wi.operation_type_id = l.operation_type_id
+ORDER BY wi.id, l.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoicing', '0001_initial'),
+        ('projects', '0007_workitem_updated_at_double_billing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='supplement',
+            field=models.PositiveSmallIntegerField(default=0, help_text='0 za redovni račun razdoblja, 1, 2, … za dopunske račune.', verbose_name='Dopuna'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='invoice',
+            name='invoicing_invoice_project_period_uniq',
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('project', 'period_start', 'supplement'), name='invoicing_invoice_project_period_uniq'),
+        ),
+        migrations.CreateModel(
+            name='InvoicedWorkItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='covered_items', to='invoicing.invoiceline', verbose_name='Stavka računa')),
+                ('work_item', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='invoiced', to='projects.workitem', verbose_name='Stavka rada')),
+            ],
+            options={
+                'verbose_name': 'Naplaćena stavka rada',
+                'verbose_name_plural': 'Naplaćene stavke rada',
+            },
+        ),
+        migrations.RunSQL(sql=BACKFILL, reverse_sql=migrations.RunSQL.noop),
+    ]
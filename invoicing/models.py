@@ -0,0 +1,122 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from customers.models import Customer
+from operations.models import OperationType
+from projects.models import Project, WorkItem
+
+
+class Invoice(models.Model):
+    """Mjesečni e-račun (UBL 2.1) kupcu za završene stavke rada jednog projekta.
+
+    Svaka stavka rada naplaćuje se jednom (``InvoicedWorkItem``), pa je ponovno
+    pokretanje generiranja sigurno: postojeći računi se ne dupliciraju, XML se
+    iznova piše samo ako nedostaje, a stavke rada koje su za razdoblje
+    završene naknadno naplaćuju se dopunskim računom (``supplement`` > 0).
+    """
+
+    number = models.CharField(_("Broj računa"), max_length=50, unique=True)
+    year = models.PositiveSmallIntegerField(_("Godina"))
+    sequence = models.PositiveIntegerField(_("Redni broj"))
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.PROTECT,
+        related_name="invoices",
+        verbose_name=_("Kupac"),
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.PROTECT,
+        related_name="invoices",
+        verbose_name=_("Projekt"),
+    )
+    period_start = models.DateField(_("Razdoblje od"))
+    period_end = models.DateField(_("Razdoblje do"))
+    supplement = models.PositiveSmallIntegerField(
+        _("Dopuna"),
+        default=0,
+        help_text=_("0 za redovni račun razdoblja, 1, 2, … za dopunske račune."),
+    )
+    issue_date = models.DateField(_("Datum izdavanja"))
+    due_date = models.DateField(_("Datum dospijeća"))
+    currency = models.CharField(_("Valuta"), max_length=3, default="EUR")
+    net_amount = models.DecimalField(_("Osnovica"), max_digits=14, decimal_places=2)
+    vat_rate = models.DecimalField(_("Stopa PDV-a (%)"), max_digits=5, decimal_places=2)
+    vat_amount = models.DecimalField(_("PDV"), max_digits=14, decimal_places=2)
+    gross_amount = models.DecimalField(_("Ukupno"), max_digits=14, decimal_places=2)
+    xml_path = models.CharField(_("XML datoteka"), max_length=500, blank=True)
+    xml_sha256 = models.CharField(_("SHA-256"), max_length=64, blank=True)
+    created_at = models.DateTimeField(_("Kreirano"), default=timezone.now)
+    generated_at = models.DateTimeField(_("XML generiran"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Račun")
+        verbose_name_plural = _("Računi")
+        ordering = ["-year", "-sequence"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "period_start", "supplement"], name="invoicing_invoice_project_period_uniq"
+            ),
+            models.UniqueConstraint(fields=["year", "sequence"], name="invoicing_invoice_year_seq_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["period_start", "customer"], name="invoicing_period_customer_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.number} – {self.customer.name}"
+
+
+class InvoiceLine(models.Model):
+    """Stavka računa: zbroj stavki rada jedne vrste operacije na projektu."""
+
+    invoice = models.ForeignKey(
+        Invoice,
+        on_delete=models.CASCADE,
+        related_name="lines",
+        verbose_name=_("Račun"),
+    )
+    operation_type = models.ForeignKey(
+        OperationType,
+        on_delete=models.PROTECT,
+        related_name="+",
+        verbose_name=_("Vrsta operacije"),
+    )
+    description = models.CharField(_("Opis"), max_length=255)
+    unit = models.CharField(_("Jedinica mjere"), max_length=10)
+    quantity = models.DecimalField(_("Količina"), max_digits=14, decimal_places=3)
+    net_amount = models.DecimalField(_("Iznos"), max_digits=14, decimal_places=2)
+    work_items = models.PositiveIntegerField(_("Broj stavki rada"))
+
+    class Meta:
+        verbose_name = _("Stavka računa")
+        verbose_name_plural = _("Stavke računa")
+        ordering = ["invoice", "id"]
+
+    def __str__(self) -> str:
+        return f"{self.description} ({self.quantity} {self.unit})"
+
+
+class InvoicedWorkItem(models.Model):
+    """Stavka rada obuhvaćena stavkom računa; svaka stavka rada naplaćuje se jednom."""
+
+    line = models.ForeignKey(
+        InvoiceLine,
+        on_delete=models.CASCADE,
+        related_name="covered_items",
+        verbose_name=_("Stavka računa"),
+    )
+    work_item = models.OneToOneField(
+        WorkItem,
+        on_delete=models.PROTECT,
+        related_name="invoiced",
+        verbose_name=_("Stavka rada"),
+    )
+
+    class Meta:
+        verbose_name = _("Naplaćena stavka rada")
+        verbose_name_plural = _("Naplaćene stavke rada")
+
+    def __str__(self) -> str:
+        return f"{self.line.invoice.number} – {self.work_item_id}"
@@ -0,0 +1,146 @@
+import datetime
+import hashlib
+import os
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from operations.models import OperationType
+from projects.models import Project, WorkItem, WorkOrder
+from road_maintenance.testing import create_work_fixtures
+
+from .generation import generate_invoices
+from .models import Invoice, InvoicedWorkItem
+
+SUPPLIER = {
+    "name": "Ceste d.o.o.",
+    "oib": "12345678903",
+    "vat_id": "HR12345678903",
+    "street": "Ilica 1",
+    "city": "Zagreb",
+    "postal_code": "10000",
+    "country": "HR",
+    "iban": "HR1723600001101234565",
+    "email": "",
+}
+PERIOD = datetime.date(2026, 9, 1)
+ISSUE_DATE = datetime.date(2026, 10, 1)
+
+
+@override_settings(INVOICING_SUPPLIER=SUPPLIER, INVOICING_VAT_RATE="25", INVOICING_NUMBER_FORMAT="{sequence}/1/1")
+class GenerateInvoicesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        data = create_work_fixtures()
+        cls.user, cls.project, cls.section = data["user"], data["project"], data["section"]
+        cls.mowing = data["operation"]
+        cls.markers = OperationType.objects.create(name="Smjerokazi", unit="kom", base_price=Decimal("20.00"))
+        cls.order = cls._completed_order(cls.project, datetime.date(2026, 9, 15))
+        for quantity in ("10", "30"):
+            cls._item(cls.order, cls.mowing, quantity)
+        cls._item(cls.order, cls.markers, "2")
+
+    @classmethod
+    def _completed_order(cls, project, completed_date):
+        return WorkOrder.objects.create(
+            project=project, title="Nalog", created_by=cls.user, status="completed", completed_date=completed_date
+        )
+
+    @classmethod
+    def _item(cls, order, operation, quantity):
+        return WorkItem.objects.create(
+            work_order=order,
+            road_section=cls.section,
+            operation_type=operation,
+            road_side="notap",
+            quantity=Decimal(quantity),
+        )
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output_dir = Path(tmp.name)
+
+    def _generate(self, workers=1):
+        return generate_invoices(PERIOD, workers=workers, output_dir=self.output_dir, issue_date=ISSUE_DATE)
+
+    def test_sums_completed_items_per_operation(self):
+        # Outside the period or not completed: not invoiced.
+        self._item(self._completed_order(self.project, datetime.date(2026, 10, 1)), self.mowing, "100")
+        open_order = WorkOrder.objects.create(project=self.project, title="Otvoren", created_by=self.user)
+        self._item(open_order, self.mowing, "100")
+
+        result = self._generate()
+        self.assertEqual((result.created, result.supplementary, result.rendered), (1, 0, 1))
+        invoice = Invoice.objects.get()
+        self.assertEqual(invoice.number, "1/1/1")
+        self.assertEqual((invoice.period_start, invoice.period_end), (PERIOD, datetime.date(2026, 9, 30)))
+        self.assertEqual(invoice.due_date, ISSUE_DATE + datetime.timedelta(days=30))
+        self.assertEqual(
+            [(line.description, line.quantity, line.net_amount, line.work_items) for line in invoice.lines.all()],
+            [("Rubna linija", Decimal("40"), Decimal("60.00"), 2), ("Smjerokazi", Decimal("2"), Decimal("40.00"), 1)],
+        )
+        self.assertEqual(
+            (invoice.net_amount, invoice.vat_amount, invoice.gross_amount),
+            (Decimal("100.00"), Decimal("25.00"), Decimal("125.00")),
+        )
+        self.assertEqual(InvoicedWorkItem.objects.filter(line__invoice=invoice).count(), 3)
+        with open(invoice.xml_path, "rb") as xml:
+            self.assertEqual(hashlib.sha256(xml.read()).hexdigest(), invoice.xml_sha256)
+
+    def test_numbers_are_sequential_per_year(self):
+        other = Project.objects.create(name="Druga", customer=self.project.customer, start_date=PERIOD)
+        self._item(self._completed_order(other, datetime.date(2026, 9, 30)), self.mowing, "1")
+        Invoice.objects.create(
+            number="7/1/1", year=2026, sequence=7, customer=self.project.customer, project=other,
+            period_start=datetime.date(2026, 8, 1), period_end=datetime.date(2026, 8, 31),
+            issue_date=ISSUE_DATE, due_date=ISSUE_DATE, net_amount=0, vat_rate=25, vat_amount=0, gross_amount=0,
+        )
+        self.assertEqual(self._generate().created, 2)
+        self.assertEqual(
+            sorted(Invoice.objects.filter(period_start=PERIOD).values_list("number", flat=True)), ["8/1/1", "9/1/1"]
+        )
+
+    def test_rerun_creates_nothing_and_rewrites_missing_xml(self):
+        self._generate()
+        result = self._generate()
+        self.assertEqual((result.created, result.rendered, result.existing), (0, 0, 1))
+
+        os.remove(Invoice.objects.get().xml_path)
+        result = self._generate()
+        self.assertEqual((result.created, result.rendered, result.existing), (0, 1, 0))
+        self.assertEqual(Invoice.objects.count(), 1)
+
+    def test_orders_completed_later_get_a_supplementary_invoice(self):
+        self._generate()
+        late = self._completed_order(self.project, datetime.date(2026, 9, 20))
+        self._item(late, self.mowing, "4")
+
+        result = self._generate()
+        self.assertEqual((result.created, result.supplementary), (1, 1))
+        supplementary = Invoice.objects.get(supplement=1)
+        self.assertEqual(supplementary.net_amount, Decimal("6.00"))
+        covered = InvoicedWorkItem.objects.filter(line__invoice=supplementary)
+        self.assertEqual(list(covered.values_list("work_item__work_order", flat=True)), [late.pk])
+        self.assertEqual(self._generate().created, 0)
+
+    def test_incomplete_supplier_is_rejected(self):
+        for field in ("oib", "iban", "name"):
+            with self.subTest(field=field), override_settings(INVOICING_SUPPLIER={**SUPPLIER, field: ""}):
+                with self.assertRaisesMessage(ImproperlyConfigured, field):
+                    self._generate()
+        with override_settings(INVOICING_SUPPLIER={**SUPPLIER, "oib": "1234"}):
+            self.assertRaises(ImproperlyConfigured, self._generate)
+        self.assertFalse(Invoice.objects.exists())
+
+    def test_process_pool_inside_a_transaction(self):
+        other = Project.objects.create(name="Druga", customer=self.project.customer, start_date=PERIOD)
+        self._item(self._completed_order(other, datetime.date(2026, 9, 30)), self.mowing, "1")
+
+        result = self._generate(workers=2)
+        self.assertEqual(result.rendered, 2)
+        # The TestCase transaction and its connection are still usable.
+        self.assertEqual(Invoice.objects.exclude(xml_sha256="").count(), 2)
@@ -0,0 +1,289 @@
+"""Streaming UBL 2.1 invoice writer (EN 16931 / Croatian e-Račun CIUS).
+
+Documents are written element by element with ``XMLGenerator`` straight to
+the output file, so memory stays flat whatever the number of lines. The
+module deliberately imports nothing from Django: ``render_document`` runs in
+worker processes of ``invoicing.generation`` that never set Django up.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import XMLGenerator
+
+NAMESPACES = {
+    "": "urn:oasis:names:specification:ubl:schema:xsd:Invoice-2",
+    "cac": "urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2",
+    "cbc": "urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2",
+}
+CUSTOMIZATION_ID = "urn:cen.eu:en16931:2017#compliant#urn:mfin.gov.hr:cius-2025:1.0"
+PROFILE_ID = "P1"
+INVOICE_TYPE_CODE = "380"
+CREDIT_TRANSFER = "30"
+OIB_SCHEME = "9934"
+
+# UN/ECE Recommendation 20 codes for OperationType.unit.
+UNIT_CODES = {
+    "m2": "MTK",
+    "m3": "MTQ",
+    "m": "MTR",
+    "kom": "H87",
+    "kg": "KGM",
+    "sat": "HUR",
+    "dan": "DAY",
+    "pšj": "C62",
+}
+COUNTRY_CODES = {"hrvatska": "HR", "croatia": "HR", "slovenija": "SI", "bosna i hercegovina": "BA", "srbija": "RS"}
+
+CENT = Decimal("0.01")
+
+
+def money(value) -> Decimal:
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def country_code(country: str) -> str:
+    value = (country or "").strip()
+    if len(value) == 2:
+        return value.upper()
+    return COUNTRY_CODES.get(value.lower(), "HR")
+
+
+@dataclass
+class Party:
+    name: str
+    oib: str
+    vat_id: str = ""
+    street: str = ""
+    city: str = ""
+    postal_code: str = ""
+    country: str = "HR"
+    iban: str = ""
+    email: str = ""
+
+
+@dataclass
+class Line:
+    description: str
+    unit: str
+    quantity: Decimal
+    net_amount: Decimal
+
+    @property
+    def price(self) -> Decimal:
+        if not self.quantity:
+            return self.net_amount
+        return (self.net_amount / self.quantity).quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
+
+
+@dataclass
+class InvoiceDocument:
+    invoice_id: int
+    number: str
+    issue_date: str
+    due_date: str
+    period_start: str
+    period_end: str
+    supplier: Party
+    customer: Party
+    project_name: str
+    contract_number: str = ""
+    vat_rate: Decimal = Decimal("25")
+    currency: str = "EUR"
+    payment_terms_days: int = 30
+    lines: List[Line] = field(default_factory=list)
+
+    @property
+    def net_amount(self) -> Decimal:
+        return money(sum((line.net_amount for line in self.lines), Decimal("0")))
+
+    @property
+    def vat_amount(self) -> Decimal:
+        return money(self.net_amount * self.vat_rate / 100)
+
+    @property
+    def gross_amount(self) -> Decimal:
+        return self.net_amount + self.vat_amount
+
+
+class _Writer:
+    def __init__(self, out):
+        self.gen = XMLGenerator(out, encoding="utf-8", short_empty_elements=True)
+
+    def start(self, name: str, attrs: Optional[Dict[str, str]] = None) -> None:
+        self.gen.startElement(name, attrs or {})
+
+    def end(self, name: str) -> None:
+        self.gen.endElement(name)
+
+    def text(self, name: str, value, attrs: Optional[Dict[str, str]] = None) -> None:
+        if value is None or value == "":
+            return
+        self.gen.startElement(name, attrs or {})
+        self.gen.characters(str(value))
+        self.gen.endElement(name)
+
+    def amount(self, name: str, value: Decimal, currency: str) -> None:
+        self.text(name, f"{value:.2f}", {"currencyID": currency})
+
+
+def _party(w: _Writer, tag: str, party: Party) -> None:
+    w.start(tag)
+    w.start("cac:Party")
+    w.text("cbc:EndpointID", party.oib, {"schemeID": OIB_SCHEME})
+    w.start("cac:PartyIdentification")
+    w.text("cbc:ID", f"{OIB_SCHEME}:{party.oib}")
+    w.end("cac:PartyIdentification")
+    w.start("cac:PartyName")
+    w.text("cbc:Name", party.name)
+    w.end("cac:PartyName")
+    w.start("cac:PostalAddress")
+    w.text("cbc:StreetName", party.street)
+    w.text("cbc:CityName", party.city)
+    w.text("cbc:PostalZone", party.postal_code)
+    w.start("cac:Country")
+    w.text("cbc:IdentificationCode", party.country)
+    w.end("cac:Country")
+    w.end("cac:PostalAddress")
+    if party.vat_id:
+        w.start("cac:PartyTaxScheme")
+        w.text("cbc:CompanyID", party.vat_id)
+        w.start("cac:TaxScheme")
+        w.text("cbc:ID", "VAT")
+        w.end("cac:TaxScheme")
+        w.end("cac:PartyTaxScheme")
+    w.start("cac:PartyLegalEntity")
+    w.text("cbc:RegistrationName", party.name)
+    w.text("cbc:CompanyID", party.oib)
+    w.end("cac:PartyLegalEntity")
+    if party.email:
+        w.start("cac:Contact")
+        w.text("cbc:ElectronicMail", party.email)
+        w.end("cac:Contact")
+    w.end("cac:Party")
+    w.end(tag)
+
+
+def _tax_category(w: _Writer, tag: str, rate: Decimal) -> None:
+    w.start(tag)
+    w.text("cbc:ID", "S")
+    w.text("cbc:Percent", f"{rate:.2f}")
+    w.start("cac:TaxScheme")
+    w.text("cbc:ID", "VAT")
+    w.end("cac:TaxScheme")
+    w.end(tag)
+
+
+def write_invoice(doc: InvoiceDocument, out) -> None:
+    """Write ``doc`` as a UBL 2.1 Invoice to the binary stream ``out``."""
+    w = _Writer(out)
+    cur = doc.currency
+    w.gen.startDocument()
+    w.start("Invoice", {("xmlns" if not p else f"xmlns:{p}"): uri for p, uri in NAMESPACES.items()})
+    w.text("cbc:CustomizationID", CUSTOMIZATION_ID)
+    w.text("cbc:ProfileID", PROFILE_ID)
+    w.text("cbc:ID", doc.number)
+    w.text("cbc:IssueDate", doc.issue_date)
+    w.text("cbc:DueDate", doc.due_date)
+    w.text("cbc:InvoiceTypeCode", INVOICE_TYPE_CODE)
+    w.text("cbc:Note", f"Radovi za razdoblje {doc.period_start} – {doc.period_end}, projekt {doc.project_name}")
+    w.text("cbc:DocumentCurrencyCode", cur)
+    w.start("cac:InvoicePeriod")
+    w.text("cbc:StartDate", doc.period_start)
+    w.text("cbc:EndDate", doc.period_end)
+    w.end("cac:InvoicePeriod")
+    if doc.contract_number:
+        w.start("cac:ContractDocumentReference")
+        w.text("cbc:ID", doc.contract_number)
+        w.end("cac:ContractDocumentReference")
+    w.start("cac:ProjectReference")
+    w.text("cbc:ID", doc.project_name)
+    w.end("cac:ProjectReference")
+
+    _party(w, "cac:AccountingSupplierParty", doc.supplier)
+    _party(w, "cac:AccountingCustomerParty", doc.customer)
+
+    w.start("cac:PaymentMeans")
+    w.text("cbc:PaymentMeansCode", CREDIT_TRANSFER)
+    w.text("cbc:PaymentID", f"HR00 {doc.number.split('/')[0]}-{doc.issue_date[:4]}")
+    if doc.customer.iban:
+        w.start("cac:PayerFinancialAccount")
+        w.text("cbc:ID", doc.customer.iban)
+        w.end("cac:PayerFinancialAccount")
+    w.start("cac:PayeeFinancialAccount")
+    w.text("cbc:ID", doc.supplier.iban)
+    w.end("cac:PayeeFinancialAccount")
+    w.end("cac:PaymentMeans")
+    w.start("cac:PaymentTerms")
+    w.text("cbc:Note", f"Rok plaćanja {doc.payment_terms_days} dana")
+    w.end("cac:PaymentTerms")
+
+    net, vat = doc.net_amount, doc.vat_amount
+    w.start("cac:TaxTotal")
+    w.amount("cbc:TaxAmount", vat, cur)
+    w.start("cac:TaxSubtotal")
+    w.amount("cbc:TaxableAmount", net, cur)
+    w.amount("cbc:TaxAmount", vat, cur)
+    _tax_category(w, "cac:TaxCategory", doc.vat_rate)
+    w.end("cac:TaxSubtotal")
+    w.end("cac:TaxTotal")
+
+    w.start("cac:LegalMonetaryTotal")
+    w.amount("cbc:LineExtensionAmount", net, cur)
+    w.amount("cbc:TaxExclusiveAmount", net, cur)
+    w.amount("cbc:TaxInclusiveAmount", net + vat, cur)
+    w.amount("cbc:PayableAmount", net + vat, cur)
+    w.end("cac:LegalMonetaryTotal")
+
+    for index, line in enumerate(doc.lines, start=1):
+        unit_code = UNIT_CODES.get(line.unit, "C62")
+        w.start("cac:InvoiceLine")
+        w.text("cbc:ID", index)
+        w.text("cbc:InvoicedQuantity", f"{line.quantity:.3f}", {"unitCode": unit_code})
+        w.amount("cbc:LineExtensionAmount", money(line.net_amount), cur)
+        w.start("cac:Item")
+        w.text("cbc:Name", line.description)
+        _tax_category(w, "cac:ClassifiedTaxCategory", doc.vat_rate)
+        w.end("cac:Item")
+        w.start("cac:Price")
+        w.text("cbc:PriceAmount", f"{line.price:.6f}", {"currencyID": cur})
+        w.end("cac:Price")
+        w.end("cac:InvoiceLine")
+
+    w.end("Invoice")
+    w.gen.endDocument()
+
+
+class _HashingFile:
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.raw.write(data)
+
+
+def file_name(number: str) -> str:
+    return number.replace("/", "-") + ".xml"
+
+
+def render_document(doc: InvoiceDocument, output_dir: str) -> Tuple[int, str, str, int]:
+    """Write ``doc`` under ``output_dir``; returns (invoice_id, path, sha256, bytes).
+
+    The file is written under a temporary name and renamed, so a crashed run
+    never leaves a truncated invoice behind.
+    """
+    path = Path(output_dir) / file_name(doc.number)
+    tmp = path.with_suffix(f".xml.{os.getpid()}.tmp")
+    with open(tmp, "wb", buffering=64 * 1024) as raw:
+        out = _HashingFile(raw)
+        write_invoice(doc, out)
+    os.replace(tmp, path)
+    return doc.invoice_id, str(path), out.sha256.hexdigest(), out.size
@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from .models import OperationType
+from .models import OperationPrice, OperationType
+
+
+class OperationPriceInline(admin.TabularInline):
+    model = OperationPrice
+    fields = ('price', 'valid_from', 'valid_to', 'note')
+    extra = 0
 
 
 @admin.register(OperationType)
@@ -9,3 +15,14 @@ class OperationTypeAdmin(admin.ModelAdmin):
     list_filter = ('unit', 'is_active')
     search_fields = ('name',)
     ordering = ('name',)
+    inlines = (OperationPriceInline,)
+
+
+@admin.register(OperationPrice)
+class OperationPriceAdmin(admin.ModelAdmin):
+    list_display = ('operation_type', 'price', 'valid_from', 'valid_to', 'note')
+    list_select_related = ('operation_type',)
+    list_filter = ('operation_type',)
+    date_hierarchy = 'valid_from'
+    autocomplete_fields = ('operation_type',)
+    ordering = ('operation_type__name', '-valid_from')
@@ -0,0 +1,179 @@
+"""Vectorised "what-if" cost estimates for an OperationType over many sections.
+
+``load_sections()`` reads ``id``, ``length`` and ``road_width`` of a selection
+in one query into NumPy arrays; ``estimate()`` then derives the quantity for
+every section and side in a single array pass and prices it, without creating
+``WorkItem`` rows. Quantities follow the operation's unit:
+
+* ``m2`` – length × effective width per side; the width is ``strip_width``
+  if given, otherwise half of ``road_width`` (each side covers its half of the
+  carriageway), then scaled by ``width_factor`` and shifted by ``width_delta``;
+* ``m``  – length per side;
+* ``kom`` – markers per side, one every ``spacing`` metres (rounded up).
+
+``side_factors`` scales each side independently, e.g. ``{"left": 1, "right": 0}``
+for one-sided works or ``0.5`` for a side done only on half of its length.
+
+Unless ``unit_price`` is given, the price is the one in force on ``as_of``
+(today by default) per ``OperationType.price_on()``, the same as new
+``WorkItem``s get.
+"""
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from roads.models import RoadSection
+
+from .models import OperationType
+
+SIDES = ("left", "right")
+SUPPORTED_UNITS = ("m2", "m", "kom")
+CENT = Decimal("0.01")
+
+
+@dataclass
+class SectionArrays:
+    ids: np.ndarray
+    length: np.ndarray
+    road_width: np.ndarray  # NaN where unknown
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class Estimate:
+    operation_type: OperationType
+    unit: str
+    unit_price: Decimal
+    sections: int
+    missing_width: List[int]
+    quantity_by_side: Dict[str, float]
+    cost_by_side: Dict[str, Decimal]
+    per_section: Optional[List[dict]] = field(default=None)
+
+    @property
+    def quantity(self) -> float:
+        return sum(self.quantity_by_side.values())
+
+    @property
+    def cost(self) -> Decimal:
+        return sum(self.cost_by_side.values(), Decimal("0.00"))
+
+    def as_dict(self) -> dict:
+        data = {
+            "operation_type": {"id": self.operation_type.pk, "name": self.operation_type.name},
+            "unit": self.unit,
+            "unit_price": str(self.unit_price),
+            "sections": self.sections,
+            "missing_width": self.missing_width,
+            "quantity": round(self.quantity, 3),
+            "cost": str(self.cost),
+            "by_side": {
+                side: {"quantity": round(self.quantity_by_side[side], 3), "cost": str(self.cost_by_side[side])}
+                for side in SIDES
+            },
+        }
+        if self.per_section is not None:
+            data["per_section"] = self.per_section
+        return data
+
+
+def load_sections(sections: Iterable[int] | None = None, active_only: bool = True) -> SectionArrays:
+    """Attributes of the given section ids (or the whole network) as arrays."""
+    qs = RoadSection.objects.order_by("id")
+    if active_only:
+        qs = qs.filter(is_active=True)
+    if sections is not None:
+        qs = qs.filter(pk__in=list(sections))
+    rows = list(qs.values_list("id", "length", "road_width"))
+    n = len(rows)
+    return SectionArrays(
+        ids=np.fromiter((r[0] for r in rows), dtype=np.int64, count=n),
+        length=np.fromiter((r[1] or 0 for r in rows), dtype=float, count=n),
+        road_width=np.fromiter((np.nan if r[2] is None else r[2] for r in rows), dtype=float, count=n),
+    )
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(repr(float(value))).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def estimate(
+    operation_type: OperationType,
+    sections: SectionArrays,
+    side_factors: Optional[Dict[str, float]] = None,
+    strip_width: Optional[float] = None,
+    width_factor: float = 1.0,
+    width_delta: float = 0.0,
+    default_width: Optional[float] = None,
+    spacing: float = 50.0,
+    unit_price: Optional[Decimal] = None,
+    per_section: bool = False,
+    as_of: Optional[datetime.date] = None,
+) -> Estimate:
+    """Quantities and costs of ``operation_type`` on every section and side.
+
+    Sections without ``road_width`` use ``default_width`` for ``m2`` (unless
+    ``strip_width`` is given); if that is not set either they count as zero
+    and are listed in ``Estimate.missing_width``.
+    """
+    unit = operation_type.unit
+    if unit not in SUPPORTED_UNITS:
+        raise ValueError(f"Procjena nije podržana za jedinicu '{unit}'.")
+    if unit == "kom" and spacing <= 0:
+        raise ValueError("Razmak oznaka mora biti pozitivan.")
+    factors = {side: 1.0 for side in SIDES}
+    factors.update(side_factors or {})
+    unknown = set(factors) - set(SIDES)
+    if unknown:
+        raise ValueError(f"Nepoznate strane: {', '.join(sorted(unknown))}")
+    price = operation_type.price_on(as_of) if unit_price is None else Decimal(unit_price)
+
+    length = sections.length
+    missing = np.zeros(len(sections), dtype=bool)
+    if unit == "m2":
+        if strip_width is not None:
+            width = np.full(len(sections), float(strip_width))
+        else:
+            missing = np.isnan(sections.road_width)
+            fallback = np.nan if default_width is None else float(default_width)
+            width = np.where(missing, fallback, sections.road_width) / 2.0
+            missing &= default_width is None
+        width = np.maximum(np.nan_to_num(width * width_factor + width_delta), 0.0)
+        per_side = length * width
+    elif unit == "m":
+        per_side = length
+    else:
+        per_side = np.ceil(length / spacing)
+
+    # (sections, sides) matrix: one column per side, scaled by its factor.
+    quantity = per_side[:, None] * np.array([factors[side] for side in SIDES], dtype=float)[None, :]
+    cost = quantity * float(price)
+
+    quantity_totals = quantity.sum(axis=0)
+    cost_totals = cost.sum(axis=0)
+    result = Estimate(
+        operation_type=operation_type,
+        unit=unit,
+        unit_price=price,
+        sections=len(sections),
+        missing_width=sections.ids[missing].tolist(),
+        quantity_by_side={side: float(quantity_totals[i]) for i, side in enumerate(SIDES)},
+        cost_by_side={side: _money(cost_totals[i]) for i, side in enumerate(SIDES)},
+    )
+    if per_section:
+        result.per_section = [
+            {
+                "road_section": int(section_id),
+                **{f"{side}_quantity": round(float(q), 3) for side, q in zip(SIDES, row_q)},
+                "cost": str(_money(row_c.sum())),
+            }
+            for section_id, row_q, row_c in zip(sections.ids, quantity, cost)
+        ]
+    return result
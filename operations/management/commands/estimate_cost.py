@@ -0,0 +1,75 @@
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from operations.estimation import SIDES, estimate, load_sections
+from operations.models import OperationType
+from roads.models import RoadSection
+
+
+class Command(BaseCommand):
+    help = (
+        "Procjena količina i troška vrste operacije na odabranim dionicama "
+        "(ili cijeloj mreži) bez kreiranja stavki rada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("operation", type=int, help="ID vrste operacije.")
+        parser.add_argument("--section", type=int, action="append", dest="sections", help="ID dionice (ponovljivo).")
+        parser.add_argument("--road-number", help="Sve aktivne dionice ceste, npr. D1.")
+        parser.add_argument("--left", type=float, default=1.0, help="Faktor lijeve strane.")
+        parser.add_argument("--right", type=float, default=1.0, help="Faktor desne strane.")
+        parser.add_argument("--strip-width", type=float, help="Širina trake po strani (m) umjesto pola širine ceste.")
+        parser.add_argument("--width-factor", type=float, default=1.0, help="Množitelj širine.")
+        parser.add_argument("--width-delta", type=float, default=0.0, help="Dodatak širini (m).")
+        parser.add_argument("--default-width", type=float, help="Širina ceste za dionice bez podatka (m).")
+        parser.add_argument("--spacing", type=float, default=50.0, help="Razmak oznaka za 'kom' (m).")
+        parser.add_argument("--unit-price", type=Decimal, help="Jedinična cijena umjesto one iz cjenika.")
+        parser.add_argument(
+            "--as-of", type=datetime.date.fromisoformat, help="Datum cjenika (YYYY-MM-DD), zadano danas."
+        )
+        parser.add_argument("--per-section", action="store_true", help="Uključi razradu po dionicama.")
+        parser.add_argument("--json", action="store_true", help="Ispis u JSON formatu.")
+
+    def handle(self, *args, **options):
+        try:
+            operation_type = OperationType.objects.get(pk=options["operation"])
+        except OperationType.DoesNotExist as exc:
+            raise CommandError(f"Vrsta operacije {options['operation']} ne postoji.") from exc
+
+        section_ids = options["sections"]
+        if options["road_number"]:
+            by_road = RoadSection.objects.filter(road_number=options["road_number"]).values_list("id", flat=True)
+            section_ids = list(section_ids or []) + list(by_road)
+        sections = load_sections(section_ids)
+
+        try:
+            result = estimate(
+                operation_type,
+                sections,
+                side_factors={"left": options["left"], "right": options["right"]},
+                strip_width=options["strip_width"],
+                width_factor=options["width_factor"],
+                width_delta=options["width_delta"],
+                default_width=options["default_width"],
+                spacing=options["spacing"],
+                unit_price=options["unit_price"],
+                per_section=options["per_section"],
+                as_of=options["as_of"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        if options["json"]:
+            self.stdout.write(json.dumps(result.as_dict(), ensure_ascii=False, indent=2))
+            return
+        self.stdout.write(f"{operation_type} × {result.sections} dionica, cijena {result.unit_price}")
+        for side in SIDES:
+            self.stdout.write(
+                f"  {side:6} {result.quantity_by_side[side]:14.2f} {result.unit}  {result.cost_by_side[side]:>14}"
+            )
+        if result.missing_width:
+            self.stdout.write(self.style.WARNING(f"Bez širine ceste: {len(result.missing_width)} dionica."))
+        self.stdout.write(self.style.SUCCESS(f"Ukupno: {result.quantity:.2f} {result.unit}, {result.cost}"))
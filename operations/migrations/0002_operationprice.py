@@ -0,0 +1,33 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OperationPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=6, max_digits=10, verbose_name='Cijena')),
+                ('valid_from', models.DateField(verbose_name='Vrijedi od')),
+                ('valid_to', models.DateField(blank=True, help_text='Prazno znači da cijena vrijedi do daljnjega.', null=True, verbose_name='Vrijedi do')),
+                ('note', models.CharField(blank=True, max_length=200, verbose_name='Napomena')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Datum kreiranja')),
+                ('operation_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prices', to='operations.operationtype', verbose_name='Vrsta operacije')),
+            ],
+            options={
+                'verbose_name': 'Cijena operacije',
+                'verbose_name_plural': 'Cjenik operacija',
+                'ordering': ['operation_type', '-valid_from'],
+                'constraints': [
+                    models.UniqueConstraint(fields=('operation_type', 'valid_from'), name='operations_price_version_uniq'),
+                    models.CheckConstraint(condition=models.Q(('valid_to__isnull', True), ('valid_to__gte', models.F('valid_from')), _connector='OR'), name='operations_price_valid_range'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+import operations.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0002_operationprice'),
+    ]
+
+    operations = [
+        # btree_gist provides the GiST "=" operator for operation_type_id.
+        BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name='operationprice',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('operation_type', '='), (operations.models.DateRange('valid_from', 'valid_to', django.contrib.postgres.fields.ranges.RangeBoundary(inclusive_lower=True, inclusive_upper=True)), '&&')], name='operations_price_no_overlap', violation_error_message='Razdoblje važenja se preklapa s postojećom cijenom.'),
+        ),
+    ]
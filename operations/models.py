@@ -1,4 +1,13 @@
+import datetime
+from decimal import Decimal
+from typing import Optional
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeBoundary, RangeOperators
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Func, Q
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -37,3 +46,84 @@ class OperationType(models.Model):
 
     def __str__(self) -> str:
         return f"{self.name} ({self.unit})"
+
+    def price_on(self, date: Optional[datetime.date] = None) -> Decimal:
+        """Cijena važeća na dan ``date`` (danas), ili ``base_price`` ako je nema u cjeniku."""
+        price = OperationPrice.objects.as_of(date or timezone.localdate()).filter(operation_type=self).first()
+        return price.price if price else self.base_price
+
+
+class OperationPriceQuerySet(models.QuerySet):
+    def as_of(self, date: datetime.date) -> "OperationPriceQuerySet":
+        """Cijene važeće na dan ``date``, najnovija verzija prva."""
+        return self.filter(
+            Q(valid_to__isnull=True) | Q(valid_to__gte=date),
+            valid_from__lte=date,
+        ).order_by("operation_type_id", "-valid_from")
+
+
+class DateRange(Func):
+    """``daterange(lower, upper, bounds)``; a NULL upper bound is unbounded."""
+
+    function = 'daterange'
+    output_field = DateRangeField()
+
+
+class OperationPrice(models.Model):
+    """Verzija cijene vrste operacije s razdobljem važenja (cjenik)."""
+
+    operation_type = models.ForeignKey(
+        OperationType,
+        on_delete=models.CASCADE,
+        verbose_name=_('Vrsta operacije'),
+        related_name='prices',
+    )
+    price = models.DecimalField(_('Cijena'), max_digits=10, decimal_places=6)
+    valid_from = models.DateField(_('Vrijedi od'))
+    valid_to = models.DateField(
+        _('Vrijedi do'),
+        null=True,
+        blank=True,
+        help_text=_("Prazno znači da cijena vrijedi do daljnjega."),
+    )
+    note = models.CharField(_('Napomena'), max_length=200, blank=True)
+    created_at = models.DateTimeField(_('Datum kreiranja'), auto_now_add=True)
+
+    objects = OperationPriceQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _('Cijena operacije')
+        verbose_name_plural = _('Cjenik operacija')
+        ordering = ['operation_type', '-valid_from']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['operation_type', 'valid_from'],
+                name='operations_price_version_uniq',
+            ),
+            models.CheckConstraint(
+                condition=Q(valid_to__isnull=True) | Q(valid_to__gte=models.F('valid_from')),
+                name='operations_price_valid_range',
+            ),
+            # Enforced by the database as well, so bulk_create, the shell or raw
+            # SQL cannot create two prices in force on the same day.
+            ExclusionConstraint(
+                name='operations_price_no_overlap',
+                expressions=[
+                    ('operation_type', RangeOperators.EQUAL),
+                    (
+                        DateRange('valid_from', 'valid_to', RangeBoundary(inclusive_lower=True, inclusive_upper=True)),
+                        RangeOperators.OVERLAPS,
+                    ),
+                ],
+                violation_error_message=_("Razdoblje važenja se preklapa s postojećom cijenom."),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        until = self.valid_to.isoformat() if self.valid_to else "…"
+        return f"{self.operation_type.name}: {self.price} ({self.valid_from.isoformat()} – {until})"
+
+    def clean(self) -> None:
+        # Overlapping periods are reported by the operations_price_no_overlap constraint.
+        if self.valid_to and self.valid_to < self.valid_from:
+            raise ValidationError({'valid_to': _("Datum završetka je prije datuma početka.")})
@@ -0,0 +1,124 @@
+import datetime
+from decimal import Decimal
+
+import numpy as np
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase
+
+from .estimation import SectionArrays, estimate
+from .models import OperationPrice, OperationType
+
+
+class OperationPriceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.operation = OperationType.objects.create(name="Košnja", unit="m2", base_price=Decimal("1.50"))
+        cls.other = OperationType.objects.create(name="Krpanje", unit="m2", base_price=Decimal("30.00"))
+        OperationPrice.objects.create(
+            operation_type=cls.operation, price=Decimal("2.00"),
+            valid_from=datetime.date(2025, 1, 1), valid_to=datetime.date(2025, 12, 31),
+        )
+        OperationPrice.objects.create(
+            operation_type=cls.operation, price=Decimal("3.00"), valid_from=datetime.date(2026, 1, 1)
+        )
+
+    def test_as_of(self):
+        def prices(day):
+            return list(OperationPrice.objects.as_of(day).values_list("price", flat=True))
+
+        self.assertEqual(prices(datetime.date(2024, 12, 31)), [])
+        self.assertEqual(prices(datetime.date(2025, 1, 1)), [Decimal("2.00")])
+        self.assertEqual(prices(datetime.date(2025, 12, 31)), [Decimal("2.00")])
+        self.assertEqual(prices(datetime.date(2026, 1, 1)), [Decimal("3.00")])
+        self.assertEqual(prices(datetime.date(2040, 1, 1)), [Decimal("3.00")])
+
+    def test_price_on_falls_back_to_base_price(self):
+        self.assertEqual(self.operation.price_on(datetime.date(2025, 6, 1)), Decimal("2.00"))
+        self.assertEqual(self.operation.price_on(datetime.date(2024, 6, 1)), Decimal("1.50"))
+        self.assertEqual(self.other.price_on(datetime.date(2025, 6, 1)), Decimal("30.00"))
+
+    def test_database_rejects_overlapping_periods(self):
+        for valid_from, valid_to in (
+            (datetime.date(2025, 12, 31), datetime.date(2025, 12, 31)),  # both ends are inclusive
+            (datetime.date(2024, 6, 1), None),
+            (datetime.date(2026, 6, 1), datetime.date(2026, 6, 30)),
+        ):
+            with self.subTest(valid_from=valid_from, valid_to=valid_to):
+                with self.assertRaises(IntegrityError), transaction.atomic():
+                    OperationPrice.objects.create(
+                        operation_type=self.operation, price=Decimal("9.00"), valid_from=valid_from, valid_to=valid_to
+                    )
+
+    def test_adjacent_periods_and_other_operations_are_allowed(self):
+        OperationPrice.objects.create(
+            operation_type=self.operation, price=Decimal("1.80"),
+            valid_from=datetime.date(2024, 1, 1), valid_to=datetime.date(2024, 12, 31),
+        )
+        OperationPrice.objects.create(
+            operation_type=self.other, price=Decimal("32.00"), valid_from=datetime.date(2025, 6, 1)
+        )
+        self.assertEqual(OperationPrice.objects.count(), 4)
+
+
+class EstimateTests(SimpleTestCase):
+    """``estimate()`` over hand-built sections; ``unit_price`` keeps it off the database."""
+
+    def setUp(self):
+        # 100 m at 6 m wide, 200 m of unknown width, 50 m at 8 m wide.
+        self.sections = SectionArrays(
+            ids=np.array([1, 2, 3]),
+            length=np.array([100.0, 200.0, 50.0]),
+            road_width=np.array([6.0, np.nan, 8.0]),
+        )
+
+    def _estimate(self, unit, **kwargs):
+        kwargs.setdefault("unit_price", Decimal("2.00"))
+        return estimate(OperationType(name="Radovi", unit=unit, base_price=Decimal("1.00")), self.sections, **kwargs)
+
+    def test_m2_uses_half_of_road_width_per_side(self):
+        result = self._estimate("m2")
+        # 100 × 3 + 200 × 0 + 50 × 4 on each side.
+        self.assertEqual(result.quantity_by_side, {"left": 500.0, "right": 500.0})
+        self.assertEqual(result.cost_by_side, {"left": Decimal("1000.00"), "right": Decimal("1000.00")})
+        self.assertEqual(result.cost, Decimal("2000.00"))
+        self.assertEqual(result.missing_width, [2])
+
+    def test_m2_default_width(self):
+        result = self._estimate("m2", default_width=5)
+        self.assertEqual(result.quantity_by_side["left"], 1000.0)
+        self.assertEqual(result.missing_width, [])
+
+    def test_m2_strip_width(self):
+        result = self._estimate("m2", strip_width=1)
+        self.assertEqual(result.quantity_by_side, {"left": 350.0, "right": 350.0})
+        self.assertEqual(result.missing_width, [])
+        self.assertEqual(self._estimate("m2", strip_width=1, width_factor=2, width_delta=-0.5).quantity, 1050.0)
+        self.assertEqual(self._estimate("m2", strip_width=1, width_delta=-2).quantity, 0.0)
+
+    def test_m(self):
+        result = self._estimate("m", unit_price=Decimal("0.333"))
+        self.assertEqual(result.quantity_by_side, {"left": 350.0, "right": 350.0})
+        self.assertEqual(result.cost_by_side["left"], Decimal("116.55"))
+        self.assertEqual(result.missing_width, [])
+
+    def test_kom_spacing_rounds_up(self):
+        # ceil(100 / 60) + ceil(200 / 60) + ceil(50 / 60) markers per side.
+        self.assertEqual(self._estimate("kom", spacing=60).quantity_by_side, {"left": 7.0, "right": 7.0})
+        with self.assertRaises(ValueError):
+            self._estimate("kom", spacing=0)
+
+    def test_side_factors(self):
+        self.assertEqual(
+            self._estimate("m", side_factors={"right": 0}).quantity_by_side, {"left": 350.0, "right": 0.0}
+        )
+        result = self._estimate("m", side_factors={"left": 0.5}, per_section=True)
+        self.assertEqual(result.quantity_by_side, {"left": 175.0, "right": 350.0})
+        self.assertEqual(
+            result.per_section[0], {"road_section": 1, "left_quantity": 50.0, "right_quantity": 100.0, "cost": "300.00"}
+        )
+        with self.assertRaises(ValueError):
+            self._estimate("m", side_factors={"middle": 1})
+
+    def test_unsupported_unit(self):
+        with self.assertRaises(ValueError):
+            self._estimate("h")
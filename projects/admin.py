@@ -1,17 +1,22 @@
 from django import forms
-from django.contrib import admin
-from django.contrib.gis import forms as gis_forms
+from django.contrib import admin, messages
 from django.utils.translation import gettext_lazy as _
 
-from .models import Project, WorkItem, WorkOrder
+from road_maintenance.admin_mixins import PerformanceAdminMixin, SelectRelatedFieldListFilter
+from roads.lazy_geometry import LazyGeometryAdminMixin, LazyGeometryFormMixin, LazyOSMWidget
+from search.admin_mixins import FullTextSearchAdminMixin
 
+from .exports import export_response
+from .models import DoubleBillingFinding, DoubleBillingRun, Project, WorkItem, WorkOrder
+from .repricing import OPEN_STATUSES, open_work_items, reprice_work_items
 
-class WorkItemAdminForm(forms.ModelForm):
+
+class WorkItemAdminForm(LazyGeometryFormMixin, forms.ModelForm):
     class Meta:
         model = WorkItem
         fields = '__all__'
         widgets = {
-            'geom': gis_forms.OSMWidget(
+            'geom': LazyOSMWidget(
                 attrs={
                     'map_width': 800,
                     'map_height': 600,
@@ -25,10 +30,14 @@ class WorkItemAdminForm(forms.ModelForm):
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(FullTextSearchAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'customer', 'start_date', 'end_date', 'is_active')
+    list_select_related = ('customer',)
+    list_defer = ('description', 'customer__notes')
     list_filter = ('is_active', 'customer')
     search_fields = ('name', 'contract_number', 'customer__name')
+    search_kind = 'project'
+    autocomplete_fields = ('customer',)
     ordering = ('-created_at',)
     readonly_fields = ('created_at',)
     fieldsets = (
@@ -55,13 +64,26 @@ class ProjectAdmin(admin.ModelAdmin):
         ),
         (_('Praćenje'), {'fields': ('created_at',)}),
     )
+    actions = ('export_items_csv', 'export_items_xlsx')
+
+    @admin.action(description=_('Izvoz stavki rada (CSV)'))
+    def export_items_csv(self, request, queryset):
+        return export_response(WorkItem.objects.filter(work_order__project__in=queryset), 'csv')
+
+    @admin.action(description=_('Izvoz stavki rada (XLSX)'))
+    def export_items_xlsx(self, request, queryset):
+        return export_response(WorkItem.objects.filter(work_order__project__in=queryset), 'xlsx')
 
 
 @admin.register(WorkOrder)
-class WorkOrderAdmin(admin.ModelAdmin):
+class WorkOrderAdmin(FullTextSearchAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ('number', 'title', 'project', 'status', 'scheduled_date', 'completed_date')
+    list_select_related = ('project__customer',)
+    list_defer = ('description', 'project__description', 'project__customer__notes')
     list_filter = ('status', 'project__customer')
     search_fields = ('number', 'title', 'project__name')
+    search_kind = 'work_order'
+    autocomplete_fields = ('project', 'created_by')
     ordering = ('-created_at',)
     readonly_fields = ('created_at',)
     fieldsets = (
@@ -77,10 +99,30 @@ class WorkOrderAdmin(admin.ModelAdmin):
         ),
         (_('Evidencija'), {'fields': ('created_by', 'created_at')}),
     )
+    actions = ('reprice',)
+
+    @admin.action(description=_('Ponovno obračunaj stavke prema važećem cjeniku'))
+    def reprice(self, request, queryset):
+        # Completed and cancelled orders may already be invoiced; their prices stay as billed.
+        closed = queryset.exclude(status__in=OPEN_STATUSES).count()
+        result = reprice_work_items(open_work_items().filter(work_order__in=queryset))
+        self.message_user(
+            request,
+            _('Preračunato stavki: %(items)d u %(orders)d naloga') % {
+                'items': result.items,
+                'orders': len(result.work_orders),
+            },
+        )
+        if closed:
+            self.message_user(
+                request,
+                _('Preskočeno zatvorenih naloga (završeni ili otkazani): %(count)d') % {'count': closed},
+                messages.WARNING,
+            )
 
 
 @admin.register(WorkItem)
-class WorkItemAdmin(admin.ModelAdmin):
+class WorkItemAdmin(LazyGeometryAdminMixin, FullTextSearchAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
     form = WorkItemAdminForm
     list_display = (
         'work_order',
@@ -91,12 +133,25 @@ class WorkItemAdmin(admin.ModelAdmin):
         'total_price',
         'road_side',
     )
-    list_filter = ('operation_type', 'road_side', 'work_order__project')
+    list_select_related = ('work_order', 'operation_type', 'road_section')
+    list_defer = (
+        'geom',
+        'description',
+        'notes',
+        'work_order__description',
+        'operation_type__description',
+        'road_section__geom',
+        'road_section__description',
+    )
+    list_filter = ('operation_type', 'road_side', ('work_order__project', SelectRelatedFieldListFilter))
     search_fields = (
         'work_order__number',
         'operation_type__name',
         'road_section__name',
     )
+    search_kind = 'work_item'
+    # Autocomplete keeps the form from rendering every section/order/operation as <option>.
+    autocomplete_fields = ('work_order', 'operation_type', 'road_section')
     readonly_fields = ('total_price',)
     fieldsets = (
         (None, {
@@ -118,3 +173,82 @@ class WorkItemAdmin(admin.ModelAdmin):
         (_('Geometrija'), {'fields': ('geom',)}),
         (_('Napomene'), {'fields': ('notes',)}),
     )
+    actions = ('export_csv', 'export_xlsx')
+
+    @admin.action(description=_('Izvoz odabranih stavki (CSV)'))
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'csv')
+
+    @admin.action(description=_('Izvoz odabranih stavki (XLSX)'))
+    def export_xlsx(self, request, queryset):
+        return export_response(queryset, 'xlsx')
+
+
+@admin.register(DoubleBillingFinding)
+class DoubleBillingFindingAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    list_display = (
+        'amount_at_risk',
+        'overlap',
+        'overlap_ratio',
+        'item_a',
+        'item_b',
+        'road_section',
+        'period_start',
+        'status',
+        'detected_at',
+    )
+    list_select_related = (
+        'item_a__work_order',
+        'item_a__operation_type',
+        'item_b__work_order',
+        'item_b__operation_type',
+        'road_section',
+    )
+    list_defer = (
+        'item_a__geom',
+        'item_a__description',
+        'item_a__notes',
+        'item_b__geom',
+        'item_b__description',
+        'item_b__notes',
+        'road_section__geom',
+        'road_section__description',
+    )
+    list_filter = ('status', 'period_start')
+    search_fields = ('road_section__name', 'item_a__work_order__number', 'item_b__work_order__number')
+    readonly_fields = (
+        'item_a',
+        'item_b',
+        'road_section',
+        'period_start',
+        'overlap',
+        'overlap_ratio',
+        'amount_at_risk',
+        'detected_at',
+    )
+    actions = ('mark_confirmed', 'mark_dismissed')
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description=_('Označi kao potvrđenu dvostruku naplatu'))
+    def mark_confirmed(self, request, queryset):
+        updated = queryset.update(status=DoubleBillingFinding.Status.CONFIRMED)
+        self.message_user(request, _('Potvrđeno nalaza: %(count)d') % {'count': updated})
+
+    @admin.action(description=_('Odbaci (nije dvostruka naplata)'))
+    def mark_dismissed(self, request, queryset):
+        updated = queryset.update(status=DoubleBillingFinding.Status.DISMISSED)
+        self.message_user(request, _('Odbačeno nalaza: %(count)d') % {'count': updated})
+
+
+@admin.register(DoubleBillingRun)
+class DoubleBillingRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'finished_at', 'window', 'watermark', 'items_checked', 'findings')
+    readonly_fields = list_display
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,176 @@
+"""Detector of WorkItems that may be billed twice.
+
+Two items are suspicious when they share ``road_section``, ``road_side`` and
+``operation_type``, their work orders fall in the same time window (the
+``date_trunc`` of the completion date, else the scheduled date, else the
+creation date) and their ``geom`` overlap. The overlap (area, or length for
+linear geometry) is prorated against each item's own size and price; the
+smaller of the two amounts is the amount at risk.
+
+A run only looks at items changed since the previous run's watermark
+(``WorkItem.updated_at``), minus ``DOUBLE_BILLING_WATERMARK_OVERLAP``:
+``updated_at`` is set when the row is saved, not when it commits, so an item
+saved just before one run but committed after it would otherwise fall below
+the next run's watermark. Items in the overlap are checked twice, which is
+harmless because findings are upserted per item pair. Changing a work
+order's dates moves its items to another period; a trigger (migration 0008)
+then bumps ``updated_at`` of those items so the next run sees them.
+
+Each changed item is joined against its partition through the GiST index on
+``geom``. Road sections are processed in batches so one statement never spans
+the whole table. Findings are upserted per item
+pair; open findings of changed items that no longer overlap are removed.
+"""
+from __future__ import annotations
+
+import datetime
+from decimal import Decimal
+from typing import Iterator, List, Optional, Sequence
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import DoubleBillingFinding, DoubleBillingRun, WorkItem
+
+WINDOWS = ("week", "month", "quarter", "year")
+
+PERIOD_SQL = (
+    "date_trunc(%(window)s, COALESCE({wo}.completed_date, {wo}.scheduled_date, {wo}.created_at::date)"
+    "::timestamp)::date"
+)
+
+CHANGED_SQL = """
+    {wi}.updated_at <= %(until)s
+    AND (%(since)s::timestamptz IS NULL OR {wi}.updated_at > %(since)s::timestamptz)
+"""
+
+UPSERT_SQL = f"""
+WITH changed AS (
+    SELECT wi.id, wi.road_section_id, wi.road_side, wi.operation_type_id, wi.geom,
+           {PERIOD_SQL.format(wo="wo")} AS period
+    FROM projects_workitem wi
+    JOIN projects_workorder wo ON wo.id = wi.work_order_id
+    WHERE wi.road_section_id = ANY(%(sections)s)
+      AND wi.geom IS NOT NULL
+      AND {CHANGED_SQL.format(wi="wi")}
+),
+pairs AS (
+    SELECT DISTINCT LEAST(c.id, o.id) AS a_id, GREATEST(c.id, o.id) AS b_id, c.period
+    FROM changed c
+    JOIN projects_workitem o
+      ON o.road_section_id = c.road_section_id
+     AND o.road_side = c.road_side
+     AND o.operation_type_id = c.operation_type_id
+     AND o.id <> c.id
+     AND o.geom && c.geom
+    JOIN projects_workorder owo ON owo.id = o.work_order_id
+    WHERE {PERIOD_SQL.format(wo="owo")} = c.period
+),
+measured AS (
+    SELECT p.a_id, p.b_id, p.period, a.road_section_id,
+           a.total_price::double precision AS price_a,
+           b.total_price::double precision AS price_b,
+           ST_Intersection(a.geom, b.geom) AS overlap_geom,
+           CASE ST_Dimension(a.geom) WHEN 2 THEN ST_Area(a.geom) ELSE ST_Length(a.geom) END AS size_a,
+           CASE ST_Dimension(b.geom) WHEN 2 THEN ST_Area(b.geom) ELSE ST_Length(b.geom) END AS size_b
+    FROM pairs p
+    JOIN projects_workitem a ON a.id = p.a_id
+    JOIN projects_workitem b ON b.id = p.b_id
+    WHERE ST_Intersects(a.geom, b.geom)
+),
+scored AS (
+    SELECT *,
+           CASE ST_Dimension(overlap_geom)
+               WHEN 2 THEN ST_Area(overlap_geom)
+               WHEN 1 THEN ST_Length(overlap_geom)
+               ELSE 0
+           END AS overlap
+    FROM measured
+)
+INSERT INTO projects_doublebillingfinding
+    (item_a_id, item_b_id, road_section_id, period_start, overlap, overlap_ratio,
+     amount_at_risk, status, detected_at)
+SELECT a_id, b_id, road_section_id, period,
+       round(overlap::numeric, 3),
+       round(LEAST(1, overlap / NULLIF(LEAST(size_a, size_b), 0))::numeric, 4),
+       round(LEAST(
+           COALESCE(price_a * overlap / NULLIF(size_a, 0), 0),
+           COALESCE(price_b * overlap / NULLIF(size_b, 0), 0)
+       )::numeric, 2),
+       'open',
+       %(until)s
+FROM scored
+WHERE overlap >= %(min_overlap)s
+ON CONFLICT (item_a_id, item_b_id) DO UPDATE SET
+    road_section_id = EXCLUDED.road_section_id,
+    period_start = EXCLUDED.period_start,
+    overlap = EXCLUDED.overlap,
+    overlap_ratio = EXCLUDED.overlap_ratio,
+    amount_at_risk = EXCLUDED.amount_at_risk,
+    detected_at = EXCLUDED.detected_at
+"""
+
+STALE_SQL = f"""
+DELETE FROM projects_doublebillingfinding f
+USING projects_workitem wi
+WHERE (f.item_a_id = wi.id OR f.item_b_id = wi.id)
+  AND f.status = 'open'
+  AND f.detected_at < %(until)s
+  AND {CHANGED_SQL.format(wi="wi")}
+"""
+
+
+def _chunks(values: Sequence[int], size: int) -> Iterator[List[int]]:
+    for start in range(0, len(values), size):
+        yield list(values[start:start + size])
+
+
+def last_watermark(window: str) -> Optional[datetime.datetime]:
+    run = (
+        DoubleBillingRun.objects.filter(window=window, finished_at__isnull=False)
+        .order_by("-watermark")
+        .first()
+    )
+    return run.watermark if run else None
+
+
+def detect_double_billing(
+    window: str = "month",
+    full: bool = False,
+    sections_per_batch: int = 500,
+    min_overlap: Decimal = Decimal("0.01"),
+    watermark_overlap: Optional[datetime.timedelta] = None,
+) -> DoubleBillingRun:
+    """Check items changed since the last run (all items with ``full``)."""
+    if window not in WINDOWS:
+        raise ValueError(f"window must be one of {', '.join(WINDOWS)}")
+    if watermark_overlap is None:
+        watermark_overlap = datetime.timedelta(seconds=settings.DOUBLE_BILLING_WATERMARK_OVERLAP)
+
+    until = timezone.now()
+    since = None if full else last_watermark(window)
+    if since is not None:
+        since -= watermark_overlap
+    run = DoubleBillingRun.objects.create(started_at=until, watermark=until, window=window)
+
+    changed = WorkItem.objects.filter(updated_at__lte=until)
+    if since is not None:
+        changed = changed.filter(updated_at__gt=since)
+    run.items_checked = changed.count()
+    section_ids = sorted(
+        changed.exclude(road_section=None).order_by().values_list("road_section_id", flat=True).distinct()
+    )
+
+    params = {"until": until, "since": since, "window": window, "min_overlap": float(min_overlap)}
+    for batch in _chunks(section_ids, sections_per_batch):
+        with transaction.atomic(), connection.cursor() as cur:
+            cur.execute(UPSERT_SQL, {**params, "sections": batch})
+
+    with connection.cursor() as cur:
+        cur.execute(STALE_SQL, params)
+
+    run.findings = DoubleBillingFinding.objects.filter(detected_at=until).count()
+    run.finished_at = timezone.now()
+    run.save(update_fields=["items_checked", "findings", "finished_at"])
+    return run
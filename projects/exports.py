@@ -0,0 +1,187 @@
+"""Streaming CSV/XLSX export of WorkItems for accounting.
+
+Rows come from ``values_list(...).iterator(chunk_size=...)``, which on
+PostgreSQL reads through a server-side cursor, so at most one chunk of plain
+tuples is in memory whatever the size of the project. CSV is produced
+incrementally (a generator of encoded lines, for ``StreamingHttpResponse`` or
+a file); XLSX goes through XlsxWriter's ``constant_memory`` mode, which
+flushes every row to disk as soon as the next one starts, into a temporary
+file that is then streamed back.
+"""
+from __future__ import annotations
+
+import csv
+import datetime
+import tempfile
+from decimal import Decimal
+from typing import IO, Iterable, Iterator, Optional, Sequence, Tuple
+
+from django.db.models import QuerySet
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .models import WorkItem
+
+# (lookup, header)
+COLUMNS: Sequence[Tuple[str, str]] = (
+    ("id", "ID stavke"),
+    ("work_order__number", "Broj naloga"),
+    ("work_order__title", "Naziv naloga"),
+    ("work_order__status", "Status naloga"),
+    ("work_order__scheduled_date", "Planirano"),
+    ("work_order__completed_date", "Završeno"),
+    ("work_order__project__name", "Projekt"),
+    ("work_order__project__contract_number", "Broj ugovora"),
+    ("work_order__project__customer__name", "Kupac"),
+    ("work_order__project__customer__oib", "OIB kupca"),
+    ("road_section_id", "ID dionice"),
+    ("road_section__name", "Dionica"),
+    ("road_section__road_number", "Broj ceste"),
+    ("road_side", "Strana"),
+    ("operation_type__name", "Operacija"),
+    ("operation_type__unit", "Jedinica"),
+    ("quantity", "Količina"),
+    ("unit_price", "Jedinična cijena"),
+    ("total_price", "Ukupna cijena"),
+)
+CHUNK_SIZE = 5000
+# Leading characters that make spreadsheet applications read a CSV cell as a
+# formula; such text is prefixed with an apostrophe.
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Rows per worksheet in the XLSX format, header included.
+XLSX_MAX_ROWS = 1_048_576
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def work_items_for_export(
+    project: Optional[int] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> QuerySet:
+    """Items of a project and/or of work orders completed in a period."""
+    qs = WorkItem.objects.all()
+    if project:
+        qs = qs.filter(work_order__project=project)
+    if date_from:
+        qs = qs.filter(work_order__completed_date__gte=date_from)
+    if date_to:
+        qs = qs.filter(work_order__completed_date__lte=date_to)
+    return qs
+
+
+def export_rows(queryset: QuerySet, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    """Plain tuples in ``COLUMNS`` order, read from a server-side cursor."""
+    return (
+        queryset.order_by("work_order_id", "id")
+        .values_list(*(lookup for lookup, _header in COLUMNS))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the line instead of storing it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _csv_text(value):
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(rows: Iterable[tuple]) -> Iterator[bytes]:
+    """Encoded CSV lines; starts with a BOM so Excel reads the UTF-8 text.
+
+    Text that would be read as a formula (titles and names are user-entered)
+    is neutralised with a leading apostrophe; numbers are written as they are.
+    """
+    writer = csv.writer(_Echo())
+    yield "\ufeff".encode("utf-8") + writer.writerow([header for _lookup, header in COLUMNS]).encode("utf-8")
+    for row in rows:
+        yield writer.writerow([_csv_text(value) for value in row]).encode("utf-8")
+
+
+def write_csv(rows: Iterable[tuple], out: IO[bytes]) -> int:
+    count = -1
+    for count, line in enumerate(iter_csv(rows)):
+        out.write(line)
+    return max(count, 0)
+
+
+def write_xlsx(rows: Iterable[tuple], out: IO[bytes]) -> int:
+    """Write an XLSX workbook to the seekable binary file ``out``.
+
+    A worksheet holds at most ``XLSX_MAX_ROWS`` rows (XlsxWriter silently
+    ignores writes past that), so longer exports continue on further sheets,
+    each with its own header row. Text is always stored as a string, never
+    as a formula or hyperlink.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(
+        out,
+        {
+            "constant_memory": True,
+            "in_memory": False,
+            "strings_to_formulas": False,
+            "strings_to_urls": False,
+            "strings_to_numbers": False,
+        },
+    )
+    bold = workbook.add_format({"bold": True})
+    date_format = workbook.add_format({"num_format": "dd.mm.yyyy."})
+    number_format = workbook.add_format({"num_format": "#,##0.00"})
+
+    def add_sheet(number: int):
+        sheet = workbook.add_worksheet("Stavke rada" if number == 1 else f"Stavke rada ({number})")
+        sheet.write_row(0, 0, [header for _lookup, header in COLUMNS], bold)
+        sheet.freeze_panes(1, 0)
+        return sheet
+
+    sheets = 1
+    sheet = add_sheet(sheets)
+    count = line = 0
+    for count, row in enumerate(rows, start=1):
+        line += 1
+        if line >= XLSX_MAX_ROWS:
+            sheets += 1
+            sheet, line = add_sheet(sheets), 1
+        for col, value in enumerate(row):
+            if value is None:
+                continue
+            if isinstance(value, datetime.date):
+                sheet.write_datetime(line, col, value, date_format)
+            elif isinstance(value, Decimal):
+                sheet.write_number(line, col, float(value), number_format)
+            elif isinstance(value, (int, float)):
+                sheet.write_number(line, col, value)
+            else:
+                sheet.write_string(line, col, str(value))
+    workbook.close()
+    return count
+
+
+def _file_name(fmt: str, project: Optional[int]) -> str:
+    scope = f"projekt-{project}" if project else "stavke"
+    return f"{scope}-{timezone.localdate():%Y%m%d}.{fmt}"
+
+
+def export_response(queryset: QuerySet, fmt: str = "csv", project: Optional[int] = None):
+    """HTTP download of the queryset; CSV streamed, XLSX via a temporary file."""
+    file_name = _file_name(fmt, project)
+    if fmt == "csv":
+        response = StreamingHttpResponse(iter_csv(export_rows(queryset)), content_type=CONTENT_TYPES["csv"])
+        response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+        return response
+    if fmt != "xlsx":
+        raise ValueError(f"Nepoznat format: {fmt}")
+    # Deleted on close, i.e. once FileResponse has streamed it.
+    tmp = tempfile.TemporaryFile(suffix=".xlsx")
+    write_xlsx(export_rows(queryset), tmp)
+    tmp.seek(0)
+    return FileResponse(tmp, as_attachment=True, filename=file_name, content_type=CONTENT_TYPES["xlsx"])
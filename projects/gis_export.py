@@ -0,0 +1,240 @@
+"""Streaming GeoPackage/Shapefile export of WorkItem and RoadSection geometry.
+
+Features are read with ``ST_AsBinary`` through a server-side cursor
+(``connection.chunked_cursor()``) and handed to OGR (``pyogrio``) one chunk at
+a time: the first chunk creates the layer, later ones are appended. At most
+``chunk_size`` rows of WKB are in memory, whatever the size of the export.
+
+Layers:
+
+* ``work_items`` – ``WorkItem.geom`` with work order, project, customer,
+  operation and price attributes;
+* ``road_sections`` – ``RoadSection.geom``; with a project, customer or period
+  filter only sections that carry a matching work item.
+
+The result is a temporary file (Shapefiles are zipped, one ``.shp`` per
+layer), unlinked as soon as it is opened, so the returned handle is the only
+reference and closing it frees the space.
+"""
+from __future__ import annotations
+
+import datetime
+import os
+import shutil
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from typing import IO, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import connection, transaction
+
+FORMATS = {
+    "gpkg": ("GPKG", "application/geopackage+sqlite3"),
+    "shp": ("ESRI Shapefile", "application/zip"),
+}
+OUTPUT_SRIDS = (3765, 4326)
+CHUNK_SIZE = 10_000
+
+# (field name, SQL expression, kind); names fit the 10-character dBase limit.
+WORK_ITEM_FIELDS: Sequence[Tuple[str, str, str]] = (
+    ("id", "wi.id", "int"),
+    ("wo_number", "wo.number", "str"),
+    ("wo_status", "wo.status", "str"),
+    ("completed", "wo.completed_date", "date"),
+    ("project", "p.name", "str"),
+    ("customer", "c.name", "str"),
+    ("cust_oib", "c.oib", "str"),
+    ("section_id", "wi.road_section_id", "int"),
+    ("road_side", "wi.road_side", "str"),
+    ("operation", "ot.name", "str"),
+    ("unit", "ot.unit", "str"),
+    ("quantity", "wi.quantity", "float"),
+    ("unit_price", "wi.unit_price", "float"),
+    ("total", "wi.total_price", "float"),
+)
+ROAD_SECTION_FIELDS: Sequence[Tuple[str, str, str]] = (
+    ("id", "rs.id", "int"),
+    ("name", "rs.name", "str"),
+    ("road_no", "rs.road_number", "str"),
+    ("length_m", "rs.length", "float"),
+    ("width_m", "rs.road_width", "float"),
+    ("is_active", "rs.is_active::int", "int"),
+)
+
+WORK_ITEMS_FROM = """
+FROM projects_workitem wi
+JOIN projects_workorder wo ON wo.id = wi.work_order_id
+JOIN projects_project p ON p.id = wo.project_id
+JOIN customers_customer c ON c.id = p.customer_id
+JOIN operations_operationtype ot ON ot.id = wi.operation_type_id
+"""
+
+
+@dataclass
+class ExportFilters:
+    project: Optional[int] = None
+    customer: Optional[int] = None
+    date_from: Optional[datetime.date] = None
+    date_to: Optional[datetime.date] = None
+    # (xmin, ymin, xmax, ymax) in ``bbox_srid``
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    bbox_srid: int = 3765
+
+    @property
+    def selects_work(self) -> bool:
+        return any(v is not None for v in (self.project, self.customer, self.date_from, self.date_to))
+
+
+def _work_item_conditions(filters: ExportFilters) -> Tuple[List[str], List]:
+    where, params = [], []
+    if filters.project is not None:
+        where.append("wo.project_id = %s")
+        params.append(filters.project)
+    if filters.customer is not None:
+        where.append("p.customer_id = %s")
+        params.append(filters.customer)
+    if filters.date_from is not None:
+        where.append("wo.completed_date >= %s")
+        params.append(filters.date_from)
+    if filters.date_to is not None:
+        where.append("wo.completed_date <= %s")
+        params.append(filters.date_to)
+    return where, params
+
+
+def _bbox_condition(column: str, filters: ExportFilters) -> Tuple[List[str], List]:
+    if filters.bbox is None:
+        return [], []
+    # && against an envelope in the column's SRID keeps the GiST index usable.
+    return (
+        [f"{column} && ST_Transform(ST_MakeEnvelope(%s, %s, %s, %s, %s), 3765)"],
+        [*filters.bbox, filters.bbox_srid],
+    )
+
+
+def _select(fields, geom: str, srid: int) -> Tuple[str, List]:
+    columns = ", ".join(expr for _name, expr, _kind in fields)
+    return f"SELECT ST_AsBinary(ST_Transform({geom}, %s)), {columns}", [srid]
+
+
+def work_items_query(filters: ExportFilters, srid: int = 3765) -> Tuple[str, List]:
+    select, params = _select(WORK_ITEM_FIELDS, "wi.geom", srid)
+    where, where_params = _work_item_conditions(filters)
+    bbox, bbox_params = _bbox_condition("wi.geom", filters)
+    conditions = ["wi.geom IS NOT NULL", *where, *bbox]
+    sql = f"{select} {WORK_ITEMS_FROM} WHERE {' AND '.join(conditions)} ORDER BY wi.id"
+    return sql, [*params, *where_params, *bbox_params]
+
+
+def road_sections_query(filters: ExportFilters, srid: int = 3765) -> Tuple[str, List]:
+    select, params = _select(ROAD_SECTION_FIELDS, "rs.geom", srid)
+    conditions, extra = ["rs.geom IS NOT NULL"], []
+    if filters.selects_work:
+        where, where_params = _work_item_conditions(filters)
+        conditions.append(
+            f"EXISTS (SELECT 1 {WORK_ITEMS_FROM} WHERE wi.road_section_id = rs.id AND {' AND '.join(where)})"
+        )
+        extra.extend(where_params)
+    bbox, bbox_params = _bbox_condition("rs.geom", filters)
+    conditions.extend(bbox)
+    extra.extend(bbox_params)
+    sql = f"{select} FROM roads_roadsection rs WHERE {' AND '.join(conditions)} ORDER BY rs.id"
+    return sql, [*params, *extra]
+
+
+LAYERS = {
+    "work_items": (work_items_query, WORK_ITEM_FIELDS, "MultiPolygon"),
+    "road_sections": (road_sections_query, ROAD_SECTION_FIELDS, "LineString"),
+}
+
+
+def _column(values: list, kind: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """One attribute column as an array, plus a null mask for integers."""
+    if kind == "str":
+        return np.array(values, dtype=object), None
+    if kind == "float":
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64), None
+    if kind == "date":
+        return np.array(values, dtype="datetime64[D]"), None
+    mask = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+    array = np.array([0 if v is None else v for v in values], dtype=np.int64)
+    return array, (mask if mask.any() else None)
+
+
+def write_layer(path: str, driver: str, layer: str, filters: ExportFilters, srid: int, chunk_size: int) -> int:
+    """Stream one layer into the OGR data source at ``path``; returns the feature count."""
+    from pyogrio.raw import write
+
+    query, fields, geometry_type = LAYERS[layer]
+    sql, params = query(filters, srid)
+    names = [name for name, _expr, _kind in fields]
+    kinds = [kind for _name, _expr, kind in fields]
+    written = 0
+    # Server-side cursors need a transaction unless declared WITH HOLD.
+    with transaction.atomic(), connection.chunked_cursor() as cur:
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows and written:
+                break
+            geometry = np.array([bytes(r[0]) if r[0] is not None else None for r in rows], dtype=object)
+            columns = [_column([r[i + 1] for r in rows], kind) for i, kind in enumerate(kinds)]
+            masks = [mask for _array, mask in columns]
+            write(
+                path,
+                geometry,
+                [array for array, _mask in columns],
+                names,
+                field_mask=masks if any(m is not None for m in masks) else None,
+                layer=layer,
+                driver=driver,
+                geometry_type=geometry_type,
+                crs=f"EPSG:{srid}",
+                encoding="UTF-8" if driver == "ESRI Shapefile" else None,
+                append=written > 0,
+            )
+            written += len(rows)
+            if not rows:
+                break
+    return written
+
+
+def export_geodata(
+    fmt: str = "gpkg",
+    layers: Sequence[str] = ("work_items", "road_sections"),
+    filters: Optional[ExportFilters] = None,
+    srid: int = 3765,
+    chunk_size: int = CHUNK_SIZE,
+) -> Tuple[IO[bytes], dict]:
+    """Export ``layers`` to a temporary file; returns (open handle, feature counts)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Nepoznat format: {fmt}")
+    if srid not in OUTPUT_SRIDS:
+        raise ValueError(f"Nepodržan SRID: {srid}")
+    unknown = set(layers) - set(LAYERS)
+    if unknown or not layers:
+        raise ValueError(f"Nepoznati slojevi: {', '.join(sorted(unknown)) or '-'}")
+    filters = filters or ExportFilters()
+    driver = FORMATS[fmt][0]
+
+    workdir = tempfile.mkdtemp(prefix="gis-export-")
+    try:
+        counts = {}
+        if fmt == "gpkg":
+            path = os.path.join(workdir, "export.gpkg")
+            for layer in layers:
+                counts[layer] = write_layer(path, driver, layer, filters, srid, chunk_size)
+            handle = open(path, "rb")
+        else:
+            for layer in layers:
+                counts[layer] = write_layer(os.path.join(workdir, f"{layer}.shp"), driver, layer, filters, srid, chunk_size)
+            handle = tempfile.TemporaryFile(suffix=".zip")
+            with zipfile.ZipFile(handle, "w", zipfile.ZIP_DEFLATED) as archive:
+                for name in sorted(os.listdir(workdir)):
+                    archive.write(os.path.join(workdir, name), name)
+            handle.seek(0)
+    finally:
+        # An open handle keeps the GeoPackage's data after its name is gone.
+        shutil.rmtree(workdir, ignore_errors=True)
+    return handle, counts
@@ -0,0 +1,156 @@
+"""GPS track ingestion: GPX/GeoJSON → map matching → draft WorkItems.
+
+Tracks are parsed straight into coordinate arrays (``iterparse`` for GPX, no
+per-point objects), matched against the in-process road network
+(``roads.network``/``roads.map_matching``) and the covered length per
+section and side becomes one ``WorkItem`` in a new work order with status
+``draft``, to be reviewed before approval. Quantities follow the operation's
+unit: metres as covered, or m² as covered length times ``strip_width``.
+"""
+from __future__ import annotations
+
+import json
+import xml.etree.ElementTree as ET
+from array import array
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import BinaryIO, List, Optional, Tuple
+
+import numpy as np
+from django.db import transaction
+
+from operations.models import OperationType
+from roads.map_matching import Coverage, covered_lengths, match_points, project
+from roads.network import get_network
+
+from .models import Project, WorkItem, WorkOrder
+
+SUPPORTED_UNITS = ("m", "m2")
+
+
+class TrackError(ValueError):
+    pass
+
+
+@dataclass
+class IngestResult:
+    work_order: Optional[WorkOrder]
+    points: int
+    matched: int
+    coverage: List[Coverage] = field(default_factory=list)
+    items: List[WorkItem] = field(default_factory=list)
+
+
+def parse_gpx(stream: BinaryIO) -> Tuple[np.ndarray, np.ndarray]:
+    """Longitudes and latitudes of all ``trkpt``/``rtept`` elements, in order."""
+    lon, lat = array("d"), array("d")
+    try:
+        for _event, elem in ET.iterparse(stream, events=("end",)):
+            tag = elem.tag.rpartition("}")[2]
+            if tag in ("trkpt", "rtept"):
+                lon.append(float(elem.get("lon")))
+                lat.append(float(elem.get("lat")))
+                elem.clear()
+            elif tag in ("trkseg", "rte"):
+                elem.clear()
+    except (ET.ParseError, TypeError, ValueError) as exc:
+        raise TrackError(f"Neispravan GPX: {exc}") from exc
+    return np.frombuffer(lon, dtype=float), np.frombuffer(lat, dtype=float)
+
+
+def _geojson_coordinates(obj) -> List:
+    kind = obj.get("type")
+    if kind == "FeatureCollection":
+        return [c for feature in obj.get("features", []) for c in _geojson_coordinates(feature)]
+    if kind == "Feature":
+        return _geojson_coordinates(obj.get("geometry") or {})
+    if kind == "LineString":
+        return obj["coordinates"]
+    if kind == "MultiLineString":
+        return [c for line in obj["coordinates"] for c in line]
+    if kind == "Point":
+        return [obj["coordinates"]]
+    if kind == "MultiPoint":
+        return obj["coordinates"]
+    raise TrackError(f"Nepodržan GeoJSON tip: {kind}")
+
+
+def parse_geojson(stream: BinaryIO) -> Tuple[np.ndarray, np.ndarray]:
+    try:
+        coords = np.asarray(
+            [c[:2] for c in _geojson_coordinates(json.load(stream))],
+            dtype=float,
+        ).reshape(-1, 2)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise TrackError(f"Neispravan GeoJSON: {exc}") from exc
+    return coords[:, 0], coords[:, 1]
+
+
+def parse_track(stream: BinaryIO, name: str = "") -> Tuple[np.ndarray, np.ndarray]:
+    """Dispatch on the file extension, falling back to sniffing the first byte."""
+    lowered = name.lower()
+    if lowered.endswith(".gpx"):
+        return parse_gpx(stream)
+    if lowered.endswith((".geojson", ".json")):
+        return parse_geojson(stream)
+    head = stream.read(1)
+    stream.seek(0)
+    return parse_geojson(stream) if head in (b"{", b"[") else parse_gpx(stream)
+
+
+def _quantity(coverage: Coverage, unit: str, strip_width: Optional[Decimal]) -> Decimal:
+    length = Decimal(f"{coverage.length:.3f}")
+    if unit == "m2":
+        return (length * strip_width).quantize(Decimal("0.001"))
+    return length
+
+
+def ingest_track(
+    lon: np.ndarray,
+    lat: np.ndarray,
+    project: Project,
+    operation_type: OperationType,
+    user,
+    title: str = "",
+    srid: int = 4326,
+    strip_width: Optional[Decimal] = None,
+    max_distance: float = 25.0,
+    min_length: float = 5.0,
+) -> IngestResult:
+    """Match a track and create a draft work order with one item per section side."""
+    if operation_type.unit not in SUPPORTED_UNITS:
+        raise TrackError(f"Jedinica '{operation_type.unit}' se ne može izvesti iz GPS traga.")
+    if operation_type.unit == "m2" and not strip_width:
+        raise TrackError("Za m² je potrebna širina trake (strip_width).")
+    if len(lon) == 0:
+        raise TrackError("Trag nema točaka.")
+
+    network = get_network()
+    x, y = project(lon, lat, srid)
+    match = match_points(network, x, y, max_distance=max_distance)
+    coverage = [c for c in covered_lengths(network, match) if c.length >= min_length]
+    result = IngestResult(work_order=None, points=len(lon), matched=match.matched, coverage=coverage)
+    if not coverage:
+        return result
+
+    with transaction.atomic():
+        work_order = WorkOrder.objects.create(
+            project=project,
+            title=title or f"GPS trag – {operation_type.name}",
+            status="draft",
+            created_by=user,
+            description=f"Izvedeno iz GPS traga: {len(lon)} točaka, {match.matched} na dionicama.",
+        )
+        for c in coverage:
+            item = WorkItem(
+                work_order=work_order,
+                road_section_id=c.section_id,
+                operation_type=operation_type,
+                road_side=c.side,
+                quantity=_quantity(c, operation_type.unit, strip_width),
+                notes=f"GPS: {c.length:.1f} m, {c.points} točaka",
+            )
+            item.save()
+            result.items.append(item)
+    result.work_order = work_order
+    return result
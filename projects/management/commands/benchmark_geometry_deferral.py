@@ -0,0 +1,44 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from projects.models import WorkItem
+from roads.models import RoadSection
+
+
+def _measure(queryset):
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = list(queryset)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(rows), elapsed, peak
+
+
+class Command(BaseCommand):
+    help = (
+        "Uspoređuje potrošnju memorije i vrijeme tipičnih upita za popise "
+        "sa i bez učitavanja geometrije."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=1000, help="Broj redaka po upitu.")
+
+    def handle(self, *args, **options):
+        limit = options["limit"]
+        cases = [
+            ("WorkItem", WorkItem.objects.select_related("work_order", "operation_type")),
+            ("RoadSection", RoadSection.objects.filter(is_active=True)),
+        ]
+        for label, qs in cases:
+            n_full, t_full, mem_full = _measure(qs.with_geometry()[:limit])
+            n_lean, t_lean, mem_lean = _measure(qs[:limit])
+            saved = mem_full - mem_lean
+            self.stdout.write(
+                f"{label}: {n_full} redaka | s geometrijom {mem_full / 1024:.0f} KiB, "
+                f"{t_full * 1000:.1f} ms | bez geometrije {mem_lean / 1024:.0f} KiB, "
+                f"{t_lean * 1000:.1f} ms | ušteda {saved / 1024:.0f} KiB"
+                + (f" ({saved / mem_full:.0%})" if mem_full else "")
+            )
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from projects.double_billing import WINDOWS, detect_double_billing
+
+
+class Command(BaseCommand):
+    help = (
+        "Traži stavke rada iste dionice, strane i vrste rada čije se geometrije "
+        "preklapaju u istom razdoblju (moguća dvostruka naplata). Provjerava "
+        "samo stavke izmijenjene od prethodnog pokretanja."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--window", choices=WINDOWS, default="month", help="Vremenski prozor razdoblja.")
+        parser.add_argument("--full", action="store_true", help="Provjeri sve stavke, ne samo izmijenjene.")
+        parser.add_argument("--batch", type=int, default=500, help="Broj dionica po upitu.")
+        parser.add_argument(
+            "--min-overlap",
+            type=Decimal,
+            default=Decimal("0.01"),
+            help="Najmanje preklapanje (m² ili m) koje se prijavljuje.",
+        )
+
+    def handle(self, *args, **options):
+        run = detect_double_billing(
+            window=options["window"],
+            full=options["full"],
+            sections_per_batch=options["batch"],
+            min_overlap=options["min_overlap"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Provjereno stavki: {run.items_checked}, nalaza: {run.findings} "
+                f"({(run.finished_at - run.started_at).total_seconds():.1f} s)"
+            )
+        )
@@ -0,0 +1,60 @@
+import datetime
+import shutil
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.gis_export import FORMATS, LAYERS, OUTPUT_SRIDS, ExportFilters, export_geodata
+
+
+def _bbox(value):
+    try:
+        xmin, ymin, xmax, ymax = (float(v) for v in value.split(","))
+    except ValueError as exc:
+        raise CommandError("--bbox mora biti xmin,ymin,xmax,ymax") from exc
+    return xmin, ymin, xmax, ymax
+
+
+class Command(BaseCommand):
+    help = (
+        "Izvozi geometrije stavki rada i dionica u GeoPackage ili Shapefile (zip), "
+        "čitajući ih serverskim kursorom i zapisujući u dijelovima."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Izlazna datoteka (.gpkg ili .zip).")
+        parser.add_argument("--format", choices=sorted(FORMATS), default="gpkg")
+        parser.add_argument("--layer", action="append", dest="layers", choices=sorted(LAYERS), help="Sloj (ponovljivo).")
+        parser.add_argument("--project", type=int)
+        parser.add_argument("--customer", type=int)
+        parser.add_argument("--from", dest="date_from", type=datetime.date.fromisoformat)
+        parser.add_argument("--to", dest="date_to", type=datetime.date.fromisoformat)
+        parser.add_argument("--bbox", type=_bbox, help="xmin,ymin,xmax,ymax")
+        parser.add_argument("--bbox-srid", type=int, choices=OUTPUT_SRIDS, default=3765)
+        parser.add_argument("--srid", type=int, choices=OUTPUT_SRIDS, default=3765, help="SRID izlaznih geometrija.")
+        parser.add_argument("--chunk-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        filters = ExportFilters(
+            project=options["project"],
+            customer=options["customer"],
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+            bbox=options["bbox"],
+            bbox_srid=options["bbox_srid"],
+        )
+        started = time.perf_counter()
+        try:
+            handle, counts = export_geodata(
+                options["format"],
+                options["layers"] or list(LAYERS),
+                filters,
+                srid=options["srid"],
+                chunk_size=options["chunk_size"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        with handle, open(options["output"], "wb") as out:
+            shutil.copyfileobj(handle, out, 1024 * 1024)
+        summary = ", ".join(f"{layer}: {count}" for layer, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"{summary} ({time.perf_counter() - started:.1f} s)"))
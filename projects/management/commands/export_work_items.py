@@ -0,0 +1,42 @@
+import datetime
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.exports import export_rows, work_items_for_export, write_csv, write_xlsx
+
+
+class Command(BaseCommand):
+    help = (
+        "Izvozi stavke rada projekta i/ili razdoblja (po datumu završetka naloga) "
+        "u CSV ili XLSX, čitajući redove serverskim kursorom uz stalnu potrošnju memorije."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, help="ID projekta.")
+        parser.add_argument("--from", dest="date_from", type=datetime.date.fromisoformat, help="Završeno od (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="date_to", type=datetime.date.fromisoformat, help="Završeno do (YYYY-MM-DD).")
+        parser.add_argument("--format", choices=("csv", "xlsx"), default="csv")
+        parser.add_argument("--output", "-o", help="Izlazna datoteka; CSV bez nje ide na standardni izlaz.")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Redova po dohvatu s kursora.")
+
+    def handle(self, *args, **options):
+        if not (options["project"] or options["date_from"] or options["date_to"]):
+            raise CommandError("Zadajte --project i/ili razdoblje (--from/--to).")
+        if options["format"] == "xlsx" and not options["output"]:
+            raise CommandError("XLSX zahtijeva --output.")
+
+        rows = export_rows(
+            work_items_for_export(options["project"], options["date_from"], options["date_to"]),
+            chunk_size=options["chunk_size"],
+        )
+        writer = write_xlsx if options["format"] == "xlsx" else write_csv
+        started = time.perf_counter()
+        if options["output"]:
+            with open(options["output"], "wb") as out:
+                count = writer(rows, out)
+        else:
+            count = writer(rows, sys.stdout.buffer)
+            sys.stdout.flush()
+        self.stderr.write(f"Izvezeno redova: {count} ({time.perf_counter() - started:.1f} s)")
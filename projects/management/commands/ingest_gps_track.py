@@ -0,0 +1,65 @@
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from operations.models import OperationType
+from projects.gps_tracks import TrackError, ingest_track, parse_track
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Učitava GPS trag (GPX ili GeoJSON), uparuje točke s dionicama i "
+        "stranama ceste te kreira radni nalog u statusu nacrta sa stavkama "
+        "čije su količine izvedene iz pokrivene duljine."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="GPX ili GeoJSON datoteka.")
+        parser.add_argument("--project", type=int, required=True, help="ID projekta.")
+        parser.add_argument("--operation", type=int, required=True, help="ID vrste operacije.")
+        parser.add_argument("--user", required=True, help="Korisničko ime autora naloga.")
+        parser.add_argument("--title", default="", help="Naziv radnog naloga.")
+        parser.add_argument("--srid", type=int, default=4326, help="SRID koordinata traga.")
+        parser.add_argument("--strip-width", type=Decimal, help="Širina trake (m) za operacije u m².")
+        parser.add_argument("--max-distance", type=float, default=25.0, help="Najveća udaljenost od osi (m).")
+        parser.add_argument("--min-length", type=float, default=5.0, help="Najmanja pokrivena duljina (m).")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        try:
+            project = Project.objects.get(pk=options["project"])
+            operation_type = OperationType.objects.get(pk=options["operation"])
+            user = get_user_model().objects.get(username=options["user"])
+        except (Project.DoesNotExist, OperationType.DoesNotExist) as exc:
+            raise CommandError(str(exc)) from exc
+        except get_user_model().DoesNotExist as exc:
+            raise CommandError(f"Korisnik '{options['user']}' ne postoji.") from exc
+
+        try:
+            with path.open("rb") as stream:
+                lon, lat = parse_track(stream, path.name)
+            result = ingest_track(
+                lon,
+                lat,
+                project=project,
+                operation_type=operation_type,
+                user=user,
+                title=options["title"],
+                srid=options["srid"],
+                strip_width=options["strip_width"],
+                max_distance=options["max_distance"],
+                min_length=options["min_length"],
+            )
+        except (OSError, TrackError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(f"Točaka: {result.points}, uparenih: {result.matched}")
+        if result.work_order is None:
+            self.stdout.write(self.style.WARNING("Trag ne pokriva nijednu dionicu; nalog nije kreiran."))
+            return
+        for item in result.items:
+            self.stdout.write(f"  {item.road_section_id:>8} {item.road_side:5} {item.quantity} {operation_type.unit}")
+        self.stdout.write(self.style.SUCCESS(f"Kreiran nalog {result.work_order.number} ({len(result.items)} stavki)."))
@@ -0,0 +1,49 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.models import WorkItem
+from projects.repricing import OPEN_STATUSES, reprice_work_items
+
+
+class Command(BaseCommand):
+    help = (
+        "Ponovno obračunava jedinične i ukupne cijene stavki rada prema cjeniku "
+        "važećem na datum naloga (ili --as-of), jednim UPDATE upitom i bez "
+        "ponovnog izračuna geometrije."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--as-of", type=datetime.date.fromisoformat, help="Datum cjenika (YYYY-MM-DD).")
+        parser.add_argument("--work-order", type=int, action="append", dest="work_orders", help="ID naloga.")
+        parser.add_argument("--project", type=int, help="ID projekta.")
+        parser.add_argument("--operation", type=int, help="ID vrste operacije.")
+        parser.add_argument(
+            "--all-statuses",
+            action="store_true",
+            help=f"Uključi i zatvorene naloge (inače samo: {', '.join(OPEN_STATUSES)}).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Samo prikaži što bi se promijenilo.")
+
+    def handle(self, *args, **options):
+        items = WorkItem.objects.all()
+        if not options["all_statuses"]:
+            items = items.filter(work_order__status__in=OPEN_STATUSES)
+        if options["work_orders"]:
+            items = items.filter(work_order__in=options["work_orders"])
+        if options["project"]:
+            items = items.filter(work_order__project=options["project"])
+        if options["operation"]:
+            items = items.filter(operation_type=options["operation"])
+        if not items.exists():
+            raise CommandError("Nema stavki za odabrane kriterije.")
+
+        result = reprice_work_items(items, as_of=options["as_of"], dry_run=options["dry_run"])
+        for work_order_id, (count, total) in result.work_orders.items():
+            self.stdout.write(f"  nalog {work_order_id:>8}: {count:5d} stavki, novi iznos {total}")
+        prefix = "[probno] " if result.dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}Preračunato stavki: {result.items}, osvježeno nalaza dvostruke naplate: {result.findings}"
+            )
+        )
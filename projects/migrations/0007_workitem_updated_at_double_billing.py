@@ -0,0 +1,63 @@
+import django.db.models.deletion
+import django.db.models.functions.datetime
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_project_workorder_trigram_indexes'),
+        ('roads', '0004_roadsection_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workitem',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_default=django.db.models.functions.datetime.Now(), db_index=True, verbose_name='Zadnja izmjena'),
+        ),
+        migrations.AddIndex(
+            model_name='workitem',
+            index=models.Index(fields=['road_section', 'road_side', 'operation_type'], name='projects_wi_overlap_key_idx'),
+        ),
+        migrations.CreateModel(
+            name='DoubleBillingRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Početak')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Završetak')),
+                ('watermark', models.DateTimeField(verbose_name='Obrađeno do')),
+                ('window', models.CharField(max_length=16, verbose_name='Vremenski prozor')),
+                ('items_checked', models.PositiveIntegerField(default=0, verbose_name='Provjereno stavki')),
+                ('findings', models.PositiveIntegerField(default=0, verbose_name='Nalaza')),
+            ],
+            options={
+                'verbose_name': 'Provjera dvostruke naplate',
+                'verbose_name_plural': 'Provjere dvostruke naplate',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DoubleBillingFinding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField(verbose_name='Razdoblje')),
+                ('overlap', models.DecimalField(decimal_places=3, help_text='Površina (m²) ili duljina (m) preklapanja.', max_digits=14, verbose_name='Preklapanje')),
+                ('overlap_ratio', models.DecimalField(decimal_places=4, max_digits=6, verbose_name='Udio preklapanja')),
+                ('amount_at_risk', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Iznos pod rizikom')),
+                ('status', models.CharField(choices=[('open', 'Otvoreno'), ('confirmed', 'Potvrđeno'), ('dismissed', 'Odbačeno')], default='open', max_length=16, verbose_name='Status')),
+                ('detected_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Otkriveno')),
+                ('item_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.workitem', verbose_name='Stavka A')),
+                ('item_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.workitem', verbose_name='Stavka B')),
+                ('road_section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='roads.roadsection', verbose_name='Dionica')),
+            ],
+            options={
+                'verbose_name': 'Moguća dvostruka naplata',
+                'verbose_name_plural': 'Moguće dvostruke naplate',
+                'ordering': ['-amount_at_risk'],
+                'indexes': [models.Index(fields=['status', 'amount_at_risk'], name='projects_dbl_status_amt_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item_a', 'item_b'), name='projects_double_billing_pair_uniq')],
+            },
+        ),
+    ]
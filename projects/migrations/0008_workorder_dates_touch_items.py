@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# The double-billing period of an item comes from its work order's dates, but
+# incremental runs select items by WorkItem.updated_at. Moving an order to
+# another date therefore marks all its items as changed. A trigger also covers
+# queryset.update() and raw SQL.
+CREATE_TRIGGER = r"""
+CREATE OR REPLACE FUNCTION projects_workorder_dates_changed()
+RETURNS trigger AS
+$$
+BEGIN
+  UPDATE projects_workitem SET updated_at = now() WHERE work_order_id = NEW.id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER projects_workorder_dates_au
+AFTER UPDATE OF completed_date, scheduled_date, created_at ON projects_workorder
+FOR EACH ROW
+WHEN (COALESCE(NEW.completed_date, NEW.scheduled_date, NEW.created_at::date)
+      IS DISTINCT FROM COALESCE(OLD.completed_date, OLD.scheduled_date, OLD.created_at::date))
+EXECUTE FUNCTION projects_workorder_dates_changed();
+"""
+
+DROP_TRIGGER = r"""
+DROP TRIGGER IF EXISTS projects_workorder_dates_au ON projects_workorder;
+DROP FUNCTION IF EXISTS projects_workorder_dates_changed();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_workitem_updated_at_double_billing'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_TRIGGER, reverse_sql=DROP_TRIGGER),
+    ]
@@ -1,19 +1,32 @@
+import datetime
 from decimal import Decimal, ROUND_FLOOR
 
 from django.contrib.auth import get_user_model
 from django.contrib.gis.db import models as gis_models
 from django.contrib.gis.geos import GEOSGeometry
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import connection, models
+from django.db.models.functions import Now, Upper
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from customers.models import Customer
 from operations.models import OperationType
+from road_maintenance.managers import GeometryDeferringManager
+from road_maintenance.metrics import histogram
 from roads.models import RoadSection
 
 
 User = get_user_model()
 
+WORKITEM_GEOM_SECONDS = histogram(
+    "roadmaint_workitem_geom_seconds",
+    "PostGIS geometry build in WorkItem._compute_geom_via_postgis.",
+    ["unit"],
+)
+WORKITEM_SAVE_SECONDS = histogram("roadmaint_workitem_save_seconds", "WorkItem.save() including geometry.")
+WORKORDER_NUMBER_SECONDS = histogram("roadmaint_workorder_number_seconds", "WorkOrder number allocation.")
+
 
 class Project(models.Model):
     """Model za projekte."""
@@ -52,6 +65,9 @@ class Project(models.Model):
         verbose_name = _('Projekt')
         verbose_name_plural = _('Projekti')
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='projects_project_name_trgm'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} - {self.customer.name}"
@@ -112,15 +128,30 @@ class WorkOrder(models.Model):
         verbose_name = _("Radni nalog")
         verbose_name_plural = _("Radni nalozi")
         ordering = ["-created_at"]
+        indexes = [
+            GinIndex(OpClass(Upper("number"), name="gin_trgm_ops"), name="projects_wo_number_trgm"),
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="projects_wo_title_trgm"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.number} - {self.title}"
 
+    def pricing_date(self) -> datetime.date:
+        """Dan čiji cjenik vrijedi za stavke naloga: završetak, inače plan, inače kreiranje.
+
+        Isto pravilo primjenjuje ``projects.repricing`` (datum kreiranja u UTC-u).
+        """
+        date = self.completed_date or self.scheduled_date
+        if date:
+            return date
+        return (self.created_at or timezone.now()).astimezone(datetime.timezone.utc).date()
+
     def save(self, *args, **kwargs) -> None:
         if not self.number:
-            year = timezone.now().year
-            count = WorkOrder.objects.filter(created_at__year=year).count() + 1
-            self.number = f"RN-{year}-{count:04d}"
+            with WORKORDER_NUMBER_SECONDS.time():
+                year = timezone.now().year
+                count = WorkOrder.objects.filter(created_at__year=year).count() + 1
+                self.number = f"RN-{year}-{count:04d}"
         super().save(*args, **kwargs)
 
 
@@ -186,11 +217,18 @@ class WorkItem(models.Model):
         editable=False,
     )
     notes = models.TextField(_('Napomene'), blank=True)
+    updated_at = models.DateTimeField(_('Zadnja izmjena'), auto_now=True, db_default=Now(), db_index=True)
+
+    objects = GeometryDeferringManager()
 
     class Meta:
         verbose_name = _('Stavka rada')
         verbose_name_plural = _('Stavke rada')
         ordering = ['work_order', 'id']
+        indexes = [
+            # Partition key of the double-billing self-join (projects.double_billing).
+            models.Index(fields=['road_section', 'road_side', 'operation_type'], name='projects_wi_overlap_key_idx'),
+        ]
 
     def __str__(self) -> str:
         order_ref = getattr(self.work_order, 'number', None) or self.work_order_id
@@ -207,7 +245,7 @@ class WorkItem(models.Model):
         side = "left" if self.road_side == "left" else "right"
         unit = self.operation_type.unit
 
-        with connection.cursor() as cur:
+        with WORKITEM_GEOM_SECONDS.labels(unit=unit).time(), connection.cursor() as cur:
             if unit == "m2":
                 sql = f"""
                 WITH ls AS (
@@ -303,9 +341,10 @@ class WorkItem(models.Model):
 
         return None
 
+    @WORKITEM_SAVE_SECONDS.time()
     def save(self, *args, **kwargs) -> None:
         if (self.unit_price is None or self.unit_price == Decimal("0")) and self.operation_type_id:
-            self.unit_price = self.operation_type.base_price
+            self.unit_price = self.operation_type.price_on(self.work_order.pricing_date())
 
         qty = self.quantity or Decimal("0")
         up = self.unit_price or Decimal("0")
@@ -320,5 +359,83 @@ class WorkItem(models.Model):
             new_geom = None
 
         if new_geom is not None:
-            WorkItem.objects.filter(pk=self.pk).update(geom=new_geom)
+            # updated_at moves with the geometry so the double-billing run sees it.
+            WorkItem.objects.filter(pk=self.pk).update(geom=new_geom, updated_at=timezone.now())
             self.geom = new_geom
+
+
+class DoubleBillingRun(models.Model):
+    """Jedno pokretanje detektora dvostruke naplate (``projects.double_billing``).
+
+    ``watermark`` je trenutak do kojeg su izmjene stavki obrađene; sljedeće
+    pokretanje provjerava samo stavke izmijenjene nakon njega.
+    """
+
+    started_at = models.DateTimeField(_('Početak'), default=timezone.now)
+    finished_at = models.DateTimeField(_('Završetak'), null=True, blank=True)
+    watermark = models.DateTimeField(_('Obrađeno do'))
+    window = models.CharField(_('Vremenski prozor'), max_length=16)
+    items_checked = models.PositiveIntegerField(_('Provjereno stavki'), default=0)
+    findings = models.PositiveIntegerField(_('Nalaza'), default=0)
+
+    class Meta:
+        verbose_name = _('Provjera dvostruke naplate')
+        verbose_name_plural = _('Provjere dvostruke naplate')
+        ordering = ['-started_at']
+
+    def __str__(self) -> str:
+        return f"{self.started_at:%Y-%m-%d %H:%M} ({self.items_checked} / {self.findings})"
+
+
+class DoubleBillingFinding(models.Model):
+    """Dvije stavke iste dionice, strane i vrste rada čije se geometrije
+    preklapaju u istom razdoblju."""
+
+    class Status(models.TextChoices):
+        OPEN = 'open', _('Otvoreno')
+        CONFIRMED = 'confirmed', _('Potvrđeno')
+        DISMISSED = 'dismissed', _('Odbačeno')
+
+    item_a = models.ForeignKey(
+        WorkItem,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('Stavka A'),
+    )
+    item_b = models.ForeignKey(
+        WorkItem,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('Stavka B'),
+    )
+    road_section = models.ForeignKey(
+        RoadSection,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('Dionica'),
+    )
+    period_start = models.DateField(_('Razdoblje'))
+    overlap = models.DecimalField(
+        _('Preklapanje'),
+        max_digits=14,
+        decimal_places=3,
+        help_text=_('Površina (m²) ili duljina (m) preklapanja.'),
+    )
+    overlap_ratio = models.DecimalField(_('Udio preklapanja'), max_digits=6, decimal_places=4)
+    amount_at_risk = models.DecimalField(_('Iznos pod rizikom'), max_digits=12, decimal_places=2)
+    status = models.CharField(_('Status'), max_length=16, choices=Status.choices, default=Status.OPEN)
+    detected_at = models.DateTimeField(_('Otkriveno'), default=timezone.now)
+
+    class Meta:
+        verbose_name = _('Moguća dvostruka naplata')
+        verbose_name_plural = _('Moguće dvostruke naplate')
+        ordering = ['-amount_at_risk']
+        constraints = [
+            models.UniqueConstraint(fields=['item_a', 'item_b'], name='projects_double_billing_pair_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'amount_at_risk'], name='projects_dbl_status_amt_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"#{self.item_a_id} ↔ #{self.item_b_id} ({self.amount_at_risk} EUR)"
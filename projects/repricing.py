@@ -0,0 +1,125 @@
+"""Set-based repricing of WorkItems from the versioned price list.
+
+``reprice_work_items()`` sets ``unit_price`` to the ``OperationPrice`` valid on
+each item's date (``as_of``, or the work order's completion, else scheduled,
+else creation date; ``OperationType.base_price`` when no version covers it)
+and ``total_price`` to ``quantity × unit_price`` in one ``UPDATE``. The same
+statement refreshes ``amount_at_risk`` of open double-billing findings that
+involve a repriced item and reports the new totals per work order.
+
+Geometries are not rebuilt and ``WorkItem.save()`` is not called; only
+``updated_at`` moves, as with any other change of the item.
+"""
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from .models import WorkItem
+
+OPEN_STATUSES = ("draft", "approved", "in_progress")
+
+REPRICE_SQL = """
+WITH target AS (
+    SELECT wi.id, COALESCE(p.price, ot.base_price) AS price
+    FROM projects_workitem wi
+    JOIN projects_workorder wo ON wo.id = wi.work_order_id
+    JOIN operations_operationtype ot ON ot.id = wi.operation_type_id
+    LEFT JOIN LATERAL (
+        SELECT op.price
+        FROM operations_operationprice op
+        WHERE op.operation_type_id = wi.operation_type_id
+          AND op.valid_from <= COALESCE(%s::date, wo.completed_date, wo.scheduled_date, wo.created_at::date)
+          AND (op.valid_to IS NULL
+               OR op.valid_to >= COALESCE(%s::date, wo.completed_date, wo.scheduled_date, wo.created_at::date))
+        ORDER BY op.valid_from DESC
+        LIMIT 1
+    ) p ON true
+    WHERE wi.id IN ({selection})
+),
+updated AS (
+    UPDATE projects_workitem wi
+    SET unit_price = t.price,
+        total_price = round(wi.quantity * t.price, 2),
+        updated_at = now()
+    FROM target t
+    WHERE wi.id = t.id
+      AND (wi.unit_price IS DISTINCT FROM t.price OR wi.total_price <> round(wi.quantity * t.price, 2))
+    RETURNING wi.id, wi.work_order_id, wi.total_price
+),
+findings AS (
+    -- The statement sees items as they were, so new prices come from "updated".
+    UPDATE projects_doublebillingfinding f
+    SET amount_at_risk = round(LEAST(
+            COALESCE(s.price_a * f.overlap::double precision / NULLIF(s.size_a, 0), 0),
+            COALESCE(s.price_b * f.overlap::double precision / NULLIF(s.size_b, 0), 0)
+        )::numeric, 2)
+    FROM (
+        SELECT fi.id,
+               COALESCE(ua.total_price, a.total_price)::double precision AS price_a,
+               COALESCE(ub.total_price, b.total_price)::double precision AS price_b,
+               CASE ST_Dimension(a.geom) WHEN 2 THEN ST_Area(a.geom) ELSE ST_Length(a.geom) END AS size_a,
+               CASE ST_Dimension(b.geom) WHEN 2 THEN ST_Area(b.geom) ELSE ST_Length(b.geom) END AS size_b
+        FROM projects_doublebillingfinding fi
+        JOIN projects_workitem a ON a.id = fi.item_a_id
+        JOIN projects_workitem b ON b.id = fi.item_b_id
+        LEFT JOIN updated ua ON ua.id = a.id
+        LEFT JOIN updated ub ON ub.id = b.id
+        WHERE fi.status = 'open'
+          AND (ua.id IS NOT NULL OR ub.id IS NOT NULL)
+    ) s
+    WHERE f.id = s.id
+    RETURNING f.id
+)
+SELECT u.work_order_id, count(*), sum(u.total_price), (SELECT count(*) FROM findings)
+FROM updated u
+GROUP BY u.work_order_id
+ORDER BY u.work_order_id
+"""
+
+
+@dataclass
+class RepriceResult:
+    items: int = 0
+    findings: int = 0
+    # work_order_id -> (repriced items, their new total)
+    work_orders: Dict[int, Tuple[int, Decimal]] = field(default_factory=dict)
+    dry_run: bool = False
+
+
+def open_work_items() -> QuerySet:
+    return WorkItem.objects.filter(work_order__status__in=OPEN_STATUSES)
+
+
+def reprice_work_items(
+    queryset: Optional[QuerySet] = None,
+    as_of: Optional[datetime.date] = None,
+    dry_run: bool = False,
+) -> RepriceResult:
+    """Reprice the selected items (default: items of open work orders).
+
+    With ``dry_run`` the update runs and is rolled back, so the result shows
+    what would change.
+    """
+    if queryset is None:
+        queryset = open_work_items()
+    selection, selection_params = queryset.order_by().values("pk").query.sql_with_params()
+    sql = REPRICE_SQL.format(selection=selection)
+
+    result = RepriceResult(dry_run=dry_run)
+    with transaction.atomic():
+        with connection.cursor() as cur:
+            cur.execute(sql, [as_of, as_of, *selection_params])
+            rows = cur.fetchall()
+        for work_order_id, items, total, findings in rows:
+            result.work_orders[work_order_id] = (items, total)
+            result.items += items
+            result.findings = findings
+        if dry_run:
+            transaction.set_rollback(True)
+    return result
@@ -0,0 +1,281 @@
+import csv
+import datetime
+import io
+import zipfile
+from decimal import Decimal
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import LineString
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from customers.models import Customer
+from operations.models import OperationPrice, OperationType
+from road_maintenance.testing import QueryBudgetTestMixin, create_work_fixtures
+from roads.models import RoadSection
+
+from .double_billing import detect_double_billing
+from .exports import COLUMNS, iter_csv, write_xlsx
+from .models import DoubleBillingFinding, Project, WorkItem, WorkOrder
+from .repricing import reprice_work_items
+
+
+class ChangelistQueryCountTests(QueryBudgetTestMixin, TestCase):
+    """Admin changelists run the same number of queries for N and 2N rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser("admin", password="admin")
+        cls.customer = Customer.objects.create(
+            name="Ceste d.o.o.", oib="12345678903", street_address="Ilica 1", postal_code="10000", city="Zagreb"
+        )
+        cls.project = Project.objects.create(name="Održavanje", customer=cls.customer, start_date=datetime.date.today())
+        cls.work_order = WorkOrder.objects.create(project=cls.project, title="Nalog", created_by=cls.admin_user)
+        cls.section = RoadSection.objects.create(
+            name="Dionica", road_number="D8", geom=LineString([(492800, 4818200), (493400, 4818650)], srid=3765)
+        )
+        cls.operation = OperationType.objects.create(name="Košnja", unit="m2", base_price=Decimal("1.50"))
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+        self.serial = count(1)
+
+    def _changelist(self, model):
+        return reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist")
+
+    def _projects(self, n):
+        customers = Customer.objects.bulk_create(
+            Customer(
+                name=f"Kupac {i}", oib=f"{i:011d}", street_address="Ilica 1", postal_code="10000", city="Zagreb"
+            )
+            for i in (next(self.serial) for _ in range(n))
+        )
+        Project.objects.bulk_create(
+            Project(name=f"Projekt {c.pk}", customer=c, start_date=datetime.date.today()) for c in customers
+        )
+
+    def _work_orders(self, n):
+        projects = Project.objects.bulk_create(
+            Project(name=f"Projekt {i}", customer=self.customer, start_date=datetime.date.today())
+            for i in (next(self.serial) for _ in range(n))
+        )
+        WorkOrder.objects.bulk_create(
+            WorkOrder(number=f"TEST-{p.pk}", project=p, title="Nalog", created_by=self.admin_user) for p in projects
+        )
+
+    def _work_items(self, n):
+        orders = WorkOrder.objects.bulk_create(
+            WorkOrder(number=f"TEST-WI-{i}", project=self.project, title="Nalog", created_by=self.admin_user)
+            for i in (next(self.serial) for _ in range(n))
+        )
+        sections = RoadSection.objects.bulk_create(
+            RoadSection(name=f"Dionica {o.pk}", road_number="D8") for o in orders
+        )
+        WorkItem.objects.bulk_create(
+            WorkItem(
+                work_order=order,
+                road_section=section,
+                operation_type=self.operation,
+                road_side="right",
+                quantity=Decimal("10"),
+                unit_price=self.operation.base_price,
+                total_price=Decimal("15.00"),
+            )
+            for order, section in zip(orders, sections)
+        )
+
+    def test_project_changelist(self):
+        self.assertQueriesIndependentOfRows(self._changelist(Project), self._projects)
+
+    def test_work_order_changelist(self):
+        self.assertQueriesIndependentOfRows(self._changelist(WorkOrder), self._work_orders)
+
+    def test_work_item_changelist(self):
+        self.assertQueriesIndependentOfRows(self._changelist(WorkItem), self._work_items)
+
+
+class ExportTests(SimpleTestCase):
+    """User-entered text never reaches a spreadsheet as a formula or link."""
+
+    def _row(self, title):
+        row = [None] * len(COLUMNS)
+        row[0], row[2], row[16] = 1, title, Decimal("-2.500")
+        return tuple(row)
+
+    def test_csv_neutralises_formulas(self):
+        titles = ('=HYPERLINK("http://evil","x")', "+1", "-1", "@SUM(A1)", "Nalog")
+        lines = b"".join(iter_csv([self._row(title) for title in titles])).decode("utf-8-sig")
+        rows = list(csv.reader(io.StringIO(lines)))[1:]
+        self.assertEqual(
+            [row[2] for row in rows], ["'=HYPERLINK(\"http://evil\",\"x\")", "'+1", "'-1", "'@SUM(A1)", "Nalog"]
+        )
+        # Numbers are not text and keep their sign.
+        self.assertEqual({row[16] for row in rows}, {"-2.500"})
+
+    def test_xlsx_stores_text_as_strings(self):
+        out = io.BytesIO()
+        write_xlsx([self._row('=HYPERLINK("http://evil","x")'), self._row("https://example.com")], out)
+        with zipfile.ZipFile(out) as archive:
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertNotIn("<f>", sheet)
+        self.assertNotIn("<hyperlink", sheet)
+        self.assertIn("=HYPERLINK(", sheet)
+        self.assertIn("https://example.com", sheet)
+
+
+class RepricingTests(TestCase):
+    """New items and ``reprice_work_items`` price from the same day of the work order."""
+
+    @classmethod
+    def setUpTestData(cls):
+        data = create_work_fixtures()
+        cls.operation, cls.section = data["operation"], data["section"]
+        cls.work_order = data["work_order"]
+        cls.work_order.scheduled_date = datetime.date(2025, 6, 1)
+        cls.work_order.save()
+        cls.old_price = OperationPrice.objects.create(
+            operation_type=cls.operation, price=Decimal("2.00"),
+            valid_from=datetime.date(2025, 1, 1), valid_to=datetime.date(2025, 12, 31),
+        )
+        OperationPrice.objects.create(
+            operation_type=cls.operation, price=Decimal("3.00"), valid_from=datetime.date(2026, 1, 1)
+        )
+
+    def _item(self, quantity):
+        return WorkItem.objects.create(
+            work_order=self.work_order,
+            road_section=self.section,
+            operation_type=self.operation,
+            road_side="right",
+            quantity=Decimal(quantity),
+        )
+
+    def test_pricing_date(self):
+        order = WorkOrder(created_at=datetime.datetime(2025, 3, 1, 23, 30, tzinfo=datetime.timezone.utc))
+        self.assertEqual(order.pricing_date(), datetime.date(2025, 3, 1))
+        order.scheduled_date = datetime.date(2025, 4, 1)
+        self.assertEqual(order.pricing_date(), datetime.date(2025, 4, 1))
+        order.completed_date = datetime.date(2025, 5, 1)
+        self.assertEqual(order.pricing_date(), datetime.date(2025, 5, 1))
+
+    def test_new_item_is_priced_as_of_the_work_order(self):
+        item = self._item("10")
+        self.assertEqual(item.unit_price, Decimal("2.00"))
+        self.assertEqual(item.total_price, Decimal("20.00"))
+        # Repricing the same order finds nothing to change.
+        self.assertEqual(reprice_work_items().items, 0)
+
+    def test_reprice_updates_totals_and_updated_at(self):
+        items = [self._item("10"), self._item("20")]
+        # The test runs in one transaction, whose now() predates the items' own updated_at.
+        long_ago = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        WorkItem.objects.filter(pk__in=[item.pk for item in items]).update(updated_at=long_ago)
+        OperationPrice.objects.filter(pk=self.old_price.pk).update(price=Decimal("2.50"))
+
+        preview = reprice_work_items(dry_run=True)
+        self.assertEqual(preview.items, 2)
+        self.assertEqual(WorkItem.objects.get(pk=items[0].pk).total_price, Decimal("20.00"))
+
+        result = reprice_work_items()
+        self.assertEqual(result.items, 2)
+        self.assertEqual(result.work_orders, {self.work_order.pk: (2, Decimal("75.00"))})
+        for item, total in zip(items, (Decimal("25.00"), Decimal("50.00"))):
+            item.refresh_from_db()
+            self.assertEqual((item.unit_price, item.total_price), (Decimal("2.50"), total))
+            self.assertGreater(item.updated_at, long_ago)
+
+    def test_reprice_as_of_and_closed_orders(self):
+        item = self._item("10")
+        self.assertEqual(reprice_work_items(as_of=datetime.date(2026, 2, 1)).items, 1)
+        item.refresh_from_db()
+        self.assertEqual(item.total_price, Decimal("30.00"))
+
+        WorkOrder.objects.filter(pk=self.work_order.pk).update(status="completed")
+        self.assertEqual(reprice_work_items(as_of=datetime.date(2025, 2, 1)).items, 0)
+
+    def test_reprice_refreshes_amount_at_risk(self):
+        item_a, item_b = self._item("10"), self._item("20")
+        self.assertIsNotNone(item_a.geom)
+        finding = DoubleBillingFinding.objects.create(
+            item_a=item_a,
+            item_b=item_b,
+            road_section=self.section,
+            period_start=datetime.date(2025, 6, 1),
+            overlap=Decimal(item_a.geom.area).quantize(Decimal("0.001")),
+            overlap_ratio=Decimal("1"),
+            amount_at_risk=Decimal("20.00"),
+        )
+        OperationPrice.objects.filter(pk=self.old_price.pk).update(price=Decimal("2.50"))
+
+        result = reprice_work_items()
+        self.assertEqual(result.findings, 1)
+        finding.refresh_from_db()
+        # The whole of item A is billed twice: its new total is at risk.
+        self.assertAlmostEqual(finding.amount_at_risk, Decimal("25.00"), delta=Decimal("0.01"))
+
+
+class DoubleBillingTests(TestCase):
+    """Overlapping items of the same section, side and operation in one period are reported."""
+
+    @classmethod
+    def setUpTestData(cls):
+        data = create_work_fixtures()
+        cls.user, cls.project = data["user"], data["project"]
+        cls.section, cls.operation = data["section"], data["operation"]
+
+    def _item(self, completed_date, quantity="10", road_side="right"):
+        order = WorkOrder.objects.create(
+            project=self.project, title="Nalog", created_by=self.user,
+            status="completed", completed_date=completed_date,
+        )
+        item = WorkItem.objects.create(
+            work_order=order,
+            road_section=self.section,
+            operation_type=self.operation,
+            road_side=road_side,
+            quantity=Decimal(quantity),
+        )
+        self.assertIsNotNone(item.geom)
+        return item
+
+    def test_same_period_overlap_is_found(self):
+        a = self._item(datetime.date(2026, 9, 3), "10")
+        b = self._item(datetime.date(2026, 9, 25), "20")
+        self._item(datetime.date(2026, 10, 1))  # next month
+        self._item(datetime.date(2026, 9, 10), road_side="left")  # other side
+
+        run = detect_double_billing(window="month", full=True)
+        self.assertEqual(run.findings, 1)
+        finding = DoubleBillingFinding.objects.get()
+        self.assertEqual((finding.item_a_id, finding.item_b_id), (a.pk, b.pk))
+        self.assertEqual(finding.period_start, datetime.date(2026, 9, 1))
+        self.assertEqual(finding.overlap_ratio, Decimal("1.0000"))
+        # Identical strips: the cheaper item is billed twice in full.
+        self.assertEqual(finding.amount_at_risk, a.total_price)
+
+    def test_window_changes_the_period(self):
+        self._item(datetime.date(2026, 10, 1))
+        self._item(datetime.date(2026, 11, 15))
+        self.assertEqual(detect_double_billing(window="month", full=True).findings, 0)
+        self.assertEqual(detect_double_billing(window="quarter", full=True).findings, 1)
+
+    def test_incremental_run_sees_moved_work_orders(self):
+        a = self._item(datetime.date(2026, 9, 3))
+        b = self._item(datetime.date(2026, 10, 1))
+        self.assertEqual(detect_double_billing(window="month").findings, 0)
+
+        # Only the order changes; its items are marked as changed by the trigger.
+        WorkOrder.objects.filter(pk=b.work_order_id).update(completed_date=datetime.date(2026, 9, 30))
+        self.assertEqual(detect_double_billing(window="month").findings, 1)
+        self.assertTrue(DoubleBillingFinding.objects.filter(item_a=a, item_b=b).exists())
+
+        WorkOrder.objects.filter(pk=b.work_order_id).update(completed_date=datetime.date(2026, 11, 2))
+        detect_double_billing(window="month")
+        self.assertFalse(DoubleBillingFinding.objects.exists())
+
+    def test_unchanged_items_are_skipped(self):
+        self._item(datetime.date(2026, 9, 3))
+        detect_double_billing(window="month")
+        run = detect_double_billing(window="month", watermark_overlap=datetime.timedelta(0))
+        self.assertEqual(run.items_checked, 0)
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import GisExportView
+
+app_name = 'projects'
+
+urlpatterns = [
+    path('gis-export/', GisExportView.as_view(), name='gis-export'),
+]
@@ -0,0 +1,69 @@
+import datetime
+
+from django.http import FileResponse, JsonResponse
+from django.utils import timezone
+from django.views import View
+
+from .gis_export import FORMATS, LAYERS, OUTPUT_SRIDS, ExportFilters, export_geodata
+
+
+def _staff_only(request):
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated or not user.is_active:
+        return JsonResponse({"code": "UNAUTHORIZED", "detail": "Potrebna je prijava."}, status=401)
+    if not user.is_staff:
+        return JsonResponse({"code": "FORBIDDEN", "detail": "Izvoz je dostupan samo djelatnicima."}, status=403)
+    return None
+
+
+def _optional(value, parse):
+    return parse(value) if value not in (None, "") else None
+
+
+def _bbox(value):
+    xmin, ymin, xmax, ymax = (float(v) for v in value.split(","))
+    if xmin >= xmax or ymin >= ymax:
+        raise ValueError(value)
+    return xmin, ymin, xmax, ymax
+
+
+class GisExportView(View):
+    """Preuzimanje geometrija stavki rada i dionica kao GeoPackage ili zipani Shapefile.
+
+    Parametri: ``format`` (gpkg|shp), ``layers`` (work_items,road_sections),
+    ``project``, ``customer``, ``from``/``to`` (datum završetka naloga),
+    ``bbox`` (xmin,ymin,xmax,ymax), ``bbox_srid`` i ``srid`` (3765|4326).
+    """
+
+    def get(self, request):
+        denied = _staff_only(request)
+        if denied:
+            return denied
+        params = request.GET
+        try:
+            fmt = params.get("format", "gpkg")
+            layers = [layer for layer in params.get("layers", ",".join(LAYERS)).split(",") if layer]
+            srid = int(params.get("srid") or 3765)
+            bbox_srid = int(params.get("bbox_srid") or srid)
+            filters = ExportFilters(
+                project=_optional(params.get("project"), int),
+                customer=_optional(params.get("customer"), int),
+                date_from=_optional(params.get("from"), datetime.date.fromisoformat),
+                date_to=_optional(params.get("to"), datetime.date.fromisoformat),
+                bbox=_optional(params.get("bbox"), _bbox),
+                bbox_srid=bbox_srid,
+            )
+            if fmt not in FORMATS or bbox_srid not in OUTPUT_SRIDS or set(layers) - set(LAYERS):
+                raise ValueError(fmt)
+            handle, _counts = export_geodata(fmt, layers, filters, srid)
+        except ValueError:
+            return JsonResponse(
+                {
+                    "code": "BAD_PARAM",
+                    "detail": "format gpkg|shp, layers work_items,road_sections, srid 3765|4326, "
+                    "bbox xmin,ymin,xmax,ymax, datumi YYYY-MM-DD.",
+                },
+                status=400,
+            )
+        file_name = f"izvoz-{timezone.localdate():%Y%m%d}.{'gpkg' if fmt == 'gpkg' else 'zip'}"
+        return FileResponse(handle, as_attachment=True, filename=file_name, content_type=FORMATS[fmt][1])
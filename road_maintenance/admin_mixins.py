@@ -0,0 +1,97 @@
+"""Shared ModelAdmin helpers for large changelists."""
+from django.contrib.admin import RelatedFieldListFilter
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+ESTIMATE_SQL = """
+SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint
+FROM pg_class c
+WHERE c.oid = to_regclass(%s)
+   OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s))
+"""
+
+
+def estimated_row_count(model, using: str = "default") -> int:
+    """Planner estimate of the table size (summed over partitions, if any)."""
+    table = model._meta.db_table
+    with connections[using].cursor() as cur:
+        cur.execute(ESTIMATE_SQL, [table, table])
+        row = cur.fetchone()
+    return int(row[0]) if row and row[0] else 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that skips the exact COUNT(*) on large, unfiltered changelists.
+
+    Filtered querysets, and tables the planner estimates below
+    ``estimate_threshold`` rows, are still counted exactly.
+    """
+
+    estimate_threshold = 50_000
+
+    @cached_property
+    def count(self) -> int:
+        qs = self.object_list
+        if isinstance(qs, QuerySet) and not qs.query.where:
+            estimate = estimated_row_count(qs.model, using=qs.db)
+            if estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+
+class SelectRelatedFieldListFilter(RelatedFieldListFilter):
+    """Related-field filter whose choice labels reuse the related admin's
+    ``list_select_related``, so ``__str__`` methods that follow a foreign key
+    (``Project.__str__`` → customer) cost one query instead of one per row.
+    """
+
+    def field_choices(self, field, request, model_admin):
+        related_model = field.remote_field.model
+        related_admin = model_admin.admin_site._registry.get(related_model)
+        select_related = getattr(related_admin, "list_select_related", None)
+        if not isinstance(select_related, (list, tuple)) or not select_related:
+            return super().field_choices(field, request, model_admin)
+        qs = related_model._default_manager.complex_filter(field.get_limit_choices_to())
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        if ordering:
+            qs = qs.order_by(*ordering)
+        attname = field.remote_field.get_related_field().attname
+        return [(getattr(obj, attname), str(obj)) for obj in qs.select_related(*select_related)]
+
+
+class PerformanceAdminMixin:
+    """Changelist defaults for admins over big tables.
+
+    Set ``list_select_related`` for every FK shown in ``list_display`` and list
+    geometry and long text columns (including ``related__field`` paths) in
+    ``list_defer``; they are left out of changelist and autocomplete queries
+    but still loaded on the change form. Autocomplete lookups against the
+    admin also get ``list_select_related``, since their labels use ``__str__``.
+    Models whose manager defers geometry (``.with_geometry()``) get it back
+    everywhere except those list views.
+    """
+
+    list_defer = ()
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        url_name = self._url_name(request)
+        opts = self.model._meta
+        list_views = (f"{opts.app_label}_{opts.model_name}_changelist", "autocomplete")
+        if url_name not in list_views and hasattr(qs, "with_geometry"):
+            qs = qs.with_geometry()
+        if url_name == "autocomplete" and isinstance(self.list_select_related, (list, tuple)):
+            # Autocomplete labels use __str__, which follows the same FKs.
+            qs = qs.select_related(*self.list_select_related)
+        if self.list_defer and url_name in list_views:
+            qs = qs.defer(*self.list_defer)
+        return qs
+
+    @staticmethod
+    def _url_name(request):
+        match = getattr(request, "resolver_match", None)
+        return match.url_name if match is not None else None
@@ -0,0 +1,28 @@
+"""Managers shared by models that carry large geometry columns."""
+from django.db import models
+
+
+class GeometryDeferringQuerySet(models.QuerySet):
+    """QuerySet whose manager leaves ``geometry_fields`` out of SELECTs by default."""
+
+    geometry_fields = ("geom",)
+
+    def with_geometry(self):
+        """Load the geometry columns again, keeping any other deferrals."""
+        clone = self._chain()
+        fields, defer = clone.query.deferred_loading
+        if defer:
+            clone.query.deferred_loading = (frozenset(fields).difference(self.geometry_fields), True)
+        return clone
+
+
+class GeometryDeferringManager(models.Manager.from_queryset(GeometryDeferringQuerySet)):
+    """Default manager that defers geometry; opt back in with ``.with_geometry()``.
+
+    Related-object access (``work_item.road_section``) goes through the plain
+    base manager and still loads the full row.
+    """
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        return qs.defer(*qs.geometry_fields)
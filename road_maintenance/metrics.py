@@ -0,0 +1,321 @@
+"""Dependency-free metrics registry in the Prometheus text format.
+
+Metrics are declared at import time next to the code they measure::
+
+    SAVE_SECONDS = histogram("roadmaint_workitem_save_seconds", "WorkItem.save()")
+
+    @SAVE_SECONDS.time()
+    def save(...): ...
+
+Each process keeps its values in memory. With ``METRICS_MULTIPROC_DIR`` set,
+every process also writes a snapshot to ``<dir>/metrics_<pid>.json`` at most
+once per ``METRICS_FLUSH_INTERVAL`` seconds (and at exit), and ``/metrics``
+sums the snapshots of all workers. Empty the directory when the service
+starts; snapshots of workers that have exited keep counting, as counters
+should. A forking process writes its snapshot first, so what it recorded
+before the fork stays counted once, in its own file, while the child starts
+from zero. Without the setting only the serving process is reported.
+"""
+from __future__ import annotations
+
+import atexit
+import glob
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import ContextDecorator
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Timer(ContextDecorator):
+    def __init__(self, child: "_HistogramChild") -> None:
+        self.child = child
+        self._started = 0.0
+
+    def _recreate_cm(self):
+        # A decorated function may run in several threads at once.
+        return _Timer(self.child)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self._started)
+        return False
+
+
+class _HistogramChild:
+    def __init__(self, metric: "Histogram", key: LabelValues) -> None:
+        self.metric = metric
+        self.key = key
+
+    def observe(self, value: float) -> None:
+        self.metric._observe(self.key, value)
+
+    def time(self) -> _Timer:
+        """Context manager and decorator observing the elapsed seconds."""
+        return _Timer(self)
+
+
+class _CounterChild:
+    def __init__(self, metric: "Counter", key: LabelValues) -> None:
+        self.metric = metric
+        self.key = key
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.metric._inc(self.key, amount)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _default_key(self) -> LabelValues:
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return ()
+
+    def snapshot(self) -> Dict:
+        with REGISTRY.lock:
+            samples = [[list(key), _copy(value)] for key, value in self._values.items()]
+        return {
+            "type": self.kind,
+            "help": self.documentation,
+            "labels": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def labels(self, **labels) -> _HistogramChild:
+        return _HistogramChild(self, self._key(labels))
+
+    def observe(self, value: float) -> None:
+        self._observe(self._default_key(), value)
+
+    def time(self) -> _Timer:
+        return _Timer(_HistogramChild(self, self._default_key()))
+
+    def _observe(self, key: LabelValues, value: float) -> None:
+        with REGISTRY.lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, +Inf last, then sum.
+                state = self._values[key] = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                i = len(self.buckets)
+            state["buckets"][i] += 1
+            state["sum"] += value
+        REGISTRY.changed()
+
+    def snapshot(self) -> Dict:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def labels(self, **labels) -> _CounterChild:
+        return _CounterChild(self, self._key(labels))
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._inc(self._default_key(), amount)
+
+    def _inc(self, key: LabelValues, amount: float) -> None:
+        with REGISTRY.lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        REGISTRY.changed()
+
+
+def _copy(value):
+    if isinstance(value, dict):
+        return {"buckets": list(value["buckets"]), "sum": value["sum"]}
+    return value
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, _Metric] = {}
+        self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+
+    def register(self, metric: _Metric) -> _Metric:
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    # Multi-process snapshots -------------------------------------------------
+
+    def _directory(self) -> str:
+        return getattr(settings, "METRICS_MULTIPROC_DIR", "") if settings.configured else ""
+
+    def changed(self) -> None:
+        if not self._directory():
+            return
+        with self.lock:
+            self._dirty = True
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0), self.flush)
+            self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> None:
+        """Write this process's snapshot to the multi-process directory."""
+        directory = self._directory()
+        with self.lock:
+            self._timer = None
+            dirty, self._dirty = self._dirty, False
+        if not directory or not dirty:
+            return
+        data = {name: metric.snapshot() for name, metric in self.metrics.items()}
+        with self._flush_lock:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics_", suffix=".tmp")
+            with os.fdopen(fd, "w") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, os.path.join(directory, f"metrics_{os.getpid()}.json"))
+
+    def flush_before_fork(self) -> None:
+        """Write the parent's pending values before the child drops its copy."""
+        with self.lock:
+            timer = self._timer
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+
+    def reset_after_fork(self) -> None:
+        # The parent's observations are in the parent's snapshot (flush_before_fork).
+        self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        for metric in self.metrics.values():
+            metric._values = {}
+
+    def collect(self) -> Dict[str, Dict]:
+        """All metrics, summed over the snapshots of every process."""
+        directory = self._directory()
+        if not directory:
+            return {name: metric.snapshot() for name, metric in self.metrics.items()}
+        self.flush()
+        merged: Dict[str, Dict] = {name: {**m.snapshot(), "samples": []} for name, m in self.metrics.items()}
+        for path in glob.glob(os.path.join(directory, "metrics_*.json")):
+            try:
+                with open(path) as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            for name, metric in data.items():
+                target = merged.setdefault(name, {**metric, "samples": []})
+                target["samples"].extend(metric["samples"])
+        for metric in merged.values():
+            metric["samples"] = _sum_samples(metric["samples"])
+        return merged
+
+
+def _sum_samples(samples: Iterable) -> List:
+    totals: Dict[LabelValues, object] = {}
+    for key, value in samples:
+        key = tuple(key)
+        current = totals.get(key)
+        if current is None:
+            totals[key] = _copy(value)
+        elif isinstance(value, dict):
+            current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+            current["sum"] += value["sum"]
+        else:
+            totals[key] = current + value
+    return [[list(key), value] for key, value in sorted(totals.items())]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render(metrics: Optional[Dict[str, Dict]] = None) -> str:
+    """Text exposition format (version 0.0.4)."""
+    metrics = REGISTRY.collect() if metrics is None else metrics
+    lines: List[str] = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = metric["labels"]
+        for values, value in metric["samples"]:
+            if metric["type"] == "histogram":
+                cumulative = 0
+                bounds = list(metric["buckets"]) + [math.inf]
+                for bound, count in zip(bounds, value["buckets"]):
+                    cumulative += count
+                    le = _labels(names, values, (("le", _number(bound)),))
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                lines.append(f"{name}_sum{_labels(names, values)} {_number(value['sum'])}")
+                lines.append(f"{name}_count{_labels(names, values)} {cumulative}")
+            else:
+                lines.append(f"{name}{_labels(names, values)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+atexit.register(REGISTRY.flush)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=REGISTRY.flush_before_fork, after_in_child=REGISTRY.reset_after_fork)
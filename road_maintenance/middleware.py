@@ -0,0 +1,169 @@
+"""Project middleware.
+
+Token-authenticated endpoints (``SESSIONLESS_PATH_PREFIXES``, by default the
+public review API) never use a session, a logged-in user, flash messages or
+the active language. The subclasses below wrap the stock Django middleware and
+pass such requests straight through, so they cost no session lookups, no
+``Vary: Cookie`` and no message storage. They stay subclasses of the originals
+so the admin system checks still recognise them.
+
+``QueryBudgetMiddleware`` counts queries and database time per request,
+reports them in ``Server-Timing`` and logs views that go over their budget.
+Statements run inside :func:`uncounted_queries` (diagnostics' own EXPLAIN and
+its savepoint) are left out.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from fnmatch import fnmatchcase
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.db import connections
+from django.middleware import locale
+
+logger = logging.getLogger("road_maintenance.query_budget")
+
+_uncounted = threading.local()
+
+
+def is_sessionless_path(path: str) -> bool:
+    """Entries ending in ``/`` match as prefixes, others only the exact path."""
+    for entry in getattr(settings, "SESSIONLESS_PATH_PREFIXES", ()):
+        if path == entry or (entry.endswith("/") and path.startswith(entry)):
+            return True
+    return False
+
+
+class SessionlessPathsMixin:
+    def __call__(self, request):
+        if is_sessionless_path(request.path_info):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(SessionlessPathsMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class LocaleMiddleware(SessionlessPathsMixin, locale.LocaleMiddleware):
+    pass
+
+
+class AuthenticationMiddleware(SessionlessPathsMixin, auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(SessionlessPathsMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+def get_query_budget(view_name: Optional[str], method: str = "GET") -> Optional[int]:
+    """Budget for a view from ``QUERY_BUDGETS``.
+
+    Keys are namespaced URL names (``customer_review:review-public``) or
+    shell-style patterns (``admin:*_changelist``), optionally prefixed with
+    the HTTP method (``POST customer_review:review-public``). Method-specific
+    keys win over plain ones and exact names over patterns; views without a
+    match fall back to ``QUERY_BUDGET_DEFAULT``.
+    """
+    budgets = getattr(settings, "QUERY_BUDGETS", {})
+    default = getattr(settings, "QUERY_BUDGET_DEFAULT", None)
+    if not view_name:
+        return default
+    for name in (f"{method} {view_name}", view_name):
+        if name in budgets:
+            return budgets[name]
+    for name in (f"{method} {view_name}", view_name):
+        for pattern, budget in budgets.items():
+            if fnmatchcase(name, pattern):
+                return budget
+    return default
+
+
+@contextmanager
+def uncounted_queries():
+    """Statements run in this block on this thread are not counted by ``QueryStats``."""
+    previous = getattr(_uncounted, "active", False)
+    _uncounted.active = True
+    try:
+        yield
+    finally:
+        _uncounted.active = previous
+
+
+class QueryStats:
+    """``execute_wrapper`` that counts queries, DB time and repeated SQL."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_uncounted, "active", False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    def most_repeated(self):
+        """The most frequent SQL statement and its count, or ``(None, 0)``."""
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+    def wrap(self, stack: ExitStack) -> "QueryStats":
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+
+class QueryBudgetMiddleware:
+    """Count queries per request and enforce ``QUERY_BUDGETS``.
+
+    Place it near the top of ``MIDDLEWARE`` so session and user lookups are
+    counted too. Queries run while a streaming response is consumed happen
+    after this middleware returns and are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with ExitStack() as stack:
+            stats = QueryStats().wrap(stack)
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match is not None else None
+        budget = get_query_budget(view_name, request.method)
+        if budget is not None and stats.count > budget:
+            sql, repeated = stats.most_repeated()
+            logger.warning(
+                "Query budget exceeded: %s %s (%s) ran %d queries, budget %d, %.1f ms in DB; "
+                "most repeated (%dx): %s",
+                request.method,
+                request.path,
+                view_name,
+                stats.count,
+                budget,
+                stats.duration * 1000,
+                repeated,
+                sql,
+            )
+
+        if getattr(settings, "QUERY_BUDGET_SERVER_TIMING", False):
+            timing = f'db;desc="{stats.count} queries";dur={stats.duration * 1000:.1f}'
+            existing = response.get("Server-Timing")
+            response["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+        return response
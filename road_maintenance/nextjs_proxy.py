@@ -0,0 +1,278 @@
+"""Pooled, streaming proxy to the Next.js server.
+
+``django_nextjs.render_nextjs_page`` opens a new HTTP session for every page
+and buffers the whole upstream body. This proxy keeps one keep-alive
+``aiohttp`` session per event loop and streams the upstream body through.
+Under ASGI that is the server's loop. Under WSGI (``runserver``) every
+request would get a short-lived loop of its own, so upstream requests are
+instead run on one long-lived loop in a background thread per process, and
+the body is handed to the WSGI server chunk by chunk as a plain iterator.
+
+Anonymous GET/HEAD responses that Next.js marks cacheable (``public`` or
+``max-age``/``s-maxage``, no ``Set-Cookie``) are kept in the Django cache for
+at most ``NEXTJS_PROXY_CACHE_TTL`` seconds. Upstream latency is reported in a
+``Server-Timing`` header and logged.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+import weakref
+from http.cookies import Morsel
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+import aiohttp
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+
+from .metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+FORWARD_REQUEST_HEADERS = (
+    "Accept",
+    "Accept-Encoding",
+    "Accept-Language",
+    "Rsc",
+    "Next-Router-State-Tree",
+    "Next-Router-Prefetch",
+    "Next-Url",
+)
+# Hop-by-hop headers (Connection, Keep-Alive, Transfer-Encoding) are never forwarded.
+FORWARD_RESPONSE_HEADERS = (
+    "Location",
+    "Vary",
+    "Content-Type",
+    "Content-Encoding",
+    "Link",
+    "Cache-Control",
+    "Date",
+    "ETag",
+    "Last-Modified",
+)
+UNCACHEABLE_DIRECTIVES = {"private", "no-store", "no-cache"}
+
+NEXTJS_SECONDS = histogram(
+    "roadmaint_nextjs_proxy_seconds",
+    "Next.js page proxy: time to upstream headers (miss) or cache lookup (hit).",
+    ["cache"],
+)
+NEXTJS_ERRORS = counter("roadmaint_nextjs_proxy_errors_total", "Next.js upstream connection errors.")
+
+_morsel = Morsel()
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+    weakref.WeakKeyDictionary()
+)
+# Event loop for WSGI requests, running in a daemon thread.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _new_session(**connector_kwargs) -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(**connector_kwargs),
+        # Shared between users: cookies are sent per request, never stored.
+        cookie_jar=aiohttp.DummyCookieJar(),
+        auto_decompress=False,
+        timeout=aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=settings.NEXTJS_PROXY_TIMEOUT,
+            sock_read=settings.NEXTJS_PROXY_TIMEOUT,
+        ),
+    )
+
+
+def _pooled_session() -> aiohttp.ClientSession:
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = _new_session(
+            limit=settings.NEXTJS_PROXY_POOL_SIZE,
+            keepalive_timeout=settings.NEXTJS_PROXY_KEEPALIVE,
+        )
+        _sessions[loop] = session
+    return session
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="nextjs-proxy-loop", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def _reset_after_fork() -> None:
+    # The loop thread does not survive fork; the child starts its own.
+    global _loop, _loop_lock
+    _loop = None
+    _loop_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _blocking_chunks(chunks: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop) -> Iterator[bytes]:
+    """Iterate ``chunks`` (running on ``loop``) from a WSGI worker thread."""
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(chunks.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        # Releases the upstream connection if the client went away mid-body.
+        asyncio.run_coroutine_threadsafe(chunks.aclose(), loop).result()
+
+
+def _request_headers(request: HttpRequest) -> Dict[str, str]:
+    headers = {name: request.headers[name] for name in FORWARD_REQUEST_HEADERS if name in request.headers}
+    headers["X-Real-Ip"] = request.headers.get("X-Real-Ip", "") or request.META.get("REMOTE_ADDR", "")
+    headers["User-Agent"] = request.headers.get("User-Agent", "")
+
+    cookies = {k: v for k, v in request.COOKIES.items() if k and not _morsel.isReservedKey(k)}
+    # Next.js forms need a CSRF token even on the first visit.
+    cookies.setdefault(settings.CSRF_COOKIE_NAME, get_token(request))
+    headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in cookies.items())
+    return headers
+
+
+def _cache_ttl(status: int, headers) -> int:
+    if status != 200 or "Set-Cookie" in headers:
+        return 0
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        key, _, value = part.strip().lower().partition("=")
+        if key:
+            directives[key] = value
+    if UNCACHEABLE_DIRECTIVES & directives.keys():
+        return 0
+    max_age = directives.get("s-maxage") or directives.get("max-age")
+    if max_age is None:
+        return settings.NEXTJS_PROXY_CACHE_TTL if "public" in directives else 0
+    try:
+        return min(int(max_age), settings.NEXTJS_PROXY_CACHE_TTL)
+    except ValueError:
+        return 0
+
+
+def _cache_key(request: HttpRequest) -> Optional[str]:
+    if settings.NEXTJS_PROXY_CACHE_TTL <= 0 or request.method not in ("GET", "HEAD"):
+        return None
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return None
+    parts = [request.get_full_path()] + [request.headers.get(h, "") for h in FORWARD_REQUEST_HEADERS]
+    return "nextjs-proxy:" + hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _build_response(response: HttpResponse, headers: Dict[str, str], set_cookies=()) -> HttpResponse:
+    for name, value in headers.items():
+        response[name] = value
+    for raw in set_cookies:
+        response.cookies.load(raw)
+    return response
+
+
+def _server_timing(upstream_ms: float) -> str:
+    return f"nextjs;dur={upstream_ms:.1f}"
+
+
+async def _stream_body(
+    upstream: aiohttp.ClientResponse,
+    cache_key: Optional[str],
+    ttl: int,
+    headers: Dict[str, str],
+    started: float,
+    path: str,
+) -> AsyncIterator[bytes]:
+    body: Optional[bytearray] = bytearray() if cache_key and ttl else None
+    try:
+        async for chunk in upstream.content.iter_chunked(CHUNK_SIZE):
+            if body is not None:
+                body.extend(chunk)
+                if len(body) > settings.NEXTJS_PROXY_CACHE_MAX_BYTES:
+                    body = None
+            yield chunk
+    finally:
+        upstream.release()
+        logger.info(
+            "nextjs %s %s streamed in %.1f ms",
+            path,
+            upstream.status,
+            (time.perf_counter() - started) * 1000,
+        )
+    if body is not None:
+        await caches[settings.NEXTJS_PROXY_CACHE_ALIAS].aset(
+            cache_key, (upstream.status, headers, bytes(body)), ttl
+        )
+
+
+async def _fetch(
+    request: HttpRequest, cache_key: Optional[str], loop: Optional[asyncio.AbstractEventLoop] = None
+) -> HttpResponse:
+    """Request the page on the pooled session of the running loop and stream it back.
+
+    With ``loop`` (the background loop, for WSGI) the body is returned as a
+    blocking iterator instead of an async one.
+    """
+    url = f"{settings.NEXTJS_SERVER_URL}/{quote(request.path_info.lstrip('/'))}"
+    params = [(k, v) for k in request.GET.keys() for v in request.GET.getlist(k)]
+    started = time.perf_counter()
+    try:
+        upstream = await _pooled_session().get(
+            url, params=params, headers=_request_headers(request), allow_redirects=False
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        logger.warning("nextjs %s upstream error: %s", request.path, exc)
+        NEXTJS_ERRORS.inc()
+        return HttpResponse("Next.js poslužitelj nije dostupan.", status=502, content_type="text/plain")
+    upstream_ms = (time.perf_counter() - started) * 1000
+    NEXTJS_SECONDS.labels(cache="miss").observe(upstream_ms / 1000)
+
+    headers = {name: upstream.headers[name] for name in FORWARD_RESPONSE_HEADERS if name in upstream.headers}
+    set_cookies = upstream.headers.getall("Set-Cookie", [])
+    ttl = _cache_ttl(upstream.status, upstream.headers) if cache_key else 0
+
+    body = _stream_body(upstream, cache_key, ttl, headers, started, request.path)
+    response = StreamingHttpResponse(
+        body if loop is None else _blocking_chunks(body, loop),
+        status=upstream.status,
+    )
+    response = _build_response(response, headers, set_cookies)
+    response["Server-Timing"] = _server_timing(upstream_ms)
+    return response
+
+
+async def proxy_nextjs_page(request: HttpRequest) -> HttpResponse:
+    started = time.perf_counter()
+    cache_key = _cache_key(request)
+    if cache_key:
+        cached: Optional[Tuple[int, Dict[str, str], bytes]] = await caches[
+            settings.NEXTJS_PROXY_CACHE_ALIAS
+        ].aget(cache_key)
+        if cached is not None:
+            status, headers, body = cached
+            get_token(request)
+            response = _build_response(HttpResponse(body, status=status), headers)
+            response["X-Proxy-Cache"] = "HIT"
+            NEXTJS_SECONDS.labels(cache="hit").observe(time.perf_counter() - started)
+            return response
+
+    if isinstance(request, ASGIRequest):
+        return await _fetch(request, cache_key)
+
+    loop = _background_loop()
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(_fetch(request, cache_key, loop), loop))
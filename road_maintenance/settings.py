@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
 from django.utils.translation import gettext_lazy as _
@@ -18,6 +19,10 @@ from django.utils.translation import gettext_lazy as _
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# `manage.py test` or pytest: background writers and diagnostics that would add threads,
+# connections or queries to test runs default to off below.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -41,6 +46,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',
+    'django.contrib.postgres',
     'corsheaders',
     'django_nextjs',
     'tailwind',
@@ -51,20 +57,47 @@ INSTALLED_APPS = [
     'operations',
     'activity',
     'customer_review',
+    'benchmarks',
+    'diagnostics',
+    'invoicing',
+    'search',
 ]
 
+# Session, locale, auth and messages are skipped for SESSIONLESS_PATH_PREFIXES
+# (see road_maintenance.middleware).
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'road_maintenance.middleware.QueryBudgetMiddleware',
+    'diagnostics.middleware.SlowQueryViewMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.locale.LocaleMiddleware',
+    'road_maintenance.middleware.SessionMiddleware',
+    'road_maintenance.middleware.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'road_maintenance.middleware.AuthenticationMiddleware',
+    'road_maintenance.middleware.MessageMiddleware',
+    'diagnostics.profiling.ProfilingMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Token-authenticated endpoints that never use a session. Entries ending in "/"
+# are prefixes; others match only that exact path (like the `metrics$` route).
+SESSIONLESS_PATH_PREFIXES = ('/api/public/', '/metrics')
+
+# Per-view query budgets (road_maintenance.middleware.QueryBudgetMiddleware).
+# Keys are namespaced URL names or shell-style patterns, optionally prefixed
+# with the HTTP method. Requests over budget are logged, and
+# road_maintenance.testing.assert_query_budget fails on them.
+QUERY_BUDGETS = {
+    'GET customer_review:review-public': 3,
+    'POST customer_review:review-public': 10,
+    'admin:*_changelist': 12,
+    'admin:autocomplete': 6,
+}
+QUERY_BUDGET_DEFAULT = None
+# Query count and DB time in the Server-Timing header.
+QUERY_BUDGET_SERVER_TIMING = os.getenv('QUERY_BUDGET_SERVER_TIMING', '1' if DEBUG else '0') == '1'
+
 ROOT_URLCONF = 'road_maintenance.urls'
 
 TEMPLATES = [
@@ -150,6 +183,108 @@ LOCALE_PATHS = [
 NEXTJS_SERVER_URL = os.getenv('NEXTJS_SERVER_URL', 'http://127.0.0.1:3000')
 NEXTJS_APP_DIR = BASE_DIR / 'frontend'
 NEXTJS_BUILD_DIR = NEXTJS_APP_DIR / '.next'
+# Page proxy (road_maintenance.nextjs_proxy): keep-alive pool size, timeouts in
+# seconds, and a short cache for anonymous cacheable pages (TTL 0 disables it).
+NEXTJS_PROXY_POOL_SIZE = int(os.getenv('NEXTJS_PROXY_POOL_SIZE', '32'))
+NEXTJS_PROXY_KEEPALIVE = float(os.getenv('NEXTJS_PROXY_KEEPALIVE', '30'))
+NEXTJS_PROXY_TIMEOUT = float(os.getenv('NEXTJS_PROXY_TIMEOUT', '30'))
+NEXTJS_PROXY_CACHE_TTL = int(os.getenv('NEXTJS_PROXY_CACHE_TTL', '5'))
+NEXTJS_PROXY_CACHE_MAX_BYTES = int(os.getenv('NEXTJS_PROXY_CACHE_MAX_BYTES', str(512 * 1024)))
+NEXTJS_PROXY_CACHE_ALIAS = 'default'
+
+# Login event logging
+# Buffered writes batch LoginEvent inserts off the request path; set
+# ACTIVITY_LOGIN_EVENTS_BUFFERED=0 to write synchronously, as test runs do: the
+# writer thread's own connection cannot see a TestCase's uncommitted rows.
+ACTIVITY_LOGIN_EVENTS_BUFFERED = os.getenv('ACTIVITY_LOGIN_EVENTS_BUFFERED', '0' if TESTING else '1') == '1'
+ACTIVITY_LOGIN_EVENTS_BATCH_SIZE = int(os.getenv('ACTIVITY_LOGIN_EVENTS_BATCH_SIZE', '200'))
+ACTIVITY_LOGIN_EVENTS_FLUSH_INTERVAL = float(os.getenv('ACTIVITY_LOGIN_EVENTS_FLUSH_INTERVAL', '2.0'))
+# Consecutive failed writes of a buffered batch before it is dropped.
+ACTIVITY_LOGIN_EVENTS_MAX_RETRIES = int(os.getenv('ACTIVITY_LOGIN_EVENTS_MAX_RETRIES', '5'))
+# Monthly partitions maintained by `manage.py loginevent_partitions`.
+ACTIVITY_LOGIN_EVENT_PARTITIONS_AHEAD = int(os.getenv('ACTIVITY_LOGIN_EVENT_PARTITIONS_AHEAD', '3'))
+ACTIVITY_LOGIN_EVENT_RETENTION_MONTHS = int(os.getenv('ACTIVITY_LOGIN_EVENT_RETENTION_MONTHS', '12'))
+ACTIVITY_LOGIN_EVENT_ARCHIVE_DIR = Path(
+    os.getenv('ACTIVITY_LOGIN_EVENT_ARCHIVE_DIR', BASE_DIR / 'archive' / 'loginevents')
+)
+# Per-minute failed-login counters kept for brute-force detection.
+ACTIVITY_FAILURE_BUCKET_RETENTION_HOURS = int(os.getenv('ACTIVITY_FAILURE_BUCKET_RETENTION_HOURS', '24'))
+
+# Metrics (road_maintenance.metrics) served on /metrics. With several worker
+# processes point METRICS_MULTIPROC_DIR at a directory shared by them and
+# empty it on every deploy. Scrapers send "Authorization: Bearer $METRICS_TOKEN";
+# with no token set /metrics answers 404.
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '1.0'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Slow-query capture (diagnostics.slow_queries): statements slower than the
+# threshold are stored with their fingerprint and view; 0 disables capture, the
+# default in test runs so query counts do not depend on the machine's speed.
+# A fraction of them (and the slowest per fingerprint) also get EXPLAIN plans.
+DIAGNOSTICS_SLOW_QUERY_MS = float(os.getenv('DIAGNOSTICS_SLOW_QUERY_MS', '0' if TESTING else '200'))
+DIAGNOSTICS_EXPLAIN_SAMPLE_RATE = float(os.getenv('DIAGNOSTICS_EXPLAIN_SAMPLE_RATE', '0.1'))
+DIAGNOSTICS_SLOW_QUERY_FLUSH_INTERVAL = float(os.getenv('DIAGNOSTICS_SLOW_QUERY_FLUSH_INTERVAL', '5.0'))
+# Samples older than this are removed by `manage.py prune_slow_queries`.
+DIAGNOSTICS_SLOW_QUERY_RETENTION_DAYS = int(os.getenv('DIAGNOSTICS_SLOW_QUERY_RETENTION_DAYS', '14'))
+
+# Per-request cProfile (diagnostics.profiling), triggered by staff with the
+# X-Profile: 1 header or ?__profile=1. Disabled, the middleware is removed
+# from the chain at startup.
+DIAGNOSTICS_PROFILING_ENABLED = os.getenv('DIAGNOSTICS_PROFILING_ENABLED', '0') == '1'
+DIAGNOSTICS_PROFILING_USERS = [u for u in os.getenv('DIAGNOSTICS_PROFILING_USERS', '').split(',') if u]
+DIAGNOSTICS_PROFILE_DIR = Path(os.getenv('DIAGNOSTICS_PROFILE_DIR', BASE_DIR / 'profiles'))
+DIAGNOSTICS_PROFILE_KEEP = int(os.getenv('DIAGNOSTICS_PROFILE_KEEP', '50'))
+
+# Snapping of GPS points to road sections (/api/roads/snap/): default and
+# maximum search radius in metres, and points per batch request.
+ROADS_SNAP_DEFAULT_DISTANCE = float(os.getenv('ROADS_SNAP_DEFAULT_DISTANCE', '50'))
+ROADS_SNAP_MAX_DISTANCE = float(os.getenv('ROADS_SNAP_MAX_DISTANCE', '2000'))
+ROADS_SNAP_MAX_POINTS = int(os.getenv('ROADS_SNAP_MAX_POINTS', '10000'))
+
+# In-process road network used for GPS track map matching: how often (s) the
+# section table's change counters are checked before reusing the index.
+ROADS_NETWORK_CHECK_INTERVAL = float(os.getenv('ROADS_NETWORK_CHECK_INTERVAL', '5'))
+
+# Double-billing detector (projects.double_billing): each run re-checks items
+# changed this many seconds before the previous watermark, to catch rows whose
+# transaction committed after that run read them. Keep it above the longest
+# transaction that saves WorkItems.
+DOUBLE_BILLING_WATERMARK_OVERLAP = float(os.getenv('DOUBLE_BILLING_WATERMARK_OVERLAP', '900'))
+
+# Month-end e-invoices (invoicing.generation, `manage.py generate_invoices`).
+# Numbers are "{sequence}/{premises}/{device}" per year, as required for
+# Croatian invoices; XML files go to INVOICING_OUTPUT_DIR/<YYYY-MM>/. Name, OIB,
+# address and IBAN of the supplier are required; generation refuses to run
+# without them.
+INVOICING_SUPPLIER = {
+    'name': os.getenv('INVOICING_SUPPLIER_NAME', ''),
+    'oib': os.getenv('INVOICING_SUPPLIER_OIB', ''),
+    'vat_id': os.getenv('INVOICING_SUPPLIER_VAT_ID', ''),
+    'street': os.getenv('INVOICING_SUPPLIER_STREET', ''),
+    'city': os.getenv('INVOICING_SUPPLIER_CITY', ''),
+    'postal_code': os.getenv('INVOICING_SUPPLIER_POSTAL_CODE', ''),
+    'country': 'HR',
+    'iban': os.getenv('INVOICING_SUPPLIER_IBAN', ''),
+    'email': os.getenv('INVOICING_SUPPLIER_EMAIL', ''),
+}
+INVOICING_VAT_RATE = os.getenv('INVOICING_VAT_RATE', '25')
+INVOICING_NUMBER_FORMAT = os.getenv('INVOICING_NUMBER_FORMAT', '{sequence}/1/1')
+INVOICING_OUTPUT_DIR = Path(os.getenv('INVOICING_OUTPUT_DIR', BASE_DIR / 'invoices'))
+INVOICING_WORKERS = int(os.getenv('INVOICING_WORKERS', str(os.cpu_count() or 1)))
+
+# Full-text search (/api/search/): only this many matches are ranked per
+# query, which bounds latency for short, common prefixes.
+SEARCH_MAX_CANDIDATES = int(os.getenv('SEARCH_MAX_CANDIDATES', '2000'))
+SEARCH_MAX_LIMIT = int(os.getenv('SEARCH_MAX_LIMIT', '100'))
+
+# Trigram autocomplete (/api/search/autocomplete/<kind>/): results for inputs
+# of up to SEARCH_AUTOCOMPLETE_CACHE_PREFIX characters are cached per process
+# (LRU of SEARCH_AUTOCOMPLETE_CACHE_SIZE entries, TTL in seconds).
+SEARCH_AUTOCOMPLETE_MAX_LIMIT = int(os.getenv('SEARCH_AUTOCOMPLETE_MAX_LIMIT', '50'))
+SEARCH_AUTOCOMPLETE_CACHE_PREFIX = int(os.getenv('SEARCH_AUTOCOMPLETE_CACHE_PREFIX', '3'))
+SEARCH_AUTOCOMPLETE_CACHE_SIZE = int(os.getenv('SEARCH_AUTOCOMPLETE_CACHE_SIZE', '1024'))
+SEARCH_AUTOCOMPLETE_CACHE_TTL = float(os.getenv('SEARCH_AUTOCOMPLETE_CACHE_TTL', '60'))
 
 TAILWIND_APP_NAME = 'theme'
 INTERNAL_IPS = ['127.0.0.1']
@@ -0,0 +1,99 @@
+"""Test helpers for the per-view query budgets (``QUERY_BUDGETS``)."""
+import datetime
+from contextlib import ExitStack
+from decimal import Decimal
+
+from .middleware import QueryStats, get_query_budget
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def count_queries(client, path, method="get", **kwargs):
+    """Request ``path`` with a test ``client``; returns (response, ``QueryStats``)."""
+    with ExitStack() as stack:
+        stats = QueryStats().wrap(stack)
+        response = getattr(client, method.lower())(path, **kwargs)
+    return response, stats
+
+
+def assert_query_budget(client, path, method="get", budget=None, **kwargs):
+    """Request ``path`` with a test ``client`` and fail if the view runs more
+    queries than its budget.
+
+    The budget comes from ``QUERY_BUDGETS`` for the resolved view unless
+    ``budget`` is given. Returns the response for further assertions.
+    """
+    response, stats = count_queries(client, path, method=method, **kwargs)
+    match = getattr(response, "resolver_match", None)
+    view_name = match.view_name if match is not None else None
+    if budget is None:
+        budget = get_query_budget(view_name, method.upper())
+    if budget is None:
+        raise QueryBudgetExceeded(f"No query budget declared for {view_name or path}.")
+    if stats.count > budget:
+        lines = [
+            f"{view_name or path} ran {stats.count} queries, budget {budget}:",
+            *(f"  {n}x {sql}" for sql, n in stats.statements.most_common()),
+        ]
+        raise QueryBudgetExceeded("\n".join(lines))
+    return response
+
+
+class QueryBudgetTestMixin:
+    """``TestCase`` mixin exposing :func:`assert_query_budget` as a method."""
+
+    def assertQueryBudget(self, path, method="get", budget=None, **kwargs):
+        return assert_query_budget(self.client, path, method=method, budget=budget, **kwargs)
+
+    def countQueries(self, path, method="get", **kwargs):
+        """Number of queries a request to ``path`` runs."""
+        response, stats = count_queries(self.client, path, method=method, **kwargs)
+        self.assertLess(response.status_code, 400, f"{path} returned {response.status_code}")
+        return stats.count
+
+    def assertQueriesIndependentOfRows(self, path, add_rows, rows=5, **kwargs):
+        """Same query count with ``rows`` and ``2 * rows`` objects, within the budget.
+
+        ``add_rows(n)`` must create ``n`` more objects shown by ``path``.
+        """
+        add_rows(rows)
+        first = self.countQueries(path, **kwargs)
+        add_rows(rows)
+        second = self.countQueries(path, **kwargs)
+        self.assertEqual(first, second, f"{path}: {first} queries with {rows} rows, {second} with {2 * rows}")
+        return self.assertQueryBudget(path, **kwargs)
+
+
+def create_work_fixtures(username="test-user"):
+    """One customer, project, work order, road section and ``m2`` operation.
+
+    Returns them in a dict for tests that need a realistic work item chain.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.gis.geos import LineString
+
+    from customers.models import Customer
+    from operations.models import OperationType
+    from projects.models import Project, WorkOrder
+    from roads.models import RoadSection
+
+    user = get_user_model().objects.create_user(username=username, password=username)
+    customer = Customer.objects.create(
+        name="Ceste d.o.o.", oib="12345678903", street_address="Ilica 1", postal_code="10000", city="Zagreb"
+    )
+    project = Project.objects.create(name="Održavanje", customer=customer, start_date=datetime.date.today())
+    return {
+        "user": user,
+        "customer": customer,
+        "project": project,
+        "work_order": WorkOrder.objects.create(project=project, title="Nalog", created_by=user),
+        "section": RoadSection.objects.create(
+            name="Dionica",
+            road_number="D8",
+            geom=LineString([(492800, 4818200), (493400, 4818650), (494100, 4818900)], srid=3765),
+            road_width=Decimal("6.50"),
+        ),
+        "operation": OperationType.objects.create(name="Rubna linija", unit="m2", base_price=Decimal("1.50")),
+    }
@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import ExitStack
+from decimal import Decimal
+
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from customer_review.models import CustomerReview, CustomerReviewDecision, ReviewToken
+from projects.models import WorkItem
+
+from .metrics import REGISTRY, counter
+from .middleware import QueryStats, uncounted_queries
+from .testing import QueryBudgetTestMixin, create_work_fixtures
+
+ROWS = 25
+
+
+class AdminChangelistQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Every registered admin changelist stays within its budget on multi-row data."""
+
+    @classmethod
+    def setUpTestData(cls):
+        data = create_work_fixtures()
+        operation = data["operation"]
+        items = WorkItem.objects.bulk_create(
+            WorkItem(
+                work_order=data["work_order"],
+                road_section=data["section"],
+                operation_type=operation,
+                road_side="right",
+                quantity=Decimal(i + 1),
+                unit_price=operation.base_price,
+                total_price=Decimal(i + 1) * operation.base_price,
+            )
+            for i in range(ROWS)
+        )
+        reviews = CustomerReview.objects.bulk_create(
+            CustomerReview(work_item=item, data_snapshot_hash="test-hash") for item in items
+        )
+        users = get_user_model().objects.bulk_create(get_user_model()(username=f"kupac-{i}") for i in range(ROWS))
+        ReviewToken.objects.bulk_create(
+            ReviewToken(customer_review=review, user=user, jti=f"test-{review.pk}", expires_at=review.created_at)
+            for review, user in zip(reviews, users)
+        )
+        CustomerReviewDecision.objects.bulk_create(
+            CustomerReviewDecision(
+                customer_review=review,
+                decided_by_user=user,
+                action=CustomerReviewDecision.Action.ACCEPTED,
+                decided_at=review.created_at,
+            )
+            for review, user in zip(reviews, users)
+        )
+        cls.admin_user = get_user_model().objects.create_superuser("admin", password="admin")
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def test_changelists(self):
+        for model in apps.get_models():
+            if not admin.site.is_registered(model):
+                continue
+            url = reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist")
+            with self.subTest(model=model._meta.label):
+                response = self.assertQueryBudget(url)
+                self.assertEqual(response.status_code, 200)
+
+
+class QueryStatsTests(TestCase):
+    def test_uncounted_queries_are_skipped(self):
+        with ExitStack() as stack:
+            stats = QueryStats().wrap(stack)
+            with connection.cursor() as cur:
+                cur.execute("SELECT 1")
+                with uncounted_queries():
+                    cur.execute("EXPLAIN SELECT 1")
+                cur.execute("SELECT 2")
+        self.assertEqual(stats.count, 2)
+        self.assertNotIn("EXPLAIN SELECT 1", stats.statements)
+
+
+class MetricsViewTests(SimpleTestCase):
+    @override_settings(METRICS_TOKEN="tajna")
+    def test_requires_bearer_token(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url, headers={"authorization": "Bearer kriva"}).status_code, 404)
+        self.assertEqual(self.client.get(url, headers={"authorization": "Basic tajna"}).status_code, 404)
+        response = self.client.get(url, headers={"authorization": "Bearer tajna"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"# TYPE", response.content)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_off_without_token(self):
+        # Loopback is not trusted: behind the proxy every request comes from it.
+        response = self.client.get(reverse("metrics"), headers={"authorization": "Bearer "}, REMOTE_ADDR="127.0.0.1")
+        self.assertEqual(response.status_code, 404)
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+class MetricsForkTests(SimpleTestCase):
+    def test_values_recorded_before_fork_stay_in_parent_snapshot(self):
+        requests = counter("roadmaint_test_fork_total", "Fork test counter.")
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            METRICS_MULTIPROC_DIR=directory, METRICS_FLUSH_INTERVAL=60
+        ):
+            requests.inc(1)
+            pid = os.fork()
+            if pid == 0:
+                # Child: starts from zero and reports only its own increments.
+                status = 1
+                try:
+                    if requests.snapshot()["samples"] == []:
+                        requests.inc(2)
+                        REGISTRY.flush()
+                        status = 0
+                finally:
+                    os._exit(status)
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+            with open(os.path.join(directory, f"metrics_{os.getpid()}.json")) as fh:
+                parent = json.load(fh)["roadmaint_test_fork_total"]["samples"]
+            self.assertEqual(parent, [[[], 1.0]])
+            self.assertEqual(REGISTRY.collect()["roadmaint_test_fork_total"]["samples"], [[[], 3.0]])
@@ -17,11 +17,16 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path, re_path
 
-from .views import nextjs_frontend
+from .views import metrics, nextjs_frontend
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path('_next/', include('django_nextjs.urls')),
+    path('api/activity/', include('activity.urls', namespace='activity')),
+    path('api/roads/', include('roads.urls', namespace='roads')),
+    path('api/projects/', include('projects.urls', namespace='projects')),
+    path('api/search/', include('search.urls', namespace='search')),
     path('api/', include('customer_review.urls', namespace='customer_review')),
-    re_path(r'^(?!admin/|api/|_next/).*', nextjs_frontend, name='frontend'),
+    re_path(r'^(?!admin/|api/|_next/|metrics$).*', nextjs_frontend, name='frontend'),
 ]
@@ -1,8 +1,25 @@
-from django.http import HttpRequest, HttpResponse
+import hmac
 
-from django_nextjs.render import render_nextjs_page
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse
+
+from .metrics import render
+from .nextjs_proxy import proxy_nextjs_page
 
 
 async def nextjs_frontend(request: HttpRequest, path: str = "") -> HttpResponse:
     """Proxy page rendering to the Next.js frontend."""
-    return await render_nextjs_page(request)
+    return await proxy_nextjs_page(request)
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Prometheus scrape endpoint, for requests carrying ``Bearer <METRICS_TOKEN>``.
+
+    ``REMOTE_ADDR`` is not checked: behind the reverse proxy every request
+    comes from the proxy's address. Without a token the endpoint is off.
+    """
+    token = settings.METRICS_TOKEN
+    scheme, _, credentials = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    if not token or scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode(), token.encode()):
+        raise Http404
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,18 +1,21 @@
 from django import forms
 from django.contrib import admin
-from django.contrib.gis import forms as gis_forms
 from django.utils.translation import gettext_lazy as _
 
+from road_maintenance.admin_mixins import PerformanceAdminMixin
+from search.admin_mixins import TrigramAutocompleteAdminMixin
+
+from .lazy_geometry import LazyGeometryAdminMixin, LazyGeometryFormMixin, LazyOSMWidget
 from .models import RoadSection
 
 
-class RoadSectionAdminForm(forms.ModelForm):
+class RoadSectionAdminForm(LazyGeometryFormMixin, forms.ModelForm):
     class Meta:
         model = RoadSection
         fields = '__all__'
         widgets = {
-            'geom': gis_forms.OSMWidget(
-                attrs={                   
+            'geom': LazyOSMWidget(
+                attrs={
                     'default_lat': 43.7350,
                     'default_lon': 15.8950,
                     'default_zoom': 12,
@@ -23,11 +26,13 @@ class RoadSectionAdminForm(forms.ModelForm):
 
 
 @admin.register(RoadSection)
-class RoadSectionAdmin(admin.ModelAdmin):
+class RoadSectionAdmin(TrigramAutocompleteAdminMixin, LazyGeometryAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
     form = RoadSectionAdminForm
     list_display = ('name', 'road_number', 'length', 'road_width', 'is_active')
+    list_defer = ('geom', 'description')
     list_filter = ('is_active',)
     search_fields = ('name', 'road_number')
+    autocomplete_kind = 'road_section'
     readonly_fields = ('length', 'created_at')
     fieldsets = (
         (None, {'fields': ('name', 'road_number', 'description', 'is_active')}),
@@ -6,3 +6,7 @@ class RoadsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'roads'
     verbose_name = _('Dionice cesta')
+
+    def ready(self) -> None:
+        # Keeps the in-process road network index (roads.network) fresh.
+        from . import signals  # noqa: F401
@@ -0,0 +1,128 @@
+"""Lazy map rendering for large geometries in admin change forms.
+
+``OSMWidget`` serialises the whole geometry into the page, which for a ``kom``
+work item with thousands of circles means several MB of GeoJSON. With
+``LazyOSMWidget`` a large geometry is first rendered as a simplified preview;
+the full geometry is fetched on demand from the admin's ``<pk>/geometry/``
+JSON endpoint. Above ``readonly_coords`` the field is disabled and the map is
+for viewing only.
+"""
+import json
+
+from django.contrib.admin.utils import unquote
+from django.contrib.gis import forms as gis_forms
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse
+from django.urls import path, reverse
+
+
+class LazyOSMWidget(gis_forms.OSMWidget):
+    template_name = "roads/lazy_osm_widget.html"
+
+    preview_coords = 5_000
+    readonly_coords = 100_000
+    simplify_tolerance = 0.5  # metres, in the geometry's own SRID
+
+    def __init__(self, attrs=None):
+        super().__init__(attrs)
+        self.lazy_source = None
+        self.detail_url = None
+
+    def mode_for(self, geom) -> str:
+        coords = geom.num_coords
+        if coords > self.readonly_coords:
+            return "readonly"
+        if coords > self.preview_coords:
+            return "preview"
+        return "full"
+
+    def preview_geometry(self, geom):
+        preview = geom.simplify(self.simplify_tolerance, preserve_topology=True)
+        if preview.num_coords > self.preview_coords:
+            # Thousands of tiny markers do not simplify away; show their hull.
+            preview = geom.convex_hull
+        return preview
+
+    def value_from_datadict(self, data, files, name):
+        # Until the full geometry has been loaded the textarea only holds the
+        # preview, so the stored geometry is kept as is.
+        if self.lazy_source is not None and data.get(f"{name}_full_loaded") != "1":
+            return self.lazy_source.clone()
+        return super().value_from_datadict(data, files, name)
+
+    def get_context(self, name, value, attrs):
+        lazy = self.lazy_source is not None
+        if lazy:
+            value = self.preview_geometry(self.lazy_source)
+        context = super().get_context(name, value, attrs)
+        context.update(
+            {
+                "lazy_preview": lazy,
+                "detail_url": self.detail_url,
+                "full_coords": self.lazy_source.num_coords if lazy else None,
+            }
+        )
+        return context
+
+
+class LazyGeometryFormMixin:
+    """Switches ``lazy_geometry_field`` to preview or read-only mode when large."""
+
+    lazy_geometry_field = "geom"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        name = self.lazy_geometry_field
+        field = self.fields.get(name)
+        if field is None or not isinstance(field.widget, LazyOSMWidget) or not self.instance.pk:
+            return
+        geom = getattr(self.instance, name, None)
+        if geom is None:
+            return
+
+        mode = field.widget.mode_for(geom)
+        if mode == "full":
+            return
+        if mode == "preview" and self.is_bound and self.data.get(f"{self.add_prefix(name)}_full_loaded") == "1":
+            # Re-rendering a submitted form that already carries the full geometry.
+            return
+
+        opts = self.instance._meta
+        field.widget.lazy_source = geom
+        field.widget.detail_url = reverse(
+            f"admin:{opts.app_label}_{opts.model_name}_geometry",
+            args=[self.instance.pk],
+        )
+        if mode == "readonly":
+            field.disabled = True
+
+
+class LazyGeometryAdminMixin:
+    """Adds the ``<pk>/geometry/`` endpoint used by ``LazyOSMWidget``."""
+
+    lazy_geometry_field = "geom"
+    lazy_geometry_srid = 3857
+
+    def get_urls(self):
+        opts = self.model._meta
+        urls = [
+            path(
+                "<path:object_id>/geometry/",
+                self.admin_site.admin_view(self.geometry_detail_view),
+                name=f"{opts.app_label}_{opts.model_name}_geometry",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def geometry_detail_view(self, request, object_id):
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+
+        geom = getattr(obj, self.lazy_geometry_field)
+        if geom is None:
+            return JsonResponse({"geometry": None})
+        geom = geom.transform(self.lazy_geometry_srid, clone=True)
+        return JsonResponse({"geometry": json.loads(geom.json), "coords": geom.num_coords})
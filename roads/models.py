@@ -1,8 +1,12 @@
 from decimal import Decimal
 
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 
+from road_maintenance.managers import GeometryDeferringManager
+
 
 class RoadSection(models.Model):
     """Dionice cesta (linije u metrima, HTRS96/TM EPSG:3765)."""
@@ -29,16 +33,24 @@ class RoadSection(models.Model):
     is_active = models.BooleanField(_('Aktivna'), default=True)
     created_at = models.DateTimeField(_('Datum kreiranja'), auto_now_add=True)
 
+    objects = GeometryDeferringManager()
+
     class Meta:
         verbose_name = _('Dionica ceste')
         verbose_name_plural = _('Dionice cesta')
         ordering = ['name']
+        # Trigram indexes on UPPER(...) match the SQL of admin icontains searches.
+        indexes = [
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='roads_section_name_trgm'),
+            GinIndex(OpClass(Upper('road_number'), name='gin_trgm_ops'), name='roads_section_roadno_trgm'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.road_number})" if self.road_number else self.name
 
     def save(self, *args, **kwargs) -> None:
-        if self.geom:
+        # Instances loaded without geometry keep the length the DB trigger set.
+        if 'geom' not in self.get_deferred_fields() and self.geom:
             length_m = self.geom.length
             self.length = Decimal(f"{length_m:.2f}")
         super().save(*args, **kwargs)
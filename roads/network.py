@@ -0,0 +1,102 @@
+"""In-process spatial index of the active road network.
+
+``get_network()`` returns the active ``RoadSection`` lines as a Shapely
+``STRtree`` (EPSG:3765), built once per process and rebuilt when sections
+change. Changes are noticed two ways: ``post_save``/``post_delete`` on
+``RoadSection`` mark the local copy stale at once, and, at most every
+``ROADS_NETWORK_CHECK_INTERVAL`` seconds, the table's insert/update/delete
+counters in ``pg_stat_user_tables`` are compared with those seen at build
+time, which also catches other processes, ``QuerySet.update()`` and raw SQL.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import shapely
+from django.conf import settings
+from django.db import connection
+
+VERSION_SQL = """
+SELECT n_tup_ins, n_tup_upd, n_tup_del
+FROM pg_stat_user_tables
+WHERE relid = 'roads_roadsection'::regclass
+"""
+
+NETWORK_SQL = """
+SELECT id, ST_AsBinary(geom)
+FROM roads_roadsection
+WHERE is_active AND geom IS NOT NULL
+ORDER BY id
+"""
+
+
+@dataclass
+class RoadNetwork:
+    ids: np.ndarray
+    lines: np.ndarray
+    lengths: np.ndarray
+    tree: shapely.STRtree
+    version: Tuple
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _table_version() -> Tuple:
+    with connection.cursor() as cur:
+        cur.execute(VERSION_SQL)
+        row = cur.fetchone()
+    return tuple(row) if row else ()
+
+
+def build_network(ids, lines, version: Tuple = ()) -> RoadNetwork:
+    lines = np.asarray(lines, dtype=object)
+    return RoadNetwork(
+        ids=np.asarray(ids, dtype=np.int64),
+        lines=lines,
+        lengths=shapely.length(lines),
+        tree=shapely.STRtree(lines),
+        version=version,
+    )
+
+
+def load_network() -> RoadNetwork:
+    version = _table_version()
+    with connection.cursor() as cur:
+        cur.execute(NETWORK_SQL)
+        rows = cur.fetchall()
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    return build_network(ids, shapely.from_wkb([bytes(r[1]) for r in rows]), version)
+
+
+_network: Optional[RoadNetwork] = None
+_stale = True
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def mark_stale(*args, **kwargs) -> None:
+    """Signal receiver: rebuild the index on next use."""
+    global _stale
+    _stale = True
+
+
+def get_network() -> RoadNetwork:
+    global _network, _stale, _checked_at
+    now = time.monotonic()
+    with _lock:
+        if _network is not None and not _stale:
+            if now - _checked_at < settings.ROADS_NETWORK_CHECK_INTERVAL:
+                return _network
+            _checked_at = now
+            if _table_version() == _network.version:
+                return _network
+        # Cleared before loading so a change made meanwhile triggers another build.
+        _stale = False
+        _checked_at = now
+        _network = load_network()
+        return _network
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import RoadSection
+from .network import mark_stale
+
+
+@receiver(post_save, sender=RoadSection)
+@receiver(post_delete, sender=RoadSection)
+def road_network_changed(sender, **kwargs) -> None:
+    mark_stale()
@@ -0,0 +1,110 @@
+"""Snap GPS points to the nearest active RoadSection.
+
+All points go to PostGIS in one statement: they are unnested from two
+coordinate arrays, transformed to EPSG:3765 and each one is matched by a
+``LATERAL`` subquery ordered by ``geom <-> point`` (GiST KNN), limited to
+``max_distance`` metres. Besides the distance, each match carries the
+``ST_LineLocatePoint`` fraction, the chainage in metres and the side of the
+line relative to its digitised direction (the same convention as
+``WorkItem.road_side``).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from django.db import connection
+
+# Below this offset (m) a point counts as lying on the centre line.
+ON_LINE_TOLERANCE = 0.01
+
+SNAP_SQL = """
+WITH pts AS (
+    SELECT t.ord,
+           ST_Transform(ST_SetSRID(ST_MakePoint(t.x, t.y), %(srid)s), 3765) AS p
+    FROM unnest(%(xs)s::double precision[], %(ys)s::double precision[]) WITH ORDINALITY AS t(x, y, ord)
+)
+SELECT pts.ord, s.id, s.name, s.road_number, s.distance, s.fraction, s.len, s.cross_product
+FROM pts
+LEFT JOIN LATERAL (
+    SELECT n.id, n.name, n.road_number, n.distance, n.fraction, n.len,
+           (ST_X(n.b) - ST_X(n.a)) * (ST_Y(pts.p) - ST_Y(n.a))
+         - (ST_Y(n.b) - ST_Y(n.a)) * (ST_X(pts.p) - ST_X(n.a)) AS cross_product
+    FROM (
+        SELECT c.*,
+               ST_LineInterpolatePoint(c.geom, GREATEST(c.fraction - c.step, 0)) AS a,
+               ST_LineInterpolatePoint(c.geom, LEAST(c.fraction + c.step, 1)) AS b
+        FROM (
+            SELECT rs.id, rs.name, rs.road_number, rs.geom,
+                   ST_Distance(rs.geom, pts.p) AS distance,
+                   ST_LineLocatePoint(rs.geom, pts.p) AS fraction,
+                   ST_Length(rs.geom) AS len,
+                   1.0 / GREATEST(ST_Length(rs.geom), 1.0) AS step
+            FROM roads_roadsection rs
+            WHERE rs.is_active
+              AND rs.geom IS NOT NULL
+              AND ST_DWithin(rs.geom, pts.p, %(max_distance)s)
+            ORDER BY rs.geom <-> pts.p
+            LIMIT 1
+        ) c
+    ) n
+) s ON true
+ORDER BY pts.ord
+"""
+
+
+@dataclass
+class SnapResult:
+    section_id: Optional[int] = None
+    name: str = ""
+    road_number: str = ""
+    distance: Optional[float] = None
+    fraction: Optional[float] = None
+    chainage: Optional[float] = None
+    side: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        if self.section_id is None:
+            return {"road_section": None}
+        return {
+            "road_section": {"id": self.section_id, "name": self.name, "road_number": self.road_number},
+            "distance_m": round(self.distance, 3),
+            "side": self.side,
+            "fraction": round(self.fraction, 6),
+            "chainage_m": round(self.chainage, 2),
+        }
+
+
+def _side(distance: float, cross_product: float) -> str:
+    if distance < ON_LINE_TOLERANCE or cross_product == 0:
+        return "on"
+    return "left" if cross_product > 0 else "right"
+
+
+def snap_points(points: Sequence[Tuple[float, float]], srid: int = 4326, max_distance: float = 50.0) -> List[SnapResult]:
+    """Nearest active section for each ``(x, y)``; ``SnapResult()`` if none is in range."""
+    if not points:
+        return []
+    xs = [float(x) for x, _y in points]
+    ys = [float(y) for _x, y in points]
+    with connection.cursor() as cur:
+        cur.execute(SNAP_SQL, {"xs": xs, "ys": ys, "srid": srid, "max_distance": max_distance})
+        rows = cur.fetchall()
+
+    results = []
+    for _ord, section_id, name, road_number, distance, fraction, length, cross_product in rows:
+        if section_id is None:
+            results.append(SnapResult())
+            continue
+        results.append(
+            SnapResult(
+                section_id=section_id,
+                name=name,
+                road_number=road_number,
+                distance=distance,
+                fraction=fraction,
+                chainage=fraction * length,
+                side=_side(distance, cross_product),
+            )
+        )
+    return results
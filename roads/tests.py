@@ -0,0 +1,103 @@
+import numpy as np
+import shapely
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import LineString
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from road_maintenance.testing import QueryBudgetTestMixin
+
+from .map_matching import SIDE_LEFT, SIDE_RIGHT, covered_lengths, match_points
+from .models import RoadSection
+from .network import build_network
+
+
+class RoadSectionChangelistQueryCountTests(QueryBudgetTestMixin, TestCase):
+    """The section changelist runs the same number of queries for N and 2N rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser("admin", password="admin")
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def _sections(self, n):
+        start = RoadSection.objects.count()
+        RoadSection.objects.bulk_create(
+            RoadSection(
+                name=f"Dionica {i}",
+                road_number=f"Ž{1000 + i}",
+                geom=LineString([(492800 + i, 4818200), (493400 + i, 4818650)], srid=3765),
+            )
+            for i in range(start, start + n)
+        )
+
+    def test_changelist(self):
+        self.assertQueriesIndependentOfRows(reverse("admin:roads_roadsection_changelist"), self._sections)
+
+
+class MapMatchingTests(SimpleTestCase):
+    """Section 10 runs east along y = 0; section 20 runs north along x = 5000."""
+
+    def setUp(self):
+        self.network = build_network(
+            [10, 20],
+            [shapely.linestrings([(0, 0), (1000, 0)]), shapely.linestrings([(5000, 0), (5000, 1000)])],
+        )
+
+    def _drive(self, *legs):
+        """Concatenate (x, y) legs into one track."""
+        return np.concatenate([leg[0] for leg in legs]), np.concatenate([leg[1] for leg in legs])
+
+    @staticmethod
+    def _east(start, stop, offset, step=10.0):
+        x = np.arange(start, stop + step / 2, step, dtype=float)
+        return x, np.full(len(x), float(offset))
+
+    def _coverage(self, x, y, **kwargs):
+        match = match_points(self.network, x, y)
+        return {(c.section_id, c.side): round(c.length, 6) for c in covered_lengths(self.network, match, **kwargs)}
+
+    def test_side_chainage_and_distance(self):
+        x, y = self._drive(self._east(0, 40, 5), self._east(60, 100, -4))
+        match = match_points(self.network, x, y)
+        self.assertEqual(match.matched, len(x))
+        self.assertEqual(match.section.tolist(), [0] * len(x))
+        self.assertEqual(match.side.tolist(), [SIDE_LEFT] * 5 + [SIDE_RIGHT] * 5)
+        np.testing.assert_allclose(match.chainage, x)
+        np.testing.assert_allclose(match.distance, np.abs(y))
+
+    def test_points_beyond_max_distance_are_unmatched(self):
+        x, y = self._east(0, 40, 30)
+        match = match_points(self.network, x, y, max_distance=25)
+        self.assertEqual(match.matched, 0)
+        self.assertEqual(match.side.tolist(), [0] * len(x))
+        self.assertTrue(np.isnan(match.chainage).all())
+
+    def test_short_jitter_runs_are_dropped(self):
+        jitter = (np.array([4990.0, 4990.0]), np.array([500.0, 510.0]))
+        x, y = self._drive(self._east(0, 40, 5), jitter, self._east(50, 90, 5), (np.array([100.0]), np.array([-5.0])))
+        match = match_points(self.network, x, y, min_run=3)
+        self.assertEqual(match.section.tolist(), [0] * 5 + [-1, -1] + [0] * 5 + [-1])
+        kept = match_points(self.network, x, y, min_run=1)
+        self.assertEqual(kept.section.tolist(), [0] * 5 + [1, 1] + [0] * 5 + [0])
+
+    def test_repeat_pass_is_counted_once(self):
+        # 0–200 m, back to 100 m (a jump of 100 m, more than max_step) and on to 300 m.
+        x, y = self._drive(self._east(0, 200, 5), self._east(100, 300, 5))
+        self.assertEqual(self._coverage(x, y, max_step=50), {(10, "left"): 300.0})
+
+    def test_sides_are_covered_separately(self):
+        x, y = self._drive(self._east(0, 100, 5), self._east(100, 0, -5, step=-10.0))
+        self.assertEqual(self._coverage(x, y), {(10, "left"): 100.0, (10, "right"): 100.0})
+
+    def test_gaps_longer_than_max_step_are_not_covered(self):
+        x, y = self._drive(self._east(0, 100, 5), self._east(400, 500, 5))
+        self.assertEqual(self._coverage(x, y, max_step=50), {(10, "left"): 200.0})
+        self.assertEqual(self._coverage(x, y, max_step=500), {(10, "left"): 500.0})
+
+    def test_empty_track(self):
+        match = match_points(self.network, np.empty(0), np.empty(0))
+        self.assertEqual(match.matched, 0)
+        self.assertEqual(covered_lengths(self.network, match), [])
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from .views import SnapBatchView, SnapPointView
+
+app_name = 'roads'
+
+urlpatterns = [
+    path('snap/', SnapPointView.as_view(), name='snap'),
+    path('snap/batch/', SnapBatchView.as_view(), name='snap-batch'),
+]
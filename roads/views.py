@@ -0,0 +1,110 @@
+import json
+import math
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from .snapping import snap_points
+
+ALLOWED_SRIDS = (4326, 3765)
+
+
+def _forbidden_or_none(request):
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated or not user.is_active:
+        return JsonResponse(
+            {"code": "UNAUTHORIZED", "detail": "Potrebna je prijava."},
+            status=401,
+        )
+    return None
+
+
+def _bad_param(detail: str) -> JsonResponse:
+    return JsonResponse({"code": "BAD_PARAM", "detail": detail}, status=400)
+
+
+def _coord(value) -> float:
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(value)
+    return number
+
+
+def _options(source) -> tuple:
+    """(srid, max_distance) from query parameters or a JSON body."""
+    srid = int(source.get("srid") or 4326)
+    if srid not in ALLOWED_SRIDS:
+        raise ValueError("srid")
+    max_distance = float(source.get("max_distance") or settings.ROADS_SNAP_DEFAULT_DISTANCE)
+    if not 0 < max_distance <= settings.ROADS_SNAP_MAX_DISTANCE:
+        raise ValueError("max_distance")
+    return srid, max_distance
+
+
+class SnapPointView(View):
+    """Najbliža aktivna dionica za jednu točku (``x``/``y`` ili ``lon``/``lat``)."""
+
+    def get(self, request):
+        denied = _forbidden_or_none(request)
+        if denied:
+            return denied
+        try:
+            x = _coord(request.GET.get("x", request.GET.get("lon")))
+            y = _coord(request.GET.get("y", request.GET.get("lat")))
+            srid, max_distance = _options(request.GET)
+        except (TypeError, ValueError):
+            return _bad_param("Potrebni su parametri lon/lat (ili x/y), srid 4326 ili 3765 i ispravan max_distance.")
+
+        result = snap_points([(x, y)], srid=srid, max_distance=max_distance)[0]
+        return JsonResponse(result.as_dict(), status=200)
+
+
+# Read-only lookup; JSON bodies from field apps carry no CSRF token.
+@method_decorator(csrf_exempt, name="dispatch")
+class SnapBatchView(View):
+    """Najbliže dionice za do ``ROADS_SNAP_MAX_POINTS`` točaka u jednom upitu.
+
+    Tijelo: ``{"points": [[lon, lat], ...] | [{"id": ..., "lon": ..., "lat": ...}, ...],
+    "srid": 4326, "max_distance": 50}``.
+    """
+
+    def post(self, request):
+        denied = _forbidden_or_none(request)
+        if denied:
+            return denied
+        try:
+            data = json.loads(request.body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            return JsonResponse({"code": "BAD_JSON", "detail": "Neispravan JSON."}, status=400)
+        if not isinstance(data, dict) or not isinstance(data.get("points"), list):
+            return _bad_param("Očekuje se objekt s listom 'points'.")
+
+        raw_points = data["points"]
+        if len(raw_points) > settings.ROADS_SNAP_MAX_POINTS:
+            return _bad_param(f"Najviše {settings.ROADS_SNAP_MAX_POINTS} točaka po zahtjevu.")
+
+        ids, coords = [], []
+        try:
+            srid, max_distance = _options(data)
+            for point in raw_points:
+                if isinstance(point, dict):
+                    ids.append(point.get("id"))
+                    coords.append((_coord(point.get("x", point.get("lon"))), _coord(point.get("y", point.get("lat")))))
+                else:
+                    ids.append(None)
+                    x, y = point
+                    coords.append((_coord(x), _coord(y)))
+        except (TypeError, ValueError):
+            return _bad_param("Točke moraju biti [lon, lat] ili {id, lon, lat}; srid 4326 ili 3765.")
+
+        results = snap_points(coords, srid=srid, max_distance=max_distance)
+        payload = []
+        for index, (point_id, result) in enumerate(zip(ids, results)):
+            item = {"index": index, **result.as_dict()}
+            if point_id is not None:
+                item["id"] = point_id
+            payload.append(item)
+        return JsonResponse({"srid": srid, "max_distance": max_distance, "results": payload}, status=200)
@@ -0,0 +1,40 @@
+from .autocomplete import autocomplete_queryset
+from .query import matching_ids
+
+
+class FullTextSearchAdminMixin:
+    """Admin search through the ``search_searchdocument`` GIN index.
+
+    Replaces the ``icontains`` scan over ``search_fields`` (with its joins)
+    by a word-prefix match on the model's search documents. Input without a
+    usable word, or whose words match no document (e.g. a fragment from the
+    middle of a name), falls back to the default search.
+    """
+
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        ids = matching_ids(search_term, self.search_kind) if self.search_kind and search_term else None
+        if ids is None:
+            return super().get_search_results(request, queryset, search_term)
+        results = queryset.filter(pk__in=ids)
+        if not results.exists():
+            return super().get_search_results(request, queryset, search_term)
+        return results, False
+
+
+class TrigramAutocompleteAdminMixin:
+    """Admin autocomplete widgets served by ``search.autocomplete``.
+
+    Requests from ``autocomplete_fields`` of other admins get prefix, OIB
+    and typo-tolerant matches ranked by similarity instead of ``icontains``
+    in model order; the changelist search is left as it is.
+    """
+
+    autocomplete_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        match = getattr(request, "resolver_match", None)
+        if self.autocomplete_kind and search_term.strip() and match and match.url_name == "autocomplete":
+            return autocomplete_queryset(self.autocomplete_kind, search_term, queryset), False
+        return super().get_search_results(request, queryset, search_term)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'search'
+    verbose_name = _('Pretraživanje')
+
+    def ready(self) -> None:
+        # Drops cached autocomplete results (search.autocomplete) on edits.
+        from . import signals  # noqa: F401
@@ -0,0 +1,156 @@
+"""Type-ahead lookup of customers and road sections on ``pg_trgm`` indexes.
+
+Input of three or more characters is matched against ``UPPER(name)`` (and
+``UPPER(road_number)``) with ``LIKE '%…%'`` and, for typos, with the
+word-similarity operator ``%>``; shorter input, which has no full trigram,
+only by prefix (``LIKE '…%'``), an OIB always by prefix. All of these are
+served by the GIN ``gin_trgm_ops`` indexes on the same expressions. Results
+are ordered by prefix match, then by ``word_similarity``, then by name.
+
+The first few characters are what every user types and match the most rows,
+so results for inputs of up to ``SEARCH_AUTOCOMPLETE_CACHE_PREFIX``
+characters are kept in a small LRU cache per process. Entries expire after
+``SEARCH_AUTOCOMPLETE_CACHE_TTL`` seconds and are dropped in this process
+when a customer or section is saved.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Upper
+
+from customers.models import Customer
+from roads.models import RoadSection
+
+MAX_TERM_LENGTH = 100
+# Shorter input has no complete trigram to look up unless anchored.
+FUZZY_MIN_LENGTH = 3
+
+
+@dataclass(frozen=True)
+class Source:
+    model: type
+    # Matched upper-cased anywhere in the value; the first is the label.
+    text_fields: Sequence[str]
+    # Matched by prefix when the input is all digits.
+    digits_field: Optional[str]
+    # Returned with each suggestion.
+    extra_fields: Sequence[str]
+
+
+SOURCES: Dict[str, Source] = {
+    "customer": Source(Customer, ("name",), "oib", ("oib", "city")),
+    "road_section": Source(RoadSection, ("name", "road_number"), None, ("road_number", "is_active")),
+}
+
+
+def normalize(term: str) -> str:
+    return " ".join((term or "").split())[:MAX_TERM_LENGTH].upper()
+
+
+def autocomplete_queryset(kind: str, term: str, queryset: Optional[QuerySet] = None) -> QuerySet:
+    """Rows of ``kind`` matching ``term``, best first, annotated with ``rank``."""
+    source = SOURCES[kind]
+    key = normalize(term)
+    qs = source.model._default_manager.all() if queryset is None else queryset
+    label = source.text_fields[0]
+
+    annotations = {f"_ac_{field}": Upper(field) for field in source.text_fields}
+    fuzzy = len(key) >= FUZZY_MIN_LENGTH
+    prefix, match = Q(), Q()
+    for field in source.text_fields:
+        prefix |= Q(**{f"_ac_{field}__startswith": key})
+        match |= Q(**{f"_ac_{field}__{'contains' if fuzzy else 'startswith'}": key})
+    if source.digits_field and key.isdigit():
+        prefix |= Q(**{f"{source.digits_field}__startswith": key})
+        match |= Q(**{f"{source.digits_field}__startswith": key})
+    if fuzzy:
+        match |= Q(**{f"_ac_{label}__trigram_word_similar": key})
+
+    return (
+        qs.annotate(**annotations)
+        .filter(match)
+        .annotate(
+            is_prefix=Case(When(prefix, then=Value(1)), default=Value(0), output_field=IntegerField()),
+            rank=TrigramWordSimilarity(Value(key), Upper(label)),
+        )
+        .order_by("-is_prefix", "-rank", label, "pk")
+    )
+
+
+class PrefixCache:
+    """Thread-safe LRU of recent results with a time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, list]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[list]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: list) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+cache = PrefixCache(settings.SEARCH_AUTOCOMPLETE_CACHE_SIZE, settings.SEARCH_AUTOCOMPLETE_CACHE_TTL)
+
+
+def autocomplete(
+    kind: str, term: str, limit: int = 10, offset: int = 0, use_cache: bool = True
+) -> Tuple[List[dict], bool]:
+    """Suggestions for ``term``; returns (results, served from cache)."""
+    key = normalize(term)
+    if not key:
+        return [], False
+    cacheable = use_cache and len(key) <= settings.SEARCH_AUTOCOMPLETE_CACHE_PREFIX
+    cache_key = (kind, key, limit, offset)
+    if cacheable:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+
+    source = SOURCES[kind]
+    label = source.text_fields[0]
+    rows = autocomplete_queryset(kind, key).values("id", label, *source.extra_fields, "rank")
+    results = [
+        {
+            "id": row["id"],
+            "label": row[label],
+            **{field: row[field] for field in source.extra_fields},
+            "rank": round(row["rank"], 4),
+        }
+        for row in rows[offset:offset + limit]
+    ]
+    if cacheable:
+        cache.set(cache_key, results)
+    return results, False
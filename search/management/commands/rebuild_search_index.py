@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from search.models import SearchDocument
+
+SOURCES = {
+    SearchDocument.Kind.CUSTOMER: "customers_customer",
+    SearchDocument.Kind.PROJECT: "projects_project",
+    SearchDocument.Kind.WORK_ORDER: "projects_workorder",
+    SearchDocument.Kind.WORK_ITEM: "projects_workitem",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Ponovno gradi pretražive dokumente (search_searchdocument) iz izvornih "
+        "tablica u serijama i briše dokumente obrisanih objekata. Okidači ih inače "
+        "održavaju sami; naredba služi nakon masovnog uvoza ili promjene težina."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", action="append", dest="kinds", choices=list(SOURCES), help="Samo ova vrsta.")
+        parser.add_argument("--batch", type=int, default=20_000, help="Objekata po transakciji.")
+
+    def handle(self, *args, **options):
+        for kind in options["kinds"] or list(SOURCES):
+            table = SOURCES[kind]
+            started = time.perf_counter()
+            last_id, total = 0, 0
+            while True:
+                with transaction.atomic(), connection.cursor() as cur:
+                    cur.execute(
+                        f"SELECT array_agg(id ORDER BY id) FROM "
+                        f"(SELECT id FROM {table} WHERE id > %s ORDER BY id LIMIT %s) t",
+                        [last_id, options["batch"]],
+                    )
+                    ids = cur.fetchone()[0]
+                    if not ids:
+                        break
+                    cur.execute("SELECT search_refresh(%s, %s::bigint[])", [kind, ids])
+                last_id, total = ids[-1], total + len(ids)
+            with connection.cursor() as cur:
+                cur.execute(
+                    f"DELETE FROM search_searchdocument d WHERE d.kind = %s "
+                    f"AND NOT EXISTS (SELECT 1 FROM {table} s WHERE s.id = d.object_id)",
+                    [kind],
+                )
+                removed = cur.rowcount
+            self.stdout.write(
+                f"{kind:11} {total:>10} osvježeno, {removed} uklonjeno ({time.perf_counter() - started:.1f} s)"
+            )
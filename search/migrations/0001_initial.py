@@ -0,0 +1,272 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations, models
+
+# "simple" parsing (no stemming, no stop words) with unaccent in front, so
+# č/ć/š/ž/đ and c/s/z/d match each other in documents and queries alike.
+CREATE_CONFIG = r"""
+DROP TEXT SEARCH CONFIGURATION IF EXISTS hr_unaccent;
+CREATE TEXT SEARCH CONFIGURATION hr_unaccent (COPY = pg_catalog.simple);
+ALTER TEXT SEARCH CONFIGURATION hr_unaccent
+  ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+"""
+
+# Weights: A identifiers and names, B related names, C free text.
+CREATE_REFRESH_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION search_refresh(p_kind text, p_ids bigint[])
+RETURNS void AS
+$$
+BEGIN
+  IF p_ids IS NULL OR cardinality(p_ids) = 0 THEN
+    RETURN;
+  END IF;
+
+  IF p_kind = 'customer' THEN
+    INSERT INTO search_searchdocument (kind, object_id, title, subtitle, vector, updated_at)
+    SELECT 'customer', c.id, left(c.name, 500),
+           left(concat_ws(' · ', c.oib, NULLIF(c.city, '')), 500),
+           setweight(to_tsvector('hr_unaccent', concat_ws(' ', c.name, c.oib, c.vat_id, c.mbs)), 'A')
+           || setweight(to_tsvector('hr_unaccent', coalesce(c.contact_person, '')), 'B')
+           || setweight(to_tsvector('hr_unaccent', concat_ws(' ', c.street_address, c.city, c.county)), 'C'),
+           now()
+    FROM customers_customer c
+    WHERE c.id = ANY(p_ids)
+    ON CONFLICT (kind, object_id) DO UPDATE
+      SET title = EXCLUDED.title, subtitle = EXCLUDED.subtitle,
+          vector = EXCLUDED.vector, updated_at = EXCLUDED.updated_at;
+
+  ELSIF p_kind = 'project' THEN
+    INSERT INTO search_searchdocument (kind, object_id, title, subtitle, vector, updated_at)
+    SELECT 'project', p.id, left(p.name, 500), left(c.name, 500),
+           setweight(to_tsvector('hr_unaccent', concat_ws(' ', p.name, p.contract_number)), 'A')
+           || setweight(to_tsvector('hr_unaccent', c.name), 'B')
+           || setweight(to_tsvector('hr_unaccent', left(p.description, 10000)), 'C'),
+           now()
+    FROM projects_project p
+    JOIN customers_customer c ON c.id = p.customer_id
+    WHERE p.id = ANY(p_ids)
+    ON CONFLICT (kind, object_id) DO UPDATE
+      SET title = EXCLUDED.title, subtitle = EXCLUDED.subtitle,
+          vector = EXCLUDED.vector, updated_at = EXCLUDED.updated_at;
+
+  ELSIF p_kind = 'work_order' THEN
+    INSERT INTO search_searchdocument (kind, object_id, title, subtitle, vector, updated_at)
+    SELECT 'work_order', wo.id, left(wo.number || ' – ' || wo.title, 500), left(p.name, 500),
+           setweight(to_tsvector('hr_unaccent', concat_ws(' ', wo.number, wo.title)), 'A')
+           || setweight(to_tsvector('hr_unaccent', p.name), 'B')
+           || setweight(to_tsvector('hr_unaccent', left(wo.description, 10000)), 'C'),
+           now()
+    FROM projects_workorder wo
+    JOIN projects_project p ON p.id = wo.project_id
+    WHERE wo.id = ANY(p_ids)
+    ON CONFLICT (kind, object_id) DO UPDATE
+      SET title = EXCLUDED.title, subtitle = EXCLUDED.subtitle,
+          vector = EXCLUDED.vector, updated_at = EXCLUDED.updated_at;
+
+  ELSIF p_kind = 'work_item' THEN
+    INSERT INTO search_searchdocument (kind, object_id, title, subtitle, vector, updated_at)
+    SELECT 'work_item', wi.id,
+           left(concat_ws(' – ', ot.name, rs.name), 500),
+           left(wo.number, 500),
+           setweight(to_tsvector('hr_unaccent', wo.number), 'A')
+           || setweight(to_tsvector('hr_unaccent', concat_ws(' ', ot.name, rs.name, rs.road_number)), 'B')
+           || setweight(to_tsvector('hr_unaccent', left(concat_ws(' ', wi.description, wi.notes), 10000)), 'C'),
+           now()
+    FROM projects_workitem wi
+    JOIN projects_workorder wo ON wo.id = wi.work_order_id
+    JOIN operations_operationtype ot ON ot.id = wi.operation_type_id
+    LEFT JOIN roads_roadsection rs ON rs.id = wi.road_section_id
+    WHERE wi.id = ANY(p_ids)
+    ON CONFLICT (kind, object_id) DO UPDATE
+      SET title = EXCLUDED.title, subtitle = EXCLUDED.subtitle,
+          vector = EXCLUDED.vector, updated_at = EXCLUDED.updated_at;
+
+  ELSE
+    RAISE EXCEPTION 'search_refresh: unknown kind %', p_kind;
+  END IF;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Row triggers refresh the changed row's document and, when a name shown in
+# dependent documents changes, the documents of those rows too.
+CREATE_TRIGGER_FUNCTIONS = r"""
+CREATE OR REPLACE FUNCTION search_delete_document()
+RETURNS trigger AS
+$$
+BEGIN
+  DELETE FROM search_searchdocument WHERE kind = TG_ARGV[0] AND object_id = OLD.id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION search_customer_changed()
+RETURNS trigger AS
+$$
+BEGIN
+  PERFORM search_refresh('customer', ARRAY[NEW.id]);
+  IF TG_OP = 'UPDATE' AND NEW.name IS DISTINCT FROM OLD.name THEN
+    PERFORM search_refresh('project', ARRAY(SELECT id FROM projects_project WHERE customer_id = NEW.id));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION search_project_changed()
+RETURNS trigger AS
+$$
+BEGIN
+  PERFORM search_refresh('project', ARRAY[NEW.id]);
+  IF TG_OP = 'UPDATE' AND NEW.name IS DISTINCT FROM OLD.name THEN
+    PERFORM search_refresh('work_order', ARRAY(SELECT id FROM projects_workorder WHERE project_id = NEW.id));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION search_work_order_changed()
+RETURNS trigger AS
+$$
+BEGIN
+  PERFORM search_refresh('work_order', ARRAY[NEW.id]);
+  IF TG_OP = 'UPDATE' AND NEW.number IS DISTINCT FROM OLD.number THEN
+    PERFORM search_refresh('work_item', ARRAY(SELECT id FROM projects_workitem WHERE work_order_id = NEW.id));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION search_work_item_changed()
+RETURNS trigger AS
+$$
+BEGIN
+  PERFORM search_refresh('work_item', ARRAY[NEW.id]);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION search_operation_type_renamed()
+RETURNS trigger AS
+$$
+BEGIN
+  IF NEW.name IS DISTINCT FROM OLD.name THEN
+    PERFORM search_refresh('work_item', ARRAY(SELECT id FROM projects_workitem WHERE operation_type_id = NEW.id));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION search_road_section_renamed()
+RETURNS trigger AS
+$$
+BEGIN
+  IF NEW.name IS DISTINCT FROM OLD.name OR NEW.road_number IS DISTINCT FROM OLD.road_number THEN
+    PERFORM search_refresh('work_item', ARRAY(SELECT id FROM projects_workitem WHERE road_section_id = NEW.id));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# UPDATE OF limits the triggers to the columns that feed documents, so e.g.
+# WorkItem geometry or price updates do not rewrite search documents.
+CREATE_TRIGGERS = r"""
+CREATE TRIGGER search_customer_aiu
+AFTER INSERT OR UPDATE OF name, oib, vat_id, mbs, contact_person, street_address, city, county
+ON customers_customer FOR EACH ROW EXECUTE FUNCTION search_customer_changed();
+CREATE TRIGGER search_customer_ad
+AFTER DELETE ON customers_customer FOR EACH ROW EXECUTE FUNCTION search_delete_document('customer');
+
+CREATE TRIGGER search_project_aiu
+AFTER INSERT OR UPDATE OF name, contract_number, customer_id, description
+ON projects_project FOR EACH ROW EXECUTE FUNCTION search_project_changed();
+CREATE TRIGGER search_project_ad
+AFTER DELETE ON projects_project FOR EACH ROW EXECUTE FUNCTION search_delete_document('project');
+
+CREATE TRIGGER search_workorder_aiu
+AFTER INSERT OR UPDATE OF number, title, project_id, description
+ON projects_workorder FOR EACH ROW EXECUTE FUNCTION search_work_order_changed();
+CREATE TRIGGER search_workorder_ad
+AFTER DELETE ON projects_workorder FOR EACH ROW EXECUTE FUNCTION search_delete_document('work_order');
+
+CREATE TRIGGER search_workitem_aiu
+AFTER INSERT OR UPDATE OF work_order_id, road_section_id, operation_type_id, description, notes
+ON projects_workitem FOR EACH ROW EXECUTE FUNCTION search_work_item_changed();
+CREATE TRIGGER search_workitem_ad
+AFTER DELETE ON projects_workitem FOR EACH ROW EXECUTE FUNCTION search_delete_document('work_item');
+
+CREATE TRIGGER search_operationtype_au
+AFTER UPDATE OF name ON operations_operationtype
+FOR EACH ROW EXECUTE FUNCTION search_operation_type_renamed();
+
+CREATE TRIGGER search_roadsection_au
+AFTER UPDATE OF name, road_number ON roads_roadsection
+FOR EACH ROW EXECUTE FUNCTION search_road_section_renamed();
+"""
+
+BACKFILL = r"""
+SELECT search_refresh('customer', ARRAY(SELECT id FROM customers_customer));
+SELECT search_refresh('project', ARRAY(SELECT id FROM projects_project));
+SELECT search_refresh('work_order', ARRAY(SELECT id FROM projects_workorder));
+SELECT search_refresh('work_item', ARRAY(SELECT id FROM projects_workitem));
+"""
+
+REVERSE_SQL = r"""
+DROP TRIGGER IF EXISTS search_customer_aiu ON customers_customer;
+DROP TRIGGER IF EXISTS search_customer_ad ON customers_customer;
+DROP TRIGGER IF EXISTS search_project_aiu ON projects_project;
+DROP TRIGGER IF EXISTS search_project_ad ON projects_project;
+DROP TRIGGER IF EXISTS search_workorder_aiu ON projects_workorder;
+DROP TRIGGER IF EXISTS search_workorder_ad ON projects_workorder;
+DROP TRIGGER IF EXISTS search_workitem_aiu ON projects_workitem;
+DROP TRIGGER IF EXISTS search_workitem_ad ON projects_workitem;
+DROP TRIGGER IF EXISTS search_operationtype_au ON operations_operationtype;
+DROP TRIGGER IF EXISTS search_roadsection_au ON roads_roadsection;
+DROP FUNCTION IF EXISTS search_customer_changed();
+DROP FUNCTION IF EXISTS search_project_changed();
+DROP FUNCTION IF EXISTS search_work_order_changed();
+DROP FUNCTION IF EXISTS search_work_item_changed();
+DROP FUNCTION IF EXISTS search_operation_type_renamed();
+DROP FUNCTION IF EXISTS search_road_section_renamed();
+DROP FUNCTION IF EXISTS search_delete_document();
+DROP FUNCTION IF EXISTS search_refresh(text, bigint[]);
+DROP TEXT SEARCH CONFIGURATION IF EXISTS hr_unaccent;
+"""
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('customers', '0002_alter_customer_options_alter_customer_bank_name_and_more'),
+        ('operations', '0002_operationprice'),
+        ('projects', '0007_workitem_updated_at_double_billing'),
+        ('roads', '0004_roadsection_trigram_indexes'),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('customer', 'Kupac'), ('project', 'Projekt'), ('work_order', 'Radni nalog'), ('work_item', 'Stavka rada')], max_length=16, verbose_name='Vrsta')),
+                ('object_id', models.BigIntegerField(verbose_name='ID objekta')),
+                ('title', models.CharField(max_length=500, verbose_name='Naslov')),
+                ('subtitle', models.CharField(blank=True, max_length=500, verbose_name='Podnaslov')),
+                ('vector', django.contrib.postgres.search.SearchVectorField(verbose_name='Indeks')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Osvježeno')),
+            ],
+            options={
+                'verbose_name': 'Pretraživi dokument',
+                'verbose_name_plural': 'Pretraživi dokumenti',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_document_kind_object_uniq')],
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['vector'], name='search_document_vector_gin')],
+            },
+        ),
+        migrations.RunSQL(sql=CREATE_CONFIG, reverse_sql="DROP TEXT SEARCH CONFIGURATION IF EXISTS hr_unaccent;"),
+        migrations.RunSQL(sql=CREATE_REFRESH_FUNCTION + CREATE_TRIGGER_FUNCTIONS, reverse_sql=migrations.RunSQL.noop),
+        migrations.RunSQL(sql=CREATE_TRIGGERS + BACKFILL, reverse_sql=REVERSE_SQL),
+    ]
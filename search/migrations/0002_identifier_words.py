@@ -0,0 +1,124 @@
+import importlib
+
+from django.db import migrations
+
+initial = importlib.import_module("search.migrations.0001_initial")
+
+# Letters mixed with digits (Ž1234, RN2026) are numword/numhword tokens, which
+# the initial configuration left without unaccent.
+ALTER_CONFIG = r"""
+ALTER TEXT SEARCH CONFIGURATION hr_unaccent
+  ALTER MAPPING FOR numword, numhword, hword_numpart WITH unaccent, simple;
+"""
+
+REVERT_CONFIG = r"""
+ALTER TEXT SEARCH CONFIGURATION hr_unaccent
+  ALTER MAPPING FOR numword, numhword, hword_numpart WITH simple;
+"""
+
+# Identifiers such as RN-2026-0001 are indexed with separators replaced by
+# spaces. The default parser would otherwise read "-2026" and "-0001" as signed
+# integers, which the unsigned query terms built from the same input (2026:*,
+# 0001:*) never match.
+CREATE_REFRESH_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION search_identifier_words(p_value text)
+RETURNS text AS
+$$
+  SELECT regexp_replace(coalesce(p_value, ''), '[^[:alnum:]]+', ' ', 'g');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION search_refresh(p_kind text, p_ids bigint[])
+RETURNS void AS
+$$
+BEGIN
+  IF p_ids IS NULL OR cardinality(p_ids) = 0 THEN
+    RETURN;
+  END IF;
+
+  IF p_kind = 'customer' THEN
+    INSERT INTO search_searchdocument (kind, object_id, title, subtitle, vector, updated_at)
+    SELECT 'customer', c.id, left(c.name, 500),
+           left(concat_ws(' · ', c.oib, NULLIF(c.city, '')), 500),
+           setweight(to_tsvector('hr_unaccent', concat_ws(' ', c.name,
+             search_identifier_words(c.oib), search_identifier_words(c.vat_id), search_identifier_words(c.mbs))), 'A')
+           || setweight(to_tsvector('hr_unaccent', coalesce(c.contact_person, '')), 'B')
+           || setweight(to_tsvector('hr_unaccent', concat_ws(' ', c.street_address, c.city, c.county)), 'C'),
+           now()
+    FROM customers_customer c
+    WHERE c.id = ANY(p_ids)
+    ON CONFLICT (kind, object_id) DO UPDATE
+      SET title = EXCLUDED.title, subtitle = EXCLUDED.subtitle,
+          vector = EXCLUDED.vector, updated_at = EXCLUDED.updated_at;
+
+  ELSIF p_kind = 'project' THEN
+    INSERT INTO search_searchdocument (kind, object_id, title, subtitle, vector, updated_at)
+    SELECT 'project', p.id, left(p.name, 500), left(c.name, 500),
+           setweight(to_tsvector('hr_unaccent', concat_ws(' ', p.name, search_identifier_words(p.contract_number))), 'A')
+           || setweight(to_tsvector('hr_unaccent', c.name), 'B')
+           || setweight(to_tsvector('hr_unaccent', left(p.description, 10000)), 'C'),
+           now()
+    FROM projects_project p
+    JOIN customers_customer c ON c.id = p.customer_id
+    WHERE p.id = ANY(p_ids)
+    ON CONFLICT (kind, object_id) DO UPDATE
+      SET title = EXCLUDED.title, subtitle = EXCLUDED.subtitle,
+          vector = EXCLUDED.vector, updated_at = EXCLUDED.updated_at;
+
+  ELSIF p_kind = 'work_order' THEN
+    INSERT INTO search_searchdocument (kind, object_id, title, subtitle, vector, updated_at)
+    SELECT 'work_order', wo.id, left(wo.number || ' – ' || wo.title, 500), left(p.name, 500),
+           setweight(to_tsvector('hr_unaccent', concat_ws(' ', search_identifier_words(wo.number), wo.title)), 'A')
+           || setweight(to_tsvector('hr_unaccent', p.name), 'B')
+           || setweight(to_tsvector('hr_unaccent', left(wo.description, 10000)), 'C'),
+           now()
+    FROM projects_workorder wo
+    JOIN projects_project p ON p.id = wo.project_id
+    WHERE wo.id = ANY(p_ids)
+    ON CONFLICT (kind, object_id) DO UPDATE
+      SET title = EXCLUDED.title, subtitle = EXCLUDED.subtitle,
+          vector = EXCLUDED.vector, updated_at = EXCLUDED.updated_at;
+
+  ELSIF p_kind = 'work_item' THEN
+    INSERT INTO search_searchdocument (kind, object_id, title, subtitle, vector, updated_at)
+    SELECT 'work_item', wi.id,
+           left(concat_ws(' – ', ot.name, rs.name), 500),
+           left(wo.number, 500),
+           setweight(to_tsvector('hr_unaccent', search_identifier_words(wo.number)), 'A')
+           || setweight(to_tsvector('hr_unaccent', concat_ws(' ', ot.name, rs.name,
+                search_identifier_words(rs.road_number))), 'B')
+           || setweight(to_tsvector('hr_unaccent', left(concat_ws(' ', wi.description, wi.notes), 10000)), 'C'),
+           now()
+    FROM projects_workitem wi
+    JOIN projects_workorder wo ON wo.id = wi.work_order_id
+    JOIN operations_operationtype ot ON ot.id = wi.operation_type_id
+    LEFT JOIN roads_roadsection rs ON rs.id = wi.road_section_id
+    WHERE wi.id = ANY(p_ids)
+    ON CONFLICT (kind, object_id) DO UPDATE
+      SET title = EXCLUDED.title, subtitle = EXCLUDED.subtitle,
+          vector = EXCLUDED.vector, updated_at = EXCLUDED.updated_at;
+
+  ELSE
+    RAISE EXCEPTION 'search_refresh: unknown kind %', p_kind;
+  END IF;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+REVERT_REFRESH_FUNCTION = initial.CREATE_REFRESH_FUNCTION + r"""
+DROP FUNCTION IF EXISTS search_identifier_words(text);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=ALTER_CONFIG, reverse_sql=REVERT_CONFIG),
+        migrations.RunSQL(
+            sql=CREATE_REFRESH_FUNCTION + initial.BACKFILL,
+            reverse_sql=REVERT_REFRESH_FUNCTION + initial.BACKFILL,
+        ),
+    ]
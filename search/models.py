@@ -0,0 +1,38 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SearchDocument(models.Model):
+    """Pretraživi dokument jednog kupca, projekta, naloga ili stavke rada.
+
+    Retke održavaju okidači u bazi (``search_refresh``, migracija 0001) pri
+    svakoj promjeni izvornih tablica; aplikacija ih samo čita.
+    """
+
+    class Kind(models.TextChoices):
+        CUSTOMER = "customer", _("Kupac")
+        PROJECT = "project", _("Projekt")
+        WORK_ORDER = "work_order", _("Radni nalog")
+        WORK_ITEM = "work_item", _("Stavka rada")
+
+    kind = models.CharField(_("Vrsta"), max_length=16, choices=Kind.choices)
+    object_id = models.BigIntegerField(_("ID objekta"))
+    title = models.CharField(_("Naslov"), max_length=500)
+    subtitle = models.CharField(_("Podnaslov"), max_length=500, blank=True)
+    vector = SearchVectorField(_("Indeks"))
+    updated_at = models.DateTimeField(_("Osvježeno"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Pretraživi dokument")
+        verbose_name_plural = _("Pretraživi dokumenti")
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="search_document_kind_object_uniq"),
+        ]
+        indexes = [
+            GinIndex(fields=["vector"], name="search_document_vector_gin"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()}: {self.title}"
@@ -0,0 +1,113 @@
+"""Ranked full-text search over ``SearchDocument``.
+
+Input is split into words, each becomes a prefix term (``word:*``) and all
+must match; the ``hr_unaccent`` configuration folds č/ć/š/ž/đ on both sides.
+Matching documents come from the GIN index on ``vector``. To keep latency
+bounded when a short prefix matches a large part of the table, only
+``SEARCH_MAX_CANDIDATES`` matches are ranked (``ts_rank`` with the A/B/C
+weights set by the triggers, normalised by document length).
+
+The pool is filled from two separately limited scans so that each can stop
+as soon as it has enough rows: first documents where every term matches an
+A-weighted word (numbers, names, titles), then the remaining matches. An exact
+work-order number or customer name therefore makes it into the pool ahead of
+documents that only mention it. Within a scan rows come in index order; the
+final ordering breaks rank ties by title, kind and ``object_id`` so that pages
+do not overlap. Offsets beyond the pool return nothing.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+
+from .models import SearchDocument
+
+MAX_TERMS = 8
+_WORD = re.compile(r"[^\W_]+")
+
+SEARCH_SQL = """
+WITH q AS (
+    SELECT to_tsquery('hr_unaccent', %(query)s) AS query,
+           to_tsquery('hr_unaccent', %(title_query)s) AS title_query
+),
+candidates AS (
+    (SELECT d.kind, d.object_id, d.title, d.subtitle, d.vector
+     FROM search_searchdocument d, q
+     WHERE d.vector @@ q.title_query
+       AND (%(kinds)s::text[] IS NULL OR d.kind = ANY(%(kinds)s::text[]))
+     LIMIT %(candidates)s)
+    UNION ALL
+    (SELECT d.kind, d.object_id, d.title, d.subtitle, d.vector
+     FROM search_searchdocument d, q
+     WHERE d.vector @@ q.query AND NOT (d.vector @@ q.title_query)
+       AND (%(kinds)s::text[] IS NULL OR d.kind = ANY(%(kinds)s::text[]))
+     LIMIT %(candidates)s)
+    LIMIT %(candidates)s
+)
+SELECT c.kind, c.object_id, c.title, c.subtitle, ts_rank(c.vector, q.query, 1) AS rank
+FROM candidates c, q
+ORDER BY rank DESC, c.title, c.kind, c.object_id
+LIMIT %(limit)s OFFSET %(offset)s
+"""
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    object_id: int
+    title: str
+    subtitle: str
+    rank: float
+
+
+def build_tsquery(text: str, weights: str = "") -> Optional[str]:
+    """``to_tsquery`` input for free text, or None if it has no usable words.
+
+    One-letter words are dropped when longer ones are present; a lone
+    one-letter prefix would match most of the index. ``weights`` (e.g.
+    ``"A"``) restricts every term to words with those weights.
+    """
+    words = [w.lower() for w in _WORD.findall(text or "")][:MAX_TERMS]
+    longer = [w for w in words if len(w) > 1]
+    words = longer or [w for w in words if w.isdigit()]
+    if not words:
+        return None
+    return " & ".join(f"{word}:*{weights}" for word in words)
+
+
+def search(
+    text: str,
+    kinds: Optional[Sequence[str]] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[SearchHit]:
+    query = build_tsquery(text)
+    if query is None:
+        return []
+    params = {
+        "query": query,
+        "title_query": build_tsquery(text, weights="A"),
+        "kinds": list(kinds) if kinds else None,
+        "candidates": settings.SEARCH_MAX_CANDIDATES,
+        "limit": limit,
+        "offset": offset,
+    }
+    with connection.cursor() as cur:
+        cur.execute(SEARCH_SQL, params)
+        return [SearchHit(*row) for row in cur.fetchall()]
+
+
+def matching_ids(text: str, kind: str):
+    """Subquery of ``object_id``s of ``kind`` matching ``text``, or None."""
+    query = build_tsquery(text)
+    if query is None:
+        return None
+    return SearchDocument.objects.filter(
+        kind=kind,
+        vector=SearchQuery(query, search_type="raw", config="hr_unaccent"),
+    ).values("object_id")
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from customers.models import Customer
+from roads.models import RoadSection
+
+from .autocomplete import cache
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+@receiver(post_save, sender=RoadSection)
+@receiver(post_delete, sender=RoadSection)
+def autocomplete_source_changed(sender, **kwargs) -> None:
+    cache.clear()
@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from customers.models import Customer
+from projects.models import WorkItem
+from road_maintenance.testing import create_work_fixtures
+
+from .query import build_tsquery, search
+
+
+class BuildTsqueryTests(SimpleTestCase):
+    def test_prefix_terms(self):
+        self.assertEqual(build_tsquery("RN-2026-0001"), "rn:* & 2026:* & 0001:*")
+
+    def test_weights(self):
+        self.assertEqual(build_tsquery("Rubna linija", weights="A"), "rubna:*A & linija:*A")
+
+    def test_drops_single_letters(self):
+        self.assertEqual(build_tsquery("D 8 Split"), "split:*")
+        self.assertIsNone(build_tsquery(" - "))
+
+
+class SearchTests(TestCase):
+    """Documents are maintained by the migration's triggers in the test database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        data = create_work_fixtures()
+        cls.work_order = data["work_order"]
+        cls.work_item = WorkItem.objects.create(
+            work_order=cls.work_order,
+            road_section=data["section"],
+            operation_type=data["operation"],
+            road_side="right",
+            quantity=Decimal("10"),
+        )
+        cls.customer = Customer.objects.create(
+            name="Šumarija Đakovo Čačinci Žrnovnica", oib="69435151530", street_address="Ulica 2",
+            postal_code="31400", city="Đakovo",
+        )
+        cls.admin_user = get_user_model().objects.create_superuser("admin", password="admin")
+
+    def _ids(self, text, kind):
+        return {hit.object_id for hit in search(text, kinds=[kind])}
+
+    def test_work_order_number(self):
+        number = self.work_order.number
+        self.assertRegex(number, r"^RN-\d{4}-\d{4}$")
+        self.assertIn(self.work_order.pk, self._ids(number, "work_order"))
+        self.assertIn(self.work_order.pk, self._ids(number.split("-", 1)[1], "work_order"))
+        self.assertIn(self.work_order.pk, self._ids(number.lower().replace("-", " "), "work_order"))
+        self.assertIn(self.work_item.pk, self._ids(number, "work_item"))
+
+    def test_diacritics_fold_both_ways(self):
+        for text in ("sumarija dakovo", "cacinci", "zrnovn", "Šumarija Đakovo", "ČAČINCI"):
+            with self.subTest(text=text):
+                self.assertIn(self.customer.pk, self._ids(text, "customer"))
+        plain = Customer.objects.create(
+            name="Zupanja Cesta", oib="83614285717", street_address="Ulica 3", postal_code="32270", city="Zupanja"
+        )
+        self.assertIn(plain.pk, self._ids("Županja", "customer"))
+
+    def test_admin_search_by_work_order_number(self):
+        self.client.force_login(self.admin_user)
+        number = self.work_order.number
+        for url, obj in (
+            (reverse("admin:projects_workorder_changelist"), self.work_order),
+            (reverse("admin:projects_workitem_changelist"), self.work_item),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, {"q": number})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([o.pk for o in response.context["cl"].result_list], [obj.pk])
+
+    def test_admin_search_falls_back_to_default(self):
+        self.client.force_login(self.admin_user)
+        # A fragment from the middle of a word has no prefix match in the index.
+        response = self.client.get(reverse("admin:customers_customer_changelist"), {"q": "marija"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self.customer.pk, [c.pk for c in response.context["cl"].result_list])
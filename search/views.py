@@ -0,0 +1,123 @@
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import NoReverseMatch, reverse
+from django.views import View
+
+from .autocomplete import SOURCES, autocomplete
+from .models import SearchDocument
+from .query import search
+
+ADMIN_URLS = {
+    SearchDocument.Kind.CUSTOMER: "admin:customers_customer_change",
+    SearchDocument.Kind.PROJECT: "admin:projects_project_change",
+    SearchDocument.Kind.WORK_ORDER: "admin:projects_workorder_change",
+    SearchDocument.Kind.WORK_ITEM: "admin:projects_workitem_change",
+}
+
+
+def _admin_url(kind: str, object_id: int):
+    try:
+        return reverse(ADMIN_URLS[kind], args=[object_id])
+    except NoReverseMatch:
+        return None
+
+
+def _unauthorized_or_none(request):
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated or not user.is_active:
+        return JsonResponse({"code": "UNAUTHORIZED", "detail": "Potrebna je prijava."}, status=401)
+    return None
+
+
+class SearchView(View):
+    """Objedinjena pretraga kupaca, projekata, naloga i stavki rada.
+
+    Parametri: ``q`` (tekst), ``types`` (npr. ``customer,work_order``),
+    ``limit`` (do ``SEARCH_MAX_LIMIT``) i ``offset``.
+    """
+
+    def get(self, request):
+        denied = _unauthorized_or_none(request)
+        if denied:
+            return denied
+        user = request.user
+
+        text = request.GET.get("q", "").strip()
+        kinds = [k for k in request.GET.get("types", "").split(",") if k]
+        try:
+            limit = int(request.GET.get("limit") or 20)
+            offset = int(request.GET.get("offset") or 0)
+            if set(kinds) - set(SearchDocument.Kind.values):
+                raise ValueError(kinds)
+            if not 0 < limit <= settings.SEARCH_MAX_LIMIT or offset < 0:
+                raise ValueError(limit)
+        except ValueError:
+            return JsonResponse(
+                {
+                    "code": "BAD_PARAM",
+                    "detail": f"types iz {', '.join(SearchDocument.Kind.values)}; "
+                    f"limit 1–{settings.SEARCH_MAX_LIMIT}; offset ≥ 0.",
+                },
+                status=400,
+            )
+
+        started = time.perf_counter()
+        hits = search(text, kinds=kinds, limit=limit, offset=offset)
+        results = [
+            {
+                "type": hit.kind,
+                "id": hit.object_id,
+                "title": hit.title,
+                "subtitle": hit.subtitle,
+                "rank": round(hit.rank, 6),
+                "url": _admin_url(hit.kind, hit.object_id) if user.is_staff else None,
+            }
+            for hit in hits
+        ]
+        return JsonResponse(
+            {"query": text, "results": results, "took_ms": round((time.perf_counter() - started) * 1000, 1)},
+            status=200,
+        )
+
+
+class AutocompleteView(View):
+    """Prijedlozi kupaca (naziv, OIB) ili dionica (naziv, broj ceste) dok korisnik tipka.
+
+    ``kind`` je ``customer`` ili ``road_section``; parametri ``q``,
+    ``limit`` (do ``SEARCH_AUTOCOMPLETE_MAX_LIMIT``) i ``offset``.
+    """
+
+    def get(self, request, kind):
+        denied = _unauthorized_or_none(request)
+        if denied:
+            return denied
+        if kind not in SOURCES:
+            return JsonResponse(
+                {"code": "NOT_FOUND", "detail": f"Vrsta mora biti {' ili '.join(SOURCES)}."},
+                status=404,
+            )
+        text = request.GET.get("q", "")
+        try:
+            limit = int(request.GET.get("limit") or 10)
+            offset = int(request.GET.get("offset") or 0)
+            if not 0 < limit <= settings.SEARCH_AUTOCOMPLETE_MAX_LIMIT or offset < 0:
+                raise ValueError(limit)
+        except ValueError:
+            return JsonResponse(
+                {"code": "BAD_PARAM", "detail": f"limit 1–{settings.SEARCH_AUTOCOMPLETE_MAX_LIMIT}; offset ≥ 0."},
+                status=400,
+            )
+
+        started = time.perf_counter()
+        results, cached = autocomplete(kind, text, limit=limit, offset=offset)
+        return JsonResponse(
+            {
+                "query": text,
+                "results": results,
+                "cached": cached,
+                "took_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+            status=200,
+        )